@@ -1,9 +1,16 @@
+import io
+import os
+
 from adminsortable2.admin import SortableAdminBase
-from django.contrib.admin import register, ModelAdmin
+from django.conf import settings
+from django.contrib.admin import register, ModelAdmin, action
+from django.core.exceptions import PermissionDenied
 from django.db.models import Prefetch
-from django.http import HttpResponseRedirect
+from django.http import HttpResponseRedirect, FileResponse, Http404
+from django.urls import path, reverse
+from django.utils import timezone
 from django.utils.text import Truncator
-from django.utils.html import strip_tags
+from django.utils.html import strip_tags, format_html
 from django.utils.translation import gettext_lazy as _
 from import_export.admin import ImportExportModelAdmin
 from modeltranslation.admin import TranslationAdmin
@@ -20,9 +27,12 @@ except ImportError:
 
 from app.models import (
     About, VisaType, ResultCategory, Result, ContactInfo, UniversityLogo, Question, AnswerOption, SurveySubmission,
-    InputFieldType, SubmissionStatus, Response, Survey
+    InputFieldType, SubmissionStatus, Response, Survey, NotificationOutbox, ExportJob, ExportWatermark
 )
 from app.resource import QuestionResource, InputFieldTypeResource, SurveySubmissionResource, AnswerOptionResource
+from app.utils.export_jobs import request_export, get_admin_filter_state
+from app.utils.survey_registry import get_survey_snapshot
+from app.utils.xlsx_export import write_submissions_xlsx
 
 from shared.django.admin import (
     AboutHighlightInline, VisaDocumentInline,
@@ -501,24 +511,20 @@ class SurveySubmissionAdmin(ImportExportModelAdmin, ModelAdmin):
         """
         # Получаем базовый список полей
         list_display = ['id']
+        snapshot = get_survey_snapshot()
 
         # Get the selected questionnaire from the request parameters
         survey_id = request.GET.get('survey')
 
         # If no questionnaire is selected, use the default questionnaire
-        try:
-            from app.models import Survey
-
-            if not survey_id:
-                # Search for the default questionnaire
-                default_survey = Survey.objects.filter(is_default=True).first()
-                if default_survey:
-                    survey_id = default_survey.id
-        except:
-            pass
+        if not survey_id:
+            default_survey = snapshot.get_default_survey(active_only=False)
+            if default_survey:
+                survey_id = default_survey.id
 
-        # Получаем все вопросы и сортируем их по порядку
-        questions = Question.objects.filter(survey_id=survey_id).order_by('order')
+        # Получаем все вопросы, отсортированные по порядку
+        survey = snapshot.get_survey(survey_id)
+        questions = survey.questions if survey else ()
 
         # Для каждого вопроса создаем динамический метод получения ответа
         for question in questions:
@@ -565,34 +571,26 @@ class SurveySubmissionAdmin(ImportExportModelAdmin, ModelAdmin):
         """
         # Get basic filters
         base_filters = list(self.list_filter)
+        snapshot = get_survey_snapshot()
 
         # Get the selected questionnaire from the request parameters
         survey_id = request.GET.get('survey')
 
         # If no questionnaire is selected, use the default questionnaire
-        try:
-            from app.models import Survey
-
-            if not survey_id:
-                # Search for the default questionnaire
-                default_survey = Survey.objects.filter(is_default=True).first()
-                if default_survey:
-                    survey_id = default_survey.id
-        except:
-            pass
+        if not survey_id:
+            default_survey = snapshot.get_default_survey(active_only=False)
+            if default_survey:
+                survey_id = default_survey.id
 
         # Filter questions by the selected questionnaire
-        questions_query = Question.objects.all()
-        if survey_id:
-            try:
-                survey_id = int(survey_id)
-                questions_query = questions_query.filter(survey_id=survey_id)
-            except (ValueError, TypeError):
-                pass
+        try:
+            questions = snapshot.get_questions(int(survey_id)) if survey_id else snapshot.get_questions()
+        except (ValueError, TypeError):
+            questions = snapshot.get_questions()
 
         # Add dynamic filters for each question
         dynamic_filters = []
-        for q in questions_query:
+        for q in questions:
             # Get all filters for this question (one for each option family)
             filter_classes = create_question_filters(q)
             # Add filters to the list
@@ -618,6 +616,34 @@ class SurveySubmissionAdmin(ImportExportModelAdmin, ModelAdmin):
 
         return super().get_export_queryset(request)
 
+    def export_action(self, request, *args, **kwargs):
+        """
+        Queue xlsx exports as background jobs instead of building the file in the request.
+
+        The job keeps the changelist query string, so it exports what the
+        changelist shows. The user is taken to the job, which links the file
+        once it is ready.
+        """
+        if settings.EXPORT_JOBS_ENABLED and request.method == 'POST' and self.has_export_permission(request):
+            formats = self.get_export_formats()
+            try:
+                file_format = formats[int(request.POST.get('file_format', ''))]()
+            except (ValueError, IndexError):
+                file_format = None
+            if file_format is not None and file_format.get_extension() == 'xlsx':
+                survey = get_survey_snapshot().get_survey(request.GET.get('survey'))
+                job, created = request_export(
+                    self.get_export_queryset(request),
+                    survey.id if survey else None,
+                    ExportJob.Source.ADMIN,
+                    get_admin_filter_state(request),
+                    requested_by=request.user
+                )
+                if created:
+                    self.message_user(request, _('The export was queued, the file will be linked here when ready.'))
+                return HttpResponseRedirect(reverse('admin:app_exportjob_change', args=[job.pk]))
+        return super().export_action(request, *args, **kwargs)
+
     def get_export_data(self, file_format, queryset, *args, **kwargs):
         """
         Extract data from the export form and pass it to the resource for filtering.
@@ -631,6 +657,15 @@ class SurveySubmissionAdmin(ImportExportModelAdmin, ModelAdmin):
         Returns:
             Exported data in the specified format
         """
+        if file_format.get_extension() == 'xlsx':
+            # Streamed in write-only mode instead of going through a tablib Dataset
+            request = kwargs['request']
+            if not self.has_export_permission(request):
+                raise PermissionDenied
+            output = io.BytesIO()
+            write_submissions_xlsx(self.resource_class(**self.get_export_resource_kwargs(request)), queryset, output)
+            return output.getvalue()
+
         # Store the export form for later use
         self.export_form = kwargs.get('export_form')
 
@@ -691,15 +726,15 @@ class SurveySubmissionAdmin(ImportExportModelAdmin, ModelAdmin):
 
         # Добавляем фильтр по опроснику по умолчанию
         try:
-            from app.models import Survey
+            snapshot = get_survey_snapshot()
 
             # Получаем опросник по умолчанию
-            default_survey = Survey.objects.filter(is_default=True, is_active=True).first()
+            default_survey = snapshot.get_default_survey()
             if default_survey:
                 q["survey"] = str(default_survey.id)
             else:
                 # Если нет опросника по умолчанию, пробуем найти любой активный опросник
-                any_active_survey = Survey.objects.filter(is_active=True).first()
+                any_active_survey = snapshot.get_first_active_survey()
                 if any_active_survey:
                     q["survey"] = str(any_active_survey.id)
         except Exception:
@@ -712,3 +747,90 @@ class SurveySubmissionAdmin(ImportExportModelAdmin, ModelAdmin):
         css = {
             'all': ['admin/css/multi_select.css']
         }
+
+
+@register(NotificationOutbox)
+class NotificationOutboxAdmin(ModelAdmin):
+    """Admin interface for undelivered Telegram notifications."""
+    list_display = ['__str__', 'status', 'attempts', 'next_attempt_at', 'created_at']
+    list_filter = ['status', 'kind']
+    search_fields = ['submission__id', 'last_error']
+    readonly_fields = ['kind', 'submission', 'status', 'attempts', 'next_attempt_at', 'last_error', 'created_at']
+    actions = ['retry_now']
+
+    def has_add_permission(self, request):
+        return False
+
+    @action(description=_('Retry selected notifications now'))
+    def retry_now(self, request, queryset):
+        updated = queryset.update(
+            status=NotificationOutbox.Status.PENDING, attempts=0, next_attempt_at=timezone.now()
+        )
+        self.message_user(request, _('%(count)d notifications queued for delivery.') % {'count': updated})
+
+
+@register(ExportJob)
+class ExportJobAdmin(ModelAdmin):
+    """Admin interface for background submission exports."""
+    list_display = ['__str__', 'survey', 'source', 'status', 'get_progress', 'requested_by', 'created_at', 'get_file']
+    list_filter = ['status', 'source']
+    readonly_fields = [
+        'source', 'survey', 'status', 'get_progress', 'get_file', 'requested_by', 'filter_state', 'attempts',
+        'last_error', 'created_at', 'started_at', 'finished_at'
+    ]
+    exclude = ['file', 'fingerprint', 'progress', 'total_count', 'exported_count', 'telegram_chat_id',
+               'telegram_thread_id']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        return [
+            path(
+                '<path:object_id>/download/',
+                self.admin_site.admin_view(self.download_view),
+                name='app_exportjob_download'
+            ),
+        ] + super().get_urls()
+
+    def download_view(self, request, object_id):
+        """Serve the file of a finished export to users who may view exports."""
+        job = self.get_object(request, object_id)
+        if job is None or not self.has_view_permission(request, job):
+            raise PermissionDenied
+        if not job.file:
+            raise Http404
+        return FileResponse(job.file.open('rb'), as_attachment=True, filename=os.path.basename(job.file.name))
+
+    def get_progress(self, obj):
+        return f"{obj.progress}% ({obj.exported_count}/{obj.total_count})"
+
+    get_progress.short_description = _('Progress')
+
+    def get_file(self, obj):
+        if obj.status != ExportJob.Status.DONE or not obj.file:
+            return '-'
+        url = reverse('admin:app_exportjob_download', args=[obj.pk])
+        return format_html('<a href="{}">{}</a>', url, os.path.basename(obj.file.name))
+
+    get_file.short_description = _('File')
+
+
+@register(ExportWatermark)
+class ExportWatermarkAdmin(ModelAdmin):
+    """Admin interface for incremental export consumers. Deleting one makes its next export a full one."""
+    list_display = ['consumer', 'survey', 'last_updated_at', 'last_id', 'updated_at']
+    list_filter = ['survey']
+    search_fields = ['consumer']
+    readonly_fields = [
+        'consumer', 'survey', 'filter_state', 'scope', 'last_updated_at', 'last_id', 'created_at', 'updated_at'
+    ]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
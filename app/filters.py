@@ -1,7 +1,8 @@
 from django.db.models import Q
 from django_filters import rest_framework as filters
 
-from app.models import SurveySubmission, Question, Survey, SubmissionStatus, AnswerOption
+from app.models import SurveySubmission, Survey, SubmissionStatus
+from app.utils.survey_registry import get_survey_snapshot
 
 
 class SurveySubmissionAPIFilter(filters.FilterSet):
@@ -22,21 +23,20 @@ class SurveySubmissionAPIFilter(filters.FilterSet):
             return
 
         # Determine the survey to generate filters for
+        snapshot = get_survey_snapshot()
         survey_id = request.query_params.get('survey')
-        survey = None
         if survey_id:
-            survey = Survey.objects.filter(id=survey_id).first()
+            survey = snapshot.get_survey(survey_id)
         else:
-            survey = Survey.objects.filter(is_default=True, is_active=True).first()
+            survey = snapshot.get_default_survey()
 
         if not survey:
             return
 
         # Dynamically create filters for each question in the selected survey
-        questions = Question.objects.filter(survey=survey).order_by('order')
-        for question in questions:
+        for question in survey.questions:
             # Main filter for the question
-            filter_name = f'question_{question.pk}'
+            filter_name = f'question_{question.id}'
             self.filters[filter_name] = filters.CharFilter(
                 field_name=filter_name, method='filter_by_question_answer'
             )
@@ -44,13 +44,12 @@ class SurveySubmissionAPIFilter(filters.FilterSet):
 
             # Add filters for option families if applicable
             if question.input_type in ["single_choice", "multiple_choice"]:
-                for root_option in question.options.filter(parent__isnull=True):
-                    if root_option.get_descendants().exists():
-                        family_filter_name = f'question_option_{question.pk}_{root_option.pk}'
-                        self.filters[family_filter_name] = filters.CharFilter(
-                            field_name=family_filter_name, method='filter_by_question_answer'
-                        )
-                        self.filters[family_filter_name].parent = self
+                for root_option in question.option_families:
+                    family_filter_name = f'question_option_{question.id}_{root_option.id}'
+                    self.filters[family_filter_name] = filters.CharFilter(
+                        field_name=family_filter_name, method='filter_by_question_answer'
+                    )
+                    self.filters[family_filter_name].parent = self
 
     def filter_by_question_answer(self, queryset, name, value):
         """
@@ -80,14 +79,16 @@ class SurveySubmissionAPIFilter(filters.FilterSet):
                 q_filter = Q(responses__question_id=question_id, responses__text_answer__icontains=filter_value)
             elif filter_type == 'option':
                 option_id = int(filter_value)
-                option = AnswerOption.objects.get(pk=option_id)
-                desc_ids = list(option.get_descendants(include_self=True).values_list('id', flat=True))
+                desc_ids = get_survey_snapshot().get_descendant_ids(option_id, include_self=True)
+                if not desc_ids:
+                    # Unknown option, ignore this filter
+                    return queryset
                 q_filter = Q(responses__question_id=question_id, responses__selected_options__id__in=desc_ids)
 
             if q_filter:
                 return queryset.filter(q_filter).distinct()
 
-        except (ValueError, IndexError, AnswerOption.DoesNotExist):
+        except (ValueError, IndexError):
             # If any parsing or database error occurs, ignore this filter and continue.
             return queryset
 
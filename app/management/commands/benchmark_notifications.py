@@ -0,0 +1,210 @@
+"""Management command to benchmark Telegram notifications and moderation callbacks."""
+import asyncio
+import time
+from datetime import datetime
+
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.types import CallbackQuery, Chat, Message, User
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from safedelete.models import HARD_DELETE
+
+from app.models import SurveySubmission, Response, Question, NotificationOutbox
+from app.utils.fake_bot_api import get_chat_id
+from app.utils.outbox import NotificationDispatcher, enqueue_submission_notifications
+from app.utils.status_table import get_status_table
+from app.utils.survey_registry import get_survey_snapshot
+from app.utils.telegram import handle_status_callback, handle_comment_callback
+from app.utils.telegram_dispatcher import telegram_dispatcher
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    return values[min(len(values) - 1, max(0, round(percent / 100 * len(values)) - 1))]
+
+
+class Command(BaseCommand):
+    """Command to measure notification latency and throughput."""
+
+    help = (
+        'Deliver the outbox notifications of synthetic submissions and replay moderation clicks on them, '
+        'reporting latency and throughput. Meant to run against `manage.py fake_bot_api`.'
+    )
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument('--count', type=int, default=100, help='Number of synthetic submissions')
+        parser.add_argument('--concurrency', type=int, default=10, help='Operations in flight at once')
+        parser.add_argument('--survey', type=int, help='Survey ID, the default survey if omitted')
+        parser.add_argument(
+            '--unthrottled',
+            action='store_true',
+            help='Lift TELEGRAM_GLOBAL_RATE and TELEGRAM_GROUP_RATE to measure the code rather than the pacing'
+        )
+        parser.add_argument('--keep', action='store_true', help='Keep the synthetic submissions')
+
+    def handle(self, *args, **options):
+        """Run the benchmark."""
+        if not settings.TELEGRAM_API_BASE_URL:
+            raise CommandError(
+                "TELEGRAM_API_BASE_URL is not set, the benchmark would message the real chat. "
+                "Start `manage.py fake_bot_api` and point TELEGRAM_API_BASE_URL at it."
+            )
+        if not all([
+            settings.TELEGRAM_BOT_TOKEN,
+            settings.TELEGRAM_CHAT_ID,
+            settings.TELEGRAM_NOTIFICATIONS_ENABLED
+        ]):
+            raise CommandError(
+                "Telegram notifications are not configured properly. "
+                "Check TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID and "
+                "TELEGRAM_NOTIFICATIONS_ENABLED settings."
+            )
+        if options['unthrottled']:
+            settings.TELEGRAM_GLOBAL_RATE = settings.TELEGRAM_GROUP_RATE = 1_000_000
+
+        snapshot = get_survey_snapshot()
+        survey = snapshot.get_survey(options['survey']) if options['survey'] else snapshot.get_default_survey()
+        if survey is None:
+            raise CommandError("Survey not found.")
+        statuses = get_status_table()
+        if statuses.default is None:
+            raise CommandError("No submission status exists.")
+
+        submission_ids = self.create_submissions(survey, statuses.default, options['count'])
+        self.stdout.write(f"Created {len(submission_ids)} synthetic submissions of '{survey.title}'")
+        try:
+            results, metrics = asyncio.run(self.benchmark(submission_ids, options['concurrency']))
+        finally:
+            if not options['keep']:
+                SurveySubmission.objects.filter(pk__in=submission_ids).delete(force_policy=HARD_DELETE)
+
+        self.stdout.write(f"{'Operation':<16}{'Count':>8}{'p50 ms':>10}{'p99 ms':>10}{'Per second':>12}")
+        for name, (latencies, elapsed) in results.items():
+            latencies.sort()
+            self.stdout.write(
+                f"{name:<16}{len(latencies):>8}"
+                f"{percentile(latencies, 50) * 1000:>10.1f}{percentile(latencies, 99) * 1000:>10.1f}"
+                f"{len(latencies) / elapsed:>12.1f}"
+            )
+        self.stdout.write(f"Telegram dispatcher: {metrics}")
+
+    @staticmethod
+    @transaction.atomic
+    def create_submissions(survey, status, count: int) -> list[int]:
+        """Create submissions answering every question of the survey, with their queued notifications."""
+        submissions = SurveySubmission.objects.bulk_create([
+            SurveySubmission(
+                survey_id=survey.id, status=status, source=SurveySubmission.Source.OTHER, comment='Benchmark'
+            )
+            for _ in range(count)
+        ])
+        responses, selected_options = [], []
+        for submission in submissions:
+            for question in survey.questions:
+                option = next((option for option in question.options if option.is_selectable), None)
+                if question.input_type == Question.InputType.TEXT:
+                    responses.append(Response(submission=submission, question_id=question.id, text_answer='Benchmark'))
+                    selected_options.append(None)
+                elif option is not None:
+                    responses.append(Response(submission=submission, question_id=question.id))
+                    selected_options.append(option.id)
+        Response.objects.bulk_create(responses)
+        SelectedOption = Response.selected_options.through
+        SelectedOption.objects.bulk_create([
+            SelectedOption(response_id=response.id, answeroption_id=option_id)
+            for response, option_id in zip(responses, selected_options)
+            if option_id is not None
+        ])
+        enqueue_submission_notifications(submissions)
+        # Due at once, digests of surveys with a window are still formed as in production
+        NotificationOutbox.objects.filter(submission__in=submissions).update(next_attempt_at=timezone.now())
+        return [submission.id for submission in submissions]
+
+    async def benchmark(self, submission_ids: list[int], concurrency: int):
+        """
+        Run every operation for all submissions.
+
+        Returns:
+            tuple: ({operation: (latencies, elapsed seconds)}, dispatcher metrics)
+        """
+        bot = telegram_dispatcher.attach()
+        try:
+            chat = Chat(id=get_chat_id({'chat_id': settings.TELEGRAM_CHAT_ID}), type='supergroup')
+            user = User(id=bot.id + 1, is_bot=False, first_name='Benchmark')
+            state = FSMContext(storage=MemoryStorage(), key=StorageKey(bot_id=bot.id, chat_id=chat.id, user_id=user.id))
+            new_status = next(
+                (status.code for status in get_status_table().statuses if not status.is_default),
+                get_status_table().default.code
+            )
+
+            def click(handler, data: str):
+                """Replay a click on the card of a submission."""
+                async def run(submission_id: int):
+                    message = Message(message_id=submission_id, date=datetime.now(), chat=chat, text='').as_(bot)
+                    callback_query = CallbackQuery(
+                        id=str(submission_id),
+                        from_user=user,
+                        chat_instance='benchmark',
+                        message=message,
+                        data=data.format(id=submission_id, status=new_status)
+                    ).as_(bot)
+                    await handler(callback_query, state)
+                return run
+
+            results = {'notify': await self.measure_outbox(concurrency)}
+            failed = await NotificationOutbox.objects.filter(submission_id__in=submission_ids).acount()
+            self.stdout.write(f"Finished notify, {failed} notifications not delivered")
+
+            operations = {
+                'show_status': click(handle_status_callback, 'show_status:{id}'),
+                'select_status': click(handle_status_callback, 'select_status:{id}:{status}'),
+                'apply_status': click(handle_status_callback, 'apply_status:{id}'),
+                'back_to_main': click(handle_status_callback, 'back_to_main:{id}'),
+                'comment_back': click(handle_comment_callback, 'comment_back:{id}'),
+            }
+            for name, operation in operations.items():
+                results[name] = await self.measure(operation, submission_ids, concurrency)
+                self.stdout.write(f"Finished {name}")
+            return results, telegram_dispatcher.get_metrics()
+        finally:
+            await telegram_dispatcher.close()
+
+    @staticmethod
+    async def measure_outbox(concurrency: int) -> tuple[list[float], float]:
+        """
+        Drain the outbox as `manage.py dispatch_notifications` does, ``concurrency`` messages at once.
+
+        The latency of a notification is the time from the start of the run,
+        when all of them are due, until its message was sent.
+        """
+        dispatcher = NotificationDispatcher(batch_size=concurrency)
+        latencies = []
+        started = time.perf_counter()
+        while batch := await dispatcher.claim_batch():
+            async def process(rows):
+                await dispatcher.process(rows)
+                latencies.extend([time.perf_counter() - started] * len(rows))
+
+            await asyncio.gather(*(process(rows) for rows in batch))
+        return latencies, time.perf_counter() - started
+
+    @staticmethod
+    async def measure(operation, submission_ids: list[int], concurrency: int) -> tuple[list[float], float]:
+        """Run an operation for every submission, at most ``concurrency`` at once."""
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+
+        async def run(submission_id: int):
+            async with semaphore:
+                started = time.perf_counter()
+                await operation(submission_id)
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(run(submission_id) for submission_id in submission_ids))
+        return latencies, time.perf_counter() - started
@@ -0,0 +1,65 @@
+"""Management command to deliver queued Telegram notifications."""
+import asyncio
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from app.utils.outbox import NotificationDispatcher
+from app.utils.telegram_dispatcher import telegram_dispatcher
+
+
+class Command(BaseCommand):
+    """Command to drain the notification outbox."""
+
+    help = 'Deliver Telegram notifications queued in the notification outbox'
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=20,
+            help='Maximum number of notifications claimed at once'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2.0,
+            help='Seconds to wait when no notification is due'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once no notification is due instead of waiting for new ones'
+        )
+
+    def handle(self, *args, **options):
+        """Run the dispatcher."""
+        if not all([
+            settings.TELEGRAM_BOT_TOKEN,
+            settings.TELEGRAM_CHAT_ID,
+            settings.TELEGRAM_NOTIFICATIONS_ENABLED
+        ]):
+            self.stderr.write(
+                "Telegram notifications are not configured properly. "
+                "Check TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID and "
+                "TELEGRAM_NOTIFICATIONS_ENABLED settings."
+            )
+            return
+
+        try:
+            self.stdout.write("Starting notification dispatcher...")
+            asyncio.run(self.dispatch(options))
+        except KeyboardInterrupt:
+            self.stdout.write("Notification dispatcher stopped by user")
+
+    @staticmethod
+    async def dispatch(options):
+        telegram_dispatcher.attach()
+        try:
+            dispatcher = NotificationDispatcher(
+                batch_size=options['batch_size'], poll_interval=options['poll_interval']
+            )
+            await dispatcher.run(once=options['once'])
+        finally:
+            await telegram_dispatcher.close()
@@ -0,0 +1,56 @@
+"""Management command to export survey submissions to Parquet files."""
+import os
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.models import SurveySubmission
+from app.resource import SurveySubmissionResource
+from app.utils.parquet_export import write_submissions_parquet
+from app.utils.survey_registry import get_survey_snapshot
+
+
+def parse_date(value: str) -> datetime:
+    try:
+        return datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD.")
+
+
+class Command(BaseCommand):
+    """Command to write one Parquet file per survey."""
+
+    help = 'Export the submissions of each survey to a Parquet file with typed columns, for loading into pandas'
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument('--output-dir', default='.', help='Directory the files are written to')
+        parser.add_argument(
+            '--survey',
+            type=int,
+            action='append',
+            help='Survey ID, may be repeated. All surveys if omitted'
+        )
+        parser.add_argument('--since', type=parse_date, help='Only submissions created on or after YYYY-MM-DD')
+        parser.add_argument('--until', type=parse_date, help='Only submissions created before YYYY-MM-DD')
+
+    def handle(self, *args, **options):
+        """Write the files."""
+        snapshot = get_survey_snapshot()
+        if options['survey']:
+            surveys = [snapshot.get_survey(survey_id) for survey_id in options['survey']]
+            if None in surveys:
+                raise CommandError("Survey not found.")
+        else:
+            surveys = list(snapshot.surveys.values())
+        os.makedirs(options['output_dir'], exist_ok=True)
+
+        for survey in surveys:
+            queryset = SurveySubmission.objects.filter(survey_id=survey.id).order_by('created_at', 'id')
+            if options['since']:
+                queryset = queryset.filter(created_at__gte=options['since'])
+            if options['until']:
+                queryset = queryset.filter(created_at__lt=options['until'])
+            path = os.path.join(options['output_dir'], f"{survey.slug or survey.id}.parquet")
+            count = write_submissions_parquet(SurveySubmissionResource(survey_id=survey.id), queryset, path)
+            self.stdout.write(f"Exported {count} submissions of '{survey.title}' to {path}")
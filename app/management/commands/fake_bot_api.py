@@ -0,0 +1,42 @@
+"""Management command to run a local stand-in for the Telegram Bot API."""
+from aiohttp import web
+from django.core.management.base import BaseCommand
+
+from app.utils.fake_bot_api import FakeBotAPI
+
+
+class Command(BaseCommand):
+    """Command to serve a fake Bot API."""
+
+    help = 'Serve a fake Telegram Bot API for load tests, see TELEGRAM_API_BASE_URL'
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument('--host', default='127.0.0.1', help='Interface to listen on')
+        parser.add_argument('--port', type=int, default=8081, help='Port to listen on')
+        parser.add_argument('--latency', type=float, default=0.05, help='Seconds every request takes')
+        parser.add_argument('--jitter', type=float, default=0.0, help='Random extra seconds added to the latency')
+        parser.add_argument(
+            '--flood-rate',
+            type=float,
+            default=0.0,
+            help='Share of requests rejected with 429 Too Many Requests, from 0 to 1'
+        )
+        parser.add_argument('--retry-after', type=int, default=1, help='retry_after of rejected requests')
+
+    def handle(self, *args, **options):
+        """Run the server until interrupted."""
+        api = FakeBotAPI(
+            latency=options['latency'],
+            jitter=options['jitter'],
+            flood_rate=options['flood_rate'],
+            retry_after=options['retry_after'],
+        )
+        self.stdout.write(
+            f"Fake Bot API listening on http://{options['host']}:{options['port']}, "
+            f"set TELEGRAM_API_BASE_URL to use it"
+        )
+        try:
+            web.run_app(api.create_app(), host=options['host'], port=options['port'], print=None)
+        finally:
+            self.stdout.write(f"Requests served: {dict(api.counters)}")
@@ -0,0 +1,39 @@
+"""Management command to persist survey submissions queued in Redis."""
+from django.core.management.base import BaseCommand
+
+from app.utils.submission_stream import SubmissionIngestor
+
+
+class Command(BaseCommand):
+    """Command to drain the survey submission stream."""
+
+    help = 'Persist survey submissions queued with SUBMISSION_INGESTION_MODE=stream'
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Maximum number of submissions written per transaction'
+        )
+        parser.add_argument(
+            '--block-ms',
+            type=int,
+            default=5000,
+            help='How long to wait for new submissions before polling again'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once the stream is empty instead of waiting for new submissions'
+        )
+
+    def handle(self, *args, **options):
+        """Run the ingestion loop."""
+        ingestor = SubmissionIngestor(batch_size=options['batch_size'], block_ms=options['block_ms'])
+        try:
+            self.stdout.write(f"Starting submission ingestor {ingestor.consumer}...")
+            ingestor.run(once=options['once'])
+        except KeyboardInterrupt:
+            self.stdout.write("Submission ingestor stopped by user")
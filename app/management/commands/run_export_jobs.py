@@ -0,0 +1,32 @@
+"""Management command to run queued submission exports."""
+from django.core.management.base import BaseCommand
+
+from app.utils.export_jobs import ExportWorker
+
+
+class Command(BaseCommand):
+    """Command to run export jobs."""
+
+    help = 'Run submission exports queued from the admin panel and the Telegram bot'
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=5.0,
+            help='Seconds to wait when no export is queued'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once no export is queued instead of waiting for new ones'
+        )
+
+    def handle(self, *args, **options):
+        """Run the worker."""
+        try:
+            self.stdout.write("Starting export worker...")
+            ExportWorker(poll_interval=options['poll_interval']).run(once=options['once'])
+        except KeyboardInterrupt:
+            self.stdout.write("Export worker stopped by user")
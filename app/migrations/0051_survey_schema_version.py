@@ -0,0 +1,23 @@
+# Generated by Django 5.0.2 on 2026-10-16 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0050_question_is_title_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="survey",
+            name="schema_version",
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                help_text="Incremented whenever questions, answer options or field types of this survey change",
+                verbose_name="Schema version",
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.2 on 2026-10-16 11:40
+
+import app.utils.regex
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0051_survey_schema_version"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="inputfieldtype",
+            name="regex_pattern",
+            field=models.CharField(
+                blank=True,
+                help_text="Regular expression pattern for field validation",
+                max_length=255,
+                validators=[app.utils.regex.validate_regex_pattern],
+                verbose_name="Regular Expression Pattern",
+            ),
+        ),
+    ]
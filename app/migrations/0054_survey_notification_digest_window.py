@@ -0,0 +1,22 @@
+# Generated by Django 5.0.2 on 2026-10-16 23:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0053_notificationoutbox"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="survey",
+            name="notification_digest_window",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="Submissions arriving within this many seconds are announced in one Telegram message. 0 sends a message for every submission.",
+                verbose_name="Notification digest window",
+            ),
+        ),
+    ]
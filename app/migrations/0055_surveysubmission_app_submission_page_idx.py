@@ -0,0 +1,19 @@
+# Generated by Django 5.0.2 on 2026-10-16 23:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0054_survey_notification_digest_window"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="surveysubmission",
+            index=models.Index(
+                fields=["survey", "-created_at", "-id"], name="app_submission_page_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,162 @@
+# Generated by Django 5.0.2 on 2026-10-16 23:10
+
+import app.models.exports
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0055_surveysubmission_app_submission_page_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExportJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Created at"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Updated at"),
+                ),
+                (
+                    "source",
+                    models.CharField(
+                        choices=[("admin", "Admin panel"), ("bot", "Telegram bot")],
+                        max_length=20,
+                        verbose_name="Source",
+                    ),
+                ),
+                (
+                    "filter_state",
+                    models.JSONField(
+                        blank=True, default=dict, verbose_name="Filter state"
+                    ),
+                ),
+                (
+                    "fingerprint",
+                    models.CharField(
+                        db_index=True,
+                        help_text="Hash of the exported query, columns and data version",
+                        max_length=64,
+                        verbose_name="Fingerprint",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("done", "Done"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                        verbose_name="Status",
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveIntegerField(default=0, verbose_name="Attempts"),
+                ),
+                (
+                    "progress",
+                    models.PositiveSmallIntegerField(
+                        default=0, verbose_name="Progress, %"
+                    ),
+                ),
+                (
+                    "total_count",
+                    models.PositiveIntegerField(default=0, verbose_name="Submissions"),
+                ),
+                (
+                    "exported_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Exported submissions"
+                    ),
+                ),
+                (
+                    "file",
+                    models.FileField(
+                        blank=True,
+                        max_length=255,
+                        upload_to=app.models.exports.get_export_upload_path,
+                        verbose_name="File",
+                    ),
+                ),
+                (
+                    "telegram_chat_id",
+                    models.BigIntegerField(
+                        blank=True, null=True, verbose_name="Telegram chat ID"
+                    ),
+                ),
+                (
+                    "telegram_thread_id",
+                    models.BigIntegerField(
+                        blank=True, null=True, verbose_name="Telegram topic ID"
+                    ),
+                ),
+                ("last_error", models.TextField(blank=True, verbose_name="Last error")),
+                (
+                    "started_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Started at"
+                    ),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Finished at"
+                    ),
+                ),
+                (
+                    "requested_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Requested by",
+                    ),
+                ),
+                (
+                    "survey",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="app.survey",
+                        verbose_name="Survey",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Export",
+                "verbose_name_plural": "Exports",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "created_at"], name="app_exportjob_queue_idx"
+                    )
+                ],
+            },
+        ),
+    ]
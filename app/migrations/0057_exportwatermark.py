@@ -0,0 +1,95 @@
+# Generated by Django 5.0.2 on 2026-10-16 23:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0056_exportjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExportWatermark",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Created at"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Updated at"),
+                ),
+                (
+                    "consumer",
+                    models.CharField(
+                        help_text="Name the consumer passes with its incremental exports",
+                        max_length=100,
+                        verbose_name="Consumer",
+                    ),
+                ),
+                (
+                    "filter_state",
+                    models.JSONField(blank=True, default=dict, verbose_name="Filter state"),
+                ),
+                (
+                    "scope",
+                    models.CharField(
+                        help_text="Hash of the survey and the filter state",
+                        max_length=64,
+                        verbose_name="Scope",
+                    ),
+                ),
+                (
+                    "last_updated_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Last change exported"
+                    ),
+                ),
+                (
+                    "last_id",
+                    models.PositiveBigIntegerField(
+                        default=0, verbose_name="Last submission exported"
+                    ),
+                ),
+                (
+                    "survey",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="app.survey",
+                        verbose_name="Survey",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Export watermark",
+                "verbose_name_plural": "Export watermarks",
+                "ordering": ["consumer"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("consumer", "scope"), name="unique_export_watermark_scope"
+                    )
+                ],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="surveysubmission",
+            index=models.Index(
+                fields=["survey", "updated_at", "id"], name="app_submission_changes_idx"
+            ),
+        ),
+    ]
@@ -1,3 +1,5 @@
 from app.models.pages import About, AboutHighlight, VisaType, VisaDocument, ResultCategory, Result, ContactInfo, UniversityLogo
 from app.models.survey import Response, SurveySubmission, Question, AnswerOption, InputFieldType, Survey
 from app.models.status import SubmissionStatus
+from app.models.notifications import NotificationOutbox
+from app.models.exports import ExportJob, ExportWatermark
@@ -0,0 +1,105 @@
+"""Models for background submission exports."""
+import uuid
+
+from django.conf import settings
+from django.db.models import (
+    CharField, TextField, PositiveIntegerField, PositiveSmallIntegerField, DateTimeField, BigIntegerField,
+    PositiveBigIntegerField, ForeignKey, FileField, JSONField, CASCADE, SET_NULL, TextChoices, Index, UniqueConstraint
+)
+from django.utils.translation import gettext_lazy as _
+
+from shared.django.models import TimeBaseModel
+
+
+def get_export_upload_path(instance, filename):
+    """Store every export under a random directory, so the file URL cannot be guessed."""
+    return f'exports/{uuid.uuid4().hex}/{filename}'
+
+
+class ExportJob(TimeBaseModel):
+    """
+    Export of survey submissions to an xlsx file, run by ``manage.py run_export_jobs``.
+
+    The job keeps what is needed to rebuild the exported queryset: the admin
+    changelist query string or the bot filter state. Finished files are kept
+    for settings.EXPORT_JOB_RETENTION seconds and reused by requests for the
+    same export (``fingerprint``) meanwhile.
+    """
+
+    class Source(TextChoices):
+        """Where the export was requested."""
+        ADMIN = 'admin', _('Admin panel')
+        BOT = 'bot', _('Telegram bot')
+
+    class Status(TextChoices):
+        """Processing states."""
+        PENDING = 'pending', _('Pending')
+        RUNNING = 'running', _('Running')
+        DONE = 'done', _('Done')
+        FAILED = 'failed', _('Failed')
+
+    source = CharField(_('Source'), max_length=20, choices=Source.choices)
+    survey = ForeignKey('app.Survey', SET_NULL, null=True, blank=True, verbose_name=_('Survey'), related_name='+')
+    filter_state = JSONField(_('Filter state'), default=dict, blank=True)
+    fingerprint = CharField(
+        _('Fingerprint'),
+        max_length=64,
+        db_index=True,
+        help_text=_('Hash of the exported query, columns and data version')
+    )
+    status = CharField(_('Status'), max_length=20, choices=Status.choices, default=Status.PENDING)
+    attempts = PositiveIntegerField(_('Attempts'), default=0)
+    progress = PositiveSmallIntegerField(_('Progress, %'), default=0)
+    total_count = PositiveIntegerField(_('Submissions'), default=0)
+    exported_count = PositiveIntegerField(_('Exported submissions'), default=0)
+    file = FileField(_('File'), upload_to=get_export_upload_path, max_length=255, blank=True)
+    requested_by = ForeignKey(
+        settings.AUTH_USER_MODEL, SET_NULL, null=True, blank=True, verbose_name=_('Requested by'), related_name='+'
+    )
+    telegram_chat_id = BigIntegerField(_('Telegram chat ID'), null=True, blank=True)
+    telegram_thread_id = BigIntegerField(_('Telegram topic ID'), null=True, blank=True)
+    last_error = TextField(_('Last error'), blank=True)
+    started_at = DateTimeField(_('Started at'), null=True, blank=True)
+    finished_at = DateTimeField(_('Finished at'), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _('Export')
+        verbose_name_plural = _('Exports')
+        ordering = ['-created_at']
+        indexes = [Index(fields=['status', 'created_at'], name='app_exportjob_queue_idx')]
+
+    def __str__(self):
+        return f"{_('Export')} #{self.pk}"
+
+
+class ExportWatermark(TimeBaseModel):
+    """
+    Position of an incremental export consumer, see app.utils.incremental_export.
+
+    The consumer has received every submission of one export scope (survey,
+    filters and search) changed up to (``last_updated_at``, ``last_id``).
+    A consumer exporting several surveys or filter sets has a watermark for
+    each. Deleting the watermark makes its next export a full one.
+    """
+
+    consumer = CharField(
+        _('Consumer'),
+        max_length=100,
+        help_text=_('Name the consumer passes with its incremental exports')
+    )
+    survey = ForeignKey('app.Survey', CASCADE, null=True, blank=True, verbose_name=_('Survey'), related_name='+')
+    filter_state = JSONField(_('Filter state'), default=dict, blank=True)
+    scope = CharField(_('Scope'), max_length=64, help_text=_('Hash of the survey and the filter state'))
+    last_updated_at = DateTimeField(_('Last change exported'), null=True, blank=True)
+    last_id = PositiveBigIntegerField(_('Last submission exported'), default=0)
+
+    class Meta:
+        verbose_name = _('Export watermark')
+        verbose_name_plural = _('Export watermarks')
+        ordering = ['consumer']
+        constraints = [
+            UniqueConstraint(fields=['consumer', 'scope'], name='unique_export_watermark_scope'),
+        ]
+
+    def __str__(self):
+        return self.consumer
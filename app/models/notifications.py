@@ -0,0 +1,53 @@
+"""Models for outgoing Telegram notifications."""
+
+from django.db.models import (
+    CharField, TextField, PositiveIntegerField, DateTimeField, ForeignKey, CASCADE, TextChoices, Index
+)
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from shared.django.models import TimeBaseModel
+
+
+class NotificationOutbox(TimeBaseModel):
+    """
+    Notification waiting to be delivered to Telegram.
+
+    Rows are written in the same transaction as the object they are about and
+    delivered by ``manage.py dispatch_notifications``. Delivered rows are
+    deleted, rows that keep failing end up with the ``failed`` status.
+    """
+
+    class Kind(TextChoices):
+        """Kinds of notifications."""
+        NEW_SUBMISSION = 'new_submission', _('New submission')
+
+    class Status(TextChoices):
+        """Delivery states."""
+        PENDING = 'pending', _('Pending')
+        FAILED = 'failed', _('Failed')
+
+    kind = CharField(_('Kind'), max_length=50, choices=Kind.choices, default=Kind.NEW_SUBMISSION)
+    submission = ForeignKey(
+        'app.SurveySubmission',
+        CASCADE,
+        verbose_name=_('Submission'),
+        related_name='notifications'
+    )
+    status = CharField(_('Status'), max_length=20, choices=Status.choices, default=Status.PENDING)
+    attempts = PositiveIntegerField(_('Attempts'), default=0)
+    next_attempt_at = DateTimeField(
+        _('Next attempt at'),
+        default=timezone.now,
+        help_text=_('The notification is not sent before this time')
+    )
+    last_error = TextField(_('Last error'), blank=True)
+
+    class Meta:
+        verbose_name = _('Notification')
+        verbose_name_plural = _('Notifications')
+        ordering = ['next_attempt_at', 'id']
+        indexes = [Index(fields=['status', 'next_attempt_at'], name='app_outbox_due_idx')]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.submission_id}"
@@ -2,7 +2,7 @@
 
 from django.db.models import (
     CharField, TextField, PositiveIntegerField, ForeignKey, CASCADE, PROTECT,
-    TextChoices, ManyToManyField, UniqueConstraint, BooleanField, SlugField, Q, CheckConstraint, F, IntegerField
+    TextChoices, ManyToManyField, UniqueConstraint, BooleanField, SlugField, Q, CheckConstraint, F, IntegerField, Index
 )
 from django.urls import reverse
 from django.db.models import Q, UniqueConstraint
@@ -11,12 +11,12 @@ from mptt.fields import TreeForeignKey
 from mptt.models import MPTTModel
 
 from app.fields import FrontContentField
+from app.utils.regex import validate_regex_pattern
 from shared.django import BaseModel
 from shared.django.models import TimeBaseModel
 from django.db import transaction
 from django.core.exceptions import ValidationError
 from django.conf import settings
-from asgiref.sync import async_to_sync
 import logging
 
 logger = logging.getLogger(__name__)
@@ -45,7 +45,8 @@ class InputFieldType(BaseModel):
         _('Regular Expression Pattern'),
         max_length=255,
         help_text=_('Regular expression pattern for field validation'),
-        blank=True
+        blank=True,
+        validators=[validate_regex_pattern]
     )
     error_message = CharField(
         _('Error Message'),
@@ -83,6 +84,21 @@ class Survey(TimeBaseModel):
         _('Telegram Topic ID'),
         help_text=_('The ID of the Telegram topic associated with this survey.')
     )
+    notification_digest_window = PositiveIntegerField(
+        _('Notification digest window'),
+        default=0,
+        help_text=_(
+            'Submissions arriving within this many seconds are announced in one Telegram message. '
+            '0 sends a message for every submission.'
+        )
+    )
+
+    schema_version = PositiveIntegerField(
+        _('Schema version'),
+        default=0,
+        editable=False,
+        help_text=_('Incremented whenever questions, answer options or field types of this survey change')
+    )
 
     front_content = FrontContentField(
         _('Frontend Content'),
@@ -110,10 +126,8 @@ class Survey(TimeBaseModel):
         return self.title
 
     def clean(self):
-        from app.utils.telegram import (
-            get_bot_instance,
-            check_telegram_permissions_and_forum_status,
-        )
+        from app.utils.telegram import check_telegram_permissions_and_forum_status
+        from app.utils.telegram_dispatcher import telegram_dispatcher
 
         super().clean()
 
@@ -136,10 +150,6 @@ class Survey(TimeBaseModel):
             raise ValidationError(_('Telegram bot token is not configured.'))
 
         try:
-            bot = async_to_sync(get_bot_instance)()
-            if not bot:
-                raise ValidationError(_('Failed to initialize Telegram bot.'))
-
             is_new = not self.pk
             title_changed = False
             if not is_new:
@@ -150,7 +160,7 @@ class Survey(TimeBaseModel):
                     title_changed = True
 
             if is_new or title_changed:
-                can_manage, perm_msg = async_to_sync(check_telegram_permissions_and_forum_status)(bot, chat_id)
+                can_manage, perm_msg = telegram_dispatcher.call(check_telegram_permissions_and_forum_status, chat_id)
                 if not can_manage:
                     raise ValidationError(
                         _('Telegram 1'
@@ -165,11 +175,8 @@ class Survey(TimeBaseModel):
             raise ValidationError(_('Unexpected error in Telegram validation: %(err)s') % {'err': str(e)})
 
     def save(self, *args, **kwargs):
-        from app.utils.telegram import (
-            get_bot_instance,
-            create_telegram_forum_topic,
-            edit_telegram_forum_topic,
-        )
+        from app.utils.telegram import create_telegram_forum_topic, edit_telegram_forum_topic
+        from app.utils.telegram_dispatcher import telegram_dispatcher
 
         is_new = not self.pk
         title_changed = False
@@ -190,13 +197,8 @@ class Survey(TimeBaseModel):
                 return
 
             try:
-                bot = async_to_sync(get_bot_instance)()
-                if not bot:
-                    logger.error("Bot instance is None after successful clean().")
-                    return
-
                 if is_new:
-                    topic_id = async_to_sync(create_telegram_forum_topic)(bot, chat_id, self.title)
+                    topic_id = telegram_dispatcher.call(create_telegram_forum_topic, chat_id, self.title)
                     if not topic_id:
                         raise ValidationError(_('Survey saved, but failed to create Telegram topic.'))
                     # Survey.objects.filter(pk=self.pk).update(telegram_topic_id=topic_id)
@@ -205,7 +207,7 @@ class Survey(TimeBaseModel):
                 elif title_changed:
                     if not self.telegram_topic_id:
                         raise ValidationError(_('Cannot update Telegram topic title: topic ID missing.'))
-                    success = async_to_sync(edit_telegram_forum_topic)(bot, chat_id, self.telegram_topic_id, self.title)
+                    success = telegram_dispatcher.call(edit_telegram_forum_topic, chat_id, self.telegram_topic_id, self.title)
                     if not success:
                         raise ValidationError(_('Failed to update Telegram topic title.'))
 
@@ -377,6 +379,12 @@ class SurveySubmission(BaseModel):
     class Meta:
         verbose_name = _('Survey Submission')
         verbose_name_plural = _('Survey Submissions')
+        indexes = [
+            # Newest first pages of a survey, see bot.filters.SurveyFilter.get_submissions_page
+            Index(fields=['survey', '-created_at', '-id'], name='app_submission_page_idx'),
+            # Changes of a survey since a watermark, see app.utils.incremental_export
+            Index(fields=['survey', 'updated_at', 'id'], name='app_submission_changes_idx'),
+        ]
 
     def __str__(self):
         return f"Submission {self.id} - {self.status}"
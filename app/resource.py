@@ -1,15 +1,11 @@
-import io
-import time
 import tablib
 from django.db.models import Prefetch
 from django.utils.translation import gettext_lazy as _
 from import_export import resources, fields
 from import_export.resources import ModelResource
-from openpyxl import load_workbook
-from openpyxl.styles import Alignment, Font, PatternFill
-from openpyxl.utils import get_column_letter
 
 from app.models import SurveySubmission, Question, Response, AnswerOption, InputFieldType
+from app.utils.export_plan import Answer, get_export_plan
 
 
 class SurveySubmissionResource(resources.ModelResource):
@@ -24,72 +20,18 @@ class SurveySubmissionResource(resources.ModelResource):
     id = fields.Field(column_name=_('ID'), attribute='id')
     status = fields.Field(column_name=_('Status'), attribute='status')
     created_at = fields.Field(column_name=_('Created At'), attribute='created_at')
+    updated_at = fields.Field(column_name=_('Updated At'), attribute='updated_at')
+    deleted = fields.Field(column_name=_('Deleted At'), attribute='deleted')
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        # Create a cache and a set of hierarchical options for each question
-        self.hierarchical_options = {}
-        # Get survey_id from kwargs
-        survey_id = kwargs.pop('survey_id', None)
-
-        # Filter questions based on survey_id
-        questions_queryset = Question.objects.select_related('field_type')
-
-        if survey_id:
-            questions_queryset = questions_queryset.filter(survey_id=survey_id)
-            # print(f"Resource using explicit survey_id: {survey_id}")
-        else:
-            # If survey_id is not passed, try to find the default survey
-            from app.models import Survey  # Import here to avoid circular import
-            default_survey = Survey.objects.filter(is_default=True).first()
-            if default_survey:
-                questions_queryset = questions_queryset.filter(survey_id=default_survey.id)
-                # print(f"Resource using default survey_id: {default_survey.id}")
-            # else:
-                # print("Resource: No survey_id provided and no default survey found. Exporting all questions.")
-                # If there is no survey_id and no default survey, load all questions (current behavior)
-                # or you can do questions_queryset = questions_queryset.none() if that is preferred
-                pass
-
-        questions = questions_queryset.order_by('order')
-        self.questions_for_export = list(questions)  # Store for get_export_order
-        for question in self.questions_for_export:
-            # Если вопрос с выбором, вычисляем иерархические варианты
-            if question.input_type in ['single_choice', 'multiple_choice']:
-                root_options = question.options.filter(parent__isnull=True).order_by('order', 'text')
-                hierarchical_ids = set()
-                for root_option in root_options:
-                    # Если у корневого варианта есть потомки, то они будут в отдельной колонке
-                    if root_option.get_descendants().exists():
-                        descendant_ids = list(root_option.get_descendants().values_list('id', flat=True))
-                        hierarchical_ids.update(descendant_ids)
-                        hierarchical_ids.add(root_option.id)
-                self.hierarchical_options[question.id] = hierarchical_ids
-
-            # Основное поле для вопроса
-            field_name = f"question_{question.id}"
-            field_label = question.field_type.field_key if (
-                        question.field_type and question.field_type.field_key) else question.title
-            self.fields[field_name] = fields.Field(column_name=field_label, attribute=None)
-            self.fields[field_name].question_id = question.id
-            # Захватываем id вопроса через аргумент по умолчанию
-            setattr(self, f"dehydrate_{field_name}",
-                    lambda obj, qid=question.id: self._get_question_value(obj, qid))
-
-            # Для вопросов с выбором с иерархическими опциями добавляем отдельные поля
-            if question.input_type in ['single_choice', 'multiple_choice']:
-                root_options = question.options.filter(parent__isnull=True).order_by('order', 'text')
-                for root_option in root_options:
-                    if root_option.get_descendants().exists():
-                        sub_field_name = f"question_option_{question.id}_{root_option.id}"
-                        sub_field_label = root_option.text
-                        self.fields[sub_field_name] = fields.Field(column_name=sub_field_label, attribute=None)
-                        self.fields[sub_field_name].question_id = question.id
-                        self.fields[sub_field_name].root_option_id = root_option.id
-                        setattr(self, f"dehydrate_{sub_field_name}",
-                                lambda obj, qid=question.id, roid=root_option.id: self._get_question_option_value(obj,
-                                                                                                                  qid,
-                                                                                                                  roid))
+        # Incremental exports also carry the change time and the deletion time of tombstones
+        self.incremental = kwargs.get('incremental', False)
+        # Question columns, labels and option groups are compiled once per survey snapshot
+        self.plan = get_export_plan(kwargs.get('survey_id'))
+        self.plan_columns = {column.key: column for column in self.plan.columns}
+        for column in self.plan.columns:
+            self.fields[column.key] = fields.Field(column_name=column.label, attribute=None)
 
     def get_queryset(self):
         """
@@ -107,79 +49,10 @@ class SurveySubmissionResource(resources.ModelResource):
         """
         Define the order of fields in the export.
         """
-        # Standard fields
-        fields_order = ['id', 'status', 'created_at']
-        # Add question fields and additional columns for hierarchical options
-        # Use filtered questions from __init__
-        questions = getattr(self, 'questions_for_export', [])
-        for question in questions:
-            fields_order.append(f"question_{question.id}")
-            if question.input_type in ['single_choice', 'multiple_choice']:
-                root_options = question.options.filter(parent__isnull=True).order_by('order', 'text')
-                for root_option in root_options:
-                    if root_option.get_descendants().exists():
-                        fields_order.append(f"question_option_{question.id}_{root_option.id}")
-        return fields_order
-
-    def _get_question_value(self, submission, question_id):
-        """
-        Return the aggregated answer for a question, excluding hierarchical options.
-        Это значение включает только те ответы, которые не попали в отдельные колонки.
-        """
-        if submission.id not in self._cached_responses or question_id not in self._cached_responses[submission.id]:
-            return ''
-        response = self._cached_responses[submission.id][question_id]
-
-        input_type = response.question.input_type
-        field_type = response.question.field_type.field_type_choice if response.question.field_type else None
-
-        if input_type == Question.InputType.TEXT:
-            if field_type == InputFieldType.FieldTypeChoice.NUMBER:
-                try:
-                    return float(response.text_answer) if response.text_answer and response.text_answer.strip() else ''
-                except (ValueError, TypeError):
-                    pass
-            return response.text_answer or ''
-
-        selected_options = list(response.selected_options.all())
-        if selected_options:
-            # Для вопросов с выбором исключаем те опции, которые уже выводятся в отдельных колонках
-            if input_type in ['single_choice', 'multiple_choice']:
-                hierarchical_ids = self.hierarchical_options.get(response.question.id, set())
-                non_hierarchical_options = [opt for opt in selected_options if opt.id not in hierarchical_ids]
-            else:
-                non_hierarchical_options = selected_options
-
-            if non_hierarchical_options:
-                option_texts = [opt.export_field_name if opt.export_field_name else opt.text for opt in
-                                non_hierarchical_options]
-                custom_option = [opt for opt in non_hierarchical_options if opt.has_custom_input]
-                if custom_option and response.text_answer:
-                    return f"{', '.join(option_texts)} - {response.text_answer}"
-                return ', '.join(option_texts)
-
-        return response.text_answer or ''
-
-    def _get_question_option_value(self, submission, question_id, root_option_id):
-        """
-        Return the answer value for a specific root option group.
-        Фильтруем выбранные опции, чтобы включить только те, что принадлежат заданной группе.
-        """
-        if submission.id not in self._cached_responses or question_id not in self._cached_responses[submission.id]:
-            return ''
-        response = self._cached_responses[submission.id][question_id]
-        selected_options = list(response.selected_options.all())
-        from app.models import AnswerOption
-        # Получаем все descendant'ы для заданного корневого варианта
-        descendant_ids = list(
-            AnswerOption.objects.get(pk=root_option_id).get_descendants().values_list('id', flat=True))
-        # Включаем и сам корневой вариант
-        group_ids = set(descendant_ids + [root_option_id])
-        filtered_options = [opt for opt in selected_options if opt.id in group_ids]
-        option_texts = [opt.export_field_name if opt.export_field_name else opt.text for opt in filtered_options]
-        if filtered_options:
-            return ", ".join(option_texts)
-        return ''
+        order = ['id', 'status', 'created_at']
+        if self.incremental:
+            order += ['updated_at', 'deleted']
+        return order + [column.key for column in self.plan.columns]
 
     # Оптимизация экспорта через кэширование ответов
     _cached_responses = {}
@@ -189,15 +62,30 @@ class SurveySubmissionResource(resources.ModelResource):
         Override before_export to prefetch all responses and cache them for performance.
         """
         super().before_export(queryset, *args, **kwargs)
-        submission_ids = list(queryset.values_list('id', flat=True))
-        all_responses = Response.objects.filter(submission_id__in=submission_ids).select_related(
-            'question', 'question__field_type'
-        ).prefetch_related('selected_options')
+        self.cache_responses(list(queryset.values_list('id', flat=True)))
+
+    def cache_responses(self, submission_ids):
+        """
+        Load and cache the answers of the given submissions, replacing the cached ones.
+
+        Only the answer values are read, two queries in total, as the questions
+        and options they refer to are described by the export plan. They
+        bypass cacheops, which would otherwise copy every exported answer to
+        Redis.
+        """
+        option_ids = {}
+        for response_id, option_id in Response.selected_options.through.objects.nocache().filter(
+            response__submission_id__in=submission_ids
+        ).values_list('response_id', 'answeroption_id'):
+            option_ids.setdefault(response_id, []).append(option_id)
+
         self._cached_responses = {}
-        for response in all_responses:
-            if response.submission_id not in self._cached_responses:
-                self._cached_responses[response.submission_id] = {}
-            self._cached_responses[response.submission_id][response.question_id] = response
+        for response_id, submission_id, question_id, text_answer in Response.objects.nocache().filter(
+            submission_id__in=submission_ids
+        ).values_list('id', 'submission_id', 'question_id', 'text_answer'):
+            self._cached_responses.setdefault(submission_id, {})[question_id] = Answer(
+                text_answer, option_ids.get(response_id, [])
+            )
 
     def get_export_headers(self):
         """
@@ -222,12 +110,9 @@ class SurveySubmissionResource(resources.ModelResource):
         """
         row = []
         for field_name in fields:
-            if field_name.startswith('question_'):
-                method = getattr(self, f"dehydrate_{field_name}", None)
-                if method:
-                    value = method(obj)
-                else:
-                    value = ''
+            column = self.plan_columns.get(field_name)
+            if column is not None:
+                value = self.plan.get_value(column, self._cached_responses.get(obj.id, {}).get(column.question_id))
             else:
                 field = self.fields.get(field_name)
                 if field:
@@ -254,6 +139,9 @@ class SurveySubmissionResource(resources.ModelResource):
     def export(self, queryset=None, *args, **kwargs):
         """
         Export data to a Dataset.
+
+        The admin and the bot export xlsx with app.utils.xlsx_export instead,
+        which streams the rows rather than building a Dataset.
         """
         self.before_export(queryset, *args, **kwargs)
         if queryset is None:
@@ -272,57 +160,6 @@ class SurveySubmissionResource(resources.ModelResource):
             row = self.export_resource_fields(obj, export_order)
             dataset.append(row)
 
-        # Форматируем Excel если это xlsx формат
-        file_format = kwargs.get('file_format', None)
-        if file_format and hasattr(file_format, 'get_extension') and file_format.get_extension() == 'xlsx':
-            try:
-                # Экспортируем данные в Excel
-                xlsx_data = io.BytesIO()
-                file_format.export_data(dataset, xlsx_data)
-                xlsx_data.seek(0)
-
-                # Загружаем рабочую книгу
-                wb = load_workbook(xlsx_data)
-                ws = wb.active
-
-                # Форматируем заголовки
-                header_fill = PatternFill(start_color='E6E6E6', end_color='E6E6E6', fill_type='solid')
-                for idx, cell in enumerate(ws[1], 1):
-                    cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-                    cell.font = Font(bold=True, size=11)
-                    cell.fill = header_fill
-
-                    # Устанавливаем ширину колонок
-                    column = get_column_letter(idx)
-                    max_length = len(str(cell.value))
-
-                    # Проверяем длину данных в колонке
-                    for row in range(2, ws.max_row + 1):
-                        cell_value = str(ws[f"{column}{row}"].value or "")
-                        max_length = max(max_length, len(cell_value))
-
-                    # Устанавливаем ширину с ограничениями
-                    adjusted_width = min(50, max(12, max_length + 2))
-                    ws.column_dimensions[column].width = adjusted_width
-
-                # Форматируем данные
-                for row in ws.iter_rows(min_row=2):
-                    for cell in row:
-                        cell.alignment = Alignment(vertical='center', wrap_text=True)
-
-                # Сохраняем отформатированный файл
-                output = io.BytesIO()
-                wb.save(output)
-                output.seek(0)
-
-                # Создаем новый dataset с отформатированными данными
-                formatted_dataset = tablib.Dataset()
-                formatted_dataset.xlsx = output.getvalue()
-                dataset = formatted_dataset
-
-            except Exception as e:
-                print(f"Error during Excel formatting: {str(e)}")
-
         self.after_export(queryset, dataset, *args, **kwargs)
         return dataset
 
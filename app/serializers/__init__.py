@@ -2,6 +2,7 @@ from app.serializers.pages import (AboutPreviewSerializer, AboutDetailSerializer
                                    VisaTypeDetailSerializer, ResultCategoryPreviewSerializer,
                                    ResultCategoryDetailSerializer, UniversityLogoSerializer,
                                    ContactInfoSerializer)
-from app.serializers.survey import AnswerOptionSerializer, QuestionSerializer, SurveySubmissionSerializer
+from app.serializers.survey import AnswerOptionSerializer, QuestionSerializer, SurveySubmissionSerializer, \
+    SubmissionTicketSerializer
 from app.serializers.visa import VisaStatusCheckInputSerializer, VisaStatusCheckResponseSerializer, \
     VisaPDFDownloadSerializer
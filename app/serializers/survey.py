@@ -1,13 +1,21 @@
+from collections.abc import Mapping
+
 from drf_spectacular.utils import extend_schema_field
 from rest_framework.exceptions import ValidationError
 from rest_framework.fields import SerializerMethodField
-from rest_framework.relations import PrimaryKeyRelatedField
-from rest_framework.serializers import ModelSerializer, CharField
+from rest_framework.serializers import ModelSerializer, Serializer, CharField, IntegerField, DictField
+from django.conf import settings
+from django.db import transaction
+from django.db.models import prefetch_related_objects
 from django.utils.translation import gettext_lazy as _
-import re
 
 from app.models import Question, AnswerOption, SurveySubmission, Response, InputFieldType, Survey
-from app.utils.telegram import notify_new_submission_async
+from app.utils.option_tree import AnswerOptionTree
+from app.utils.outbox import enqueue_submission_notifications
+from app.utils.regex import get_field_type_regex
+from app.utils.status_table import get_status_table
+from app.utils.survey_registry import get_survey_snapshot
+from shared.django import PreloadedPrimaryKeyRelatedField
 
 
 class InputFieldTypeSerializer(ModelSerializer):
@@ -27,8 +35,10 @@ class AnswerOptionSerializer(ModelSerializer):
         fields = 'id', 'text', 'is_selectable', 'has_custom_input', 'children'
 
     def get_children(self, obj) -> dict:
-        """Get children of answer option."""
-        return AnswerOptionSerializer(obj.get_children(), many=True).data
+        """Get children of answer option, from the preloaded option tree when available."""
+        tree = self.context.get('option_tree')
+        children = tree.get_children(obj.id) if tree is not None else obj.get_children()
+        return AnswerOptionSerializer(children, many=True, context=self.context).data
 
 
 class SurveySerializer(ModelSerializer):
@@ -41,7 +51,7 @@ class SurveySerializer(ModelSerializer):
 
 class QuestionSerializer(ModelSerializer):
     """Serializer for Question model."""
-    options = AnswerOptionSerializer(many=True, read_only=True)
+    options = SerializerMethodField()
     field_type = InputFieldTypeSerializer(read_only=True)
     # survey = SurveySerializer(read_only=True)
 
@@ -49,10 +59,25 @@ class QuestionSerializer(ModelSerializer):
         model = Question
         fields = 'id', 'title', 'input_type', 'options', 'field_type', 'is_required', 'placeholder'
 
+    @extend_schema_field(AnswerOptionSerializer(many=True))
+    def get_options(self, obj):
+        """
+        Get top level options of the question with their nested children.
+
+        The whole option forest is assembled from the ``option_tree`` context
+        entry; without one, a tree is loaded for this question alone.
+        """
+        tree = self.context.get('option_tree')
+        if tree is None:
+            tree = AnswerOptionTree([obj.id])
+        context = {**self.context, 'option_tree': tree}
+        return AnswerOptionSerializer(tree.get_roots(obj.id), many=True, context=context).data
+
 
 class ResponseSerializer(ModelSerializer):
     """Response serializer."""
-    selected_options = PrimaryKeyRelatedField(
+    question = PreloadedPrimaryKeyRelatedField(queryset=Question.objects.select_related('field_type'))
+    selected_options = PreloadedPrimaryKeyRelatedField(
         many=True, queryset=AnswerOption.objects.filter(is_selectable=True), required=False
     )
     
@@ -65,7 +90,7 @@ class ResponseSerializer(ModelSerializer):
         """Validate response data."""
         question = attrs.get('question')
         selected_options = attrs.get('selected_options', [])
-        text_answer = attrs.get('text_answer', '')
+        text_answer = attrs.get('text_answer') or ''
         
         # Check if there is an answer depending on the question type
         if question.input_type == Question.InputType.TEXT and question.is_required and not text_answer:
@@ -92,16 +117,19 @@ class ResponseSerializer(ModelSerializer):
                     })
 
         # Check regex validation if the question has a field_type with a regular expression
-        if (
-                question.input_type == Question.InputType.TEXT
-                and question.field_type
-                and question.field_type.regex_pattern.strip()  # Check that regex is not empty
-        ):
-            pattern = question.field_type.regex_pattern
-            if not re.fullmatch(pattern, text_answer):
-                error_message = question.field_type.error_message or _(
-                    'Text answer does not match the required format.')
-                raise ValidationError({'text_answer': error_message})
+        if question.input_type == Question.InputType.TEXT and question.field_type:
+            regex = get_field_type_regex(question.field_type)
+            if regex is not None:
+                # Cap the input length so matching time stays bounded
+                max_length = settings.SURVEY_REGEX_INPUT_MAX_LENGTH
+                if len(text_answer) > max_length:
+                    raise ValidationError({
+                        'text_answer': _('Text answer must be at most {} characters long.').format(max_length)
+                    })
+                if not regex.fullmatch(text_answer):
+                    error_message = question.field_type.error_message or _(
+                        'Text answer does not match the required format.')
+                    raise ValidationError({'text_answer': error_message})
 
         return attrs
 
@@ -110,64 +138,82 @@ class SurveySubmissionSerializer(ModelSerializer):
     """Survey submission serializer."""
     responses = ResponseSerializer(many=True)
     status = CharField(read_only=True)
-    survey_id = PrimaryKeyRelatedField(queryset=Survey.objects.filter(is_active=True), required=False, write_only=True)
+    survey_id = PreloadedPrimaryKeyRelatedField(
+        queryset=Survey.objects.filter(is_active=True), required=False, write_only=True
+    )
     
     class Meta:
         """Metaclass."""
         model = SurveySubmission
         fields = 'id', 'status', 'source', 'responses', 'created_at', 'updated_at', 'survey_id'
-    
+
+    def to_internal_value(self, data):
+        """Resolve all referenced objects in bulk before field validation."""
+        self.preload_references(data)
+        return super().to_internal_value(data)
+
+    def preload_references(self, data):
+        """
+        Fetch every question, answer option and survey referenced by the payload.
+
+        Each model is loaded with a single query, the related fields then resolve
+        their primary keys from memory instead of querying one by one.
+        """
+        if not isinstance(data, Mapping) or not isinstance(data.get('responses'), list):
+            return
+
+        question_ids = []
+        option_ids = []
+        for response in data['responses']:
+            if not isinstance(response, Mapping):
+                continue
+            question_ids.append(response.get('question'))
+            if isinstance(response.get('selected_options'), list):
+                option_ids.extend(response['selected_options'])
+
+        response_fields = self.fields['responses'].child.fields
+        response_fields['question'].preload(question_ids)
+        response_fields['selected_options'].child_relation.preload(option_ids)
+        self.fields['survey_id'].preload([data.get('survey_id')])
+
     def validate_responses(self, responses):
         """Validate that all required questions have responses."""
         # Get IDs of all questions in the responses
         question_ids = [response['question'].id for response in responses]
 
         # Get survey ID from context or use default survey
+        snapshot = get_survey_snapshot()
         survey_id = self.initial_data.get('survey_id')
         if not survey_id:
             # If survey_id is not provided, use the default survey
-            try:
-                default_survey = Survey.objects.get(is_default=True, is_active=True)
-                survey_id = default_survey.id
-            except Survey.DoesNotExist:
-                # No default survey found - consider all questions
-                survey_filter = {}
+            default_survey = snapshot.get_default_survey()
+            survey_id = default_survey.id if default_survey else None
         else:
             # Check if the survey exists and is active
             try:
-                Survey.objects.get(id=survey_id, is_active=True)
-                survey_filter = {'survey_id': survey_id}
-            except Survey.DoesNotExist:
-                raise ValidationError(_('The specified survey does not exist or is not active.'))
-            except ValueError:
+                survey_id = self.fields['survey_id'].to_internal_value(survey_id).id
+            except ValidationError as e:
+                if 'does_not_exist' in e.get_codes():
+                    raise ValidationError(_('The specified survey does not exist or is not active.'))
                 raise ValidationError({'survey_id': _('Survey ID is invalid.')})
 
-        # Check if survey id is available
-        try:
-            survey_id = int(survey_id)
-        except ValueError:
-            raise ValidationError({'survey_id': _('Survey ID is invalid.')})
-
-        # Check all questions belongs to current survey or not
-        survey_ids = Question.objects.filter(id__in=question_ids).values_list('survey_id', flat=True).distinct()
-        if survey_ids.count() != 1 or survey_ids[0] != survey_id:
-            raise ValidationError(_('Not all questions belong to the current survey.'))
-
-
-        # Get a list of all required questions for this survey
-        if 'survey_filter' in locals():
-            required_questions = Question.objects.filter(is_required=True, **survey_filter)
+        if survey_id is not None:
+            # Check all questions belongs to current survey or not
+            survey_ids = {response['question'].survey_id for response in responses}
+            if survey_ids != {survey_id}:
+                raise ValidationError(_('Not all questions belong to the current survey.'))
+            questions = snapshot.get_questions(survey_id)
         else:
-            required_questions = Question.objects.filter(is_required=True)
-            
-        required_question_ids = set(required_questions.values_list('id', flat=True))
-        
+            # No default survey found - consider all questions
+            questions = snapshot.get_questions()
+
         # Check that all required questions have answers
-        missing_question_ids = required_question_ids - set(question_ids)
-        if missing_question_ids:
-            missing_questions = [
-                q.title for q in required_questions if q.id in missing_question_ids
-            ]
+        answered_question_ids = set(question_ids)
+        missing_questions = [
+            question.title for question in questions
+            if question.is_required and question.id not in answered_question_ids
+        ]
+        if missing_questions:
             raise ValidationError(_('Missing responses for questions: {}').format(
                 ', '.join(missing_questions)
             ))
@@ -178,57 +224,112 @@ class SurveySubmissionSerializer(ModelSerializer):
         
         return responses
     
+    def get_ingestion_payload(self) -> dict:
+        """
+        Return the validated data as JSON-serializable primitives.
+
+        Related objects are replaced by their IDs, so the payload can be
+        validated again by this serializer once it is taken off the
+        ingestion stream.
+        """
+        data = self.validated_data
+        payload = {'responses': []}
+        if 'source' in data:
+            payload['source'] = data['source']
+        if data.get('survey_id'):
+            payload['survey_id'] = data['survey_id'].id
+        for response_data in data['responses']:
+            response = {
+                'question': response_data['question'].id,
+                'selected_options': [option.id for option in response_data.get('selected_options', [])],
+            }
+            if 'text_answer' in response_data:
+                response['text_answer'] = response_data['text_answer']
+            payload['responses'].append(response)
+        return payload
+
     def create(self, validated_data):
-        """Create survey submission with responses."""
-        from app.models.status import SubmissionStatus
-        
-        # Get response data from validated_data
-        responses_data = validated_data.pop('responses')
-        
-        # Handle survey_id if provided
-        survey_id = validated_data.pop('survey_id', None)
-        if survey_id:
-            # If survey_id is provided, set it directly
-            validated_data['survey'] = survey_id
-        else:
-            # If no survey_id is provided, use the default survey
-            try:
-                default_survey = Survey.objects.get(is_default=True, is_active=True)
-                validated_data['survey'] = default_survey
-            except Survey.DoesNotExist:
-                # Leave survey as null if no default found
-                pass
-        
-        # Check if status is specified, if not - use default status
-        if 'status' not in validated_data:
-            try:
-                # Try to find the default status
-                default_status = SubmissionStatus.objects.get(is_default=True)
-                validated_data['status'] = default_status
-            except SubmissionStatus.DoesNotExist:
-                # If default status is not found, look for status with code 'new'
-                try:
-                    default_status = SubmissionStatus.objects.get(code='new')
-                    validated_data['status'] = default_status
-                except SubmissionStatus.DoesNotExist:
-                    # If none of the statuses is found, take the first status
-                    default_status = SubmissionStatus.objects.first()
-                    if default_status is None:
-                        raise ValidationError(_("Не найден ни один статус для заявки"))
-                    validated_data['status'] = default_status
-        
-        # Create submission record
-        submission = SurveySubmission.objects.create(**validated_data)
-        
-        # Create responses
-        for response_data in responses_data:
-            selected_options = response_data.pop('selected_options', [])
-            response = Response.objects.create(submission=submission, **response_data)
-            
-            # Add selected options if any
-            if selected_options:
-                response.selected_options.set(selected_options)
-
-        notify_new_submission_async(submission_id=submission.id)
-        
+        """
+        Create survey submission with responses.
+
+        The submission, its responses and their selected options are written
+        with one INSERT each inside a single transaction, together with the
+        Telegram notification queued in the outbox.
+        """
+        submission, = self.save_submissions([validated_data])
+
+        # Load what the response body renders in two queries instead of one per response
+        prefetch_related_objects([submission], 'responses__selected_options')
+
         return submission
+
+    @staticmethod
+    def save_submissions(validated_items: list[dict]) -> list[SurveySubmission]:
+        """
+        Write validated submissions with their responses and selected options.
+
+        Every table gets a single INSERT for the whole batch, all inside one
+        transaction that also queues their Telegram notifications.
+
+        Args:
+            validated_items: Validated data of SurveySubmissionSerializer instances
+
+        Returns:
+            list[SurveySubmission]: Created submissions in the order of the input
+        """
+        default_survey = get_survey_snapshot().get_default_survey()
+        # Default status, else the status with code 'new', else the first status
+        default_status = get_status_table().default
+
+        submissions = []
+        responses = []
+        selected_options = []
+        for validated_data in validated_items:
+            validated_data = dict(validated_data)
+            responses_data = validated_data.pop('responses')
+
+            # Handle survey_id if provided
+            survey = validated_data.pop('survey_id', None)
+            if survey:
+                validated_data['survey'] = survey
+            elif default_survey is not None:
+                # If no survey_id is provided, use the default survey
+                validated_data['survey_id'] = default_survey.id
+
+            # Check if status is specified, if not - use default status
+            if 'status' not in validated_data:
+                if default_status is None:
+                    raise ValidationError(_("Не найден ни один статус для заявки"))
+                validated_data['status'] = default_status
+
+            submission = SurveySubmission(**validated_data)
+            submissions.append(submission)
+            for response_data in responses_data:
+                response_data = dict(response_data)
+                selected_options.append(response_data.pop('selected_options', []))
+                responses.append(Response(submission=submission, **response_data))
+
+        with transaction.atomic():
+            SurveySubmission.objects.bulk_create(submissions)
+            Response.objects.bulk_create(responses)
+
+            # Add selected options of all responses at once
+            SelectedOption = Response.selected_options.through
+            SelectedOption.objects.bulk_create([
+                SelectedOption(response_id=response.id, answeroption_id=option.id)
+                for response, options in zip(responses, selected_options)
+                for option in options
+            ])
+
+            # Delivered by `manage.py dispatch_notifications`
+            enqueue_submission_notifications(submissions)
+
+        return submissions
+
+
+class SubmissionTicketSerializer(Serializer):
+    """State of a submission queued for ingestion."""
+    ticket = CharField()
+    status = CharField()
+    submission_id = IntegerField(required=False)
+    errors = DictField(required=False)
@@ -1,3 +1,74 @@
+"""Signal handlers for app models."""
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from mptt.signals import node_moved
+
+from app.models import Survey, Question, AnswerOption, InputFieldType, SubmissionStatus, SurveySubmission, Response
+from app.utils.status_table import publish_status_change
+from app.utils.survey_registry import publish_survey_change
+from app.utils.survey_schema import schedule_schema_rebuild
+
+
+@receiver([post_save, post_delete], sender=Question)
+def question_schema_changed(sender, instance, **kwargs):
+    """Rebuild the schema snapshot of the survey the question belongs to."""
+    schedule_schema_rebuild([instance.survey_id])
+
+
+@receiver([post_save, post_delete], sender=AnswerOption)
+@receiver(node_moved, sender=AnswerOption)
+def answer_option_schema_changed(sender, instance, **kwargs):
+    """Rebuild the schema snapshot of the survey the option belongs to."""
+    survey_ids = Question.objects.filter(pk=instance.question_id).values_list('survey_id', flat=True)
+    schedule_schema_rebuild(survey_ids)
+
+
+@receiver([post_save, post_delete], sender=InputFieldType)
+def input_field_type_schema_changed(sender, instance, **kwargs):
+    """Rebuild the schema snapshots of every survey using the field type."""
+    survey_ids = Question.objects.filter(field_type=instance).values_list('survey_id', flat=True).distinct()
+    schedule_schema_rebuild(survey_ids)
+
+
+@receiver([post_save, post_delete], sender=Survey)
+@receiver([post_save, post_delete], sender=Question)
+@receiver([post_save, post_delete], sender=AnswerOption)
+@receiver(node_moved, sender=AnswerOption)
+@receiver([post_save, post_delete], sender=InputFieldType)
+def survey_metadata_changed(sender, **kwargs):
+    """Drop the survey registry of every process once the change is committed."""
+    publish_survey_change()
+
+
+@receiver([post_save, post_delete], sender=SubmissionStatus)
+def submission_status_changed(sender, **kwargs):
+    """Drop the status table of every process once the change is committed."""
+    publish_status_change()
+
+
+def touch_submissions(submission_ids) -> None:
+    """Bump updated_at of submissions, which invalidates their cached Telegram cards."""
+    for submission in SurveySubmission.objects.filter(pk__in=submission_ids):
+        submission.save(update_fields=['updated_at'])
+
+
+@receiver([post_save, post_delete], sender=Response)
+def response_changed(sender, instance, **kwargs):
+    """Mark the submission of the response as changed."""
+    touch_submissions([instance.submission_id])
+
+
+@receiver(m2m_changed, sender=Response.selected_options.through)
+def response_options_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Mark the submissions whose selected options changed as changed."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        touch_submissions([instance.submission_id])
+    elif pk_set:
+        touch_submissions(Response.objects.filter(pk__in=pk_set).values_list('submission_id', flat=True))
+
+
 # """Signal handlers for app models."""
 # from django.db.models.signals import post_save
 # from django.dispatch import receiver
@@ -5,6 +5,7 @@ from app.views import (
     VisaTypeListAPIView, VisaTypeDetailAPIView,
     ResultCategoryPreviewAPIView, ResultCategoryDetailAPIView,
     UniversityLogoListAPIView, QuestionListAPIView, SurveySubmissionCreateAPIView, SurveyListAPIView,
+    SubmissionTicketStatusAPIView,
     ContactInfoAPIView, VisaStatusCheckAPIView, VisaPDFDownloadAPIView
 )
 
@@ -32,5 +33,6 @@ urlpatterns = [
     # Survey URLs
     path('surveys/', SurveyListAPIView.as_view(), name='survey-list'),
     path('questions/', QuestionListAPIView.as_view(), name='question-list'),
-    path('submit/', SurveySubmissionCreateAPIView.as_view(), name='survey-submit')
+    path('submit/', SurveySubmissionCreateAPIView.as_view(), name='survey-submit'),
+    path('submit/status/<str:ticket>/', SubmissionTicketStatusAPIView.as_view(), name='survey-submit-status')
 ]
@@ -0,0 +1,276 @@
+"""Background exports of survey submissions."""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+from aiogram.types import FSInputFile
+from django.conf import settings
+from django.contrib import admin
+from django.core.files import File
+from django.db import transaction, close_old_connections
+from django.db.models import Count, Max, Q
+from django.http import HttpRequest, QueryDict
+from django.utils import timezone
+
+from app.models import ExportJob, SurveySubmission
+from app.resource import SurveySubmissionResource
+from app.utils.export_plan import get_export_plan
+from app.utils.status_table import get_status_table
+from app.utils.telegram_dispatcher import telegram_dispatcher
+from app.utils.xlsx_export import write_submissions_xlsx
+
+logger = logging.getLogger(__name__)
+
+
+def get_export_fingerprint(queryset, survey_id) -> str:
+    """
+    Hash of everything an export file depends on.
+
+    That is the SQL of the exported queryset, the columns and labels of the
+    export plan, the status names, and a version of the survey's submissions:
+    their number and latest ``updated_at``, deleted ones included. Editing a
+    response touches its submission (see app.signals), so any change to the
+    exported data gives a new fingerprint.
+    """
+    sql, params = queryset.query.sql_with_params()
+    submissions = SurveySubmission.all_objects.all()
+    if survey_id:
+        submissions = submissions.filter(survey_id=survey_id)
+    version = submissions.aggregate(count=Count('id'), updated_at=Max('updated_at'))
+    plan = get_export_plan(survey_id)
+    data = json.dumps([
+        sql, [str(param) for param in params],
+        repr(plan.columns), sorted(plan.option_labels.items()),
+        [(status.code, status.name) for status in get_status_table().statuses],
+        version['count'], str(version['updated_at']),
+    ], default=str)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def request_export(queryset, survey_id, source: str, filter_state: dict, **fields) -> tuple[ExportJob, bool]:
+    """
+    Queue an export, or return a finished one of the same data.
+
+    Args:
+        queryset: Submissions to export, used for the fingerprint only
+        survey_id: Survey whose columns are exported
+        source: ExportJob.Source the request came from
+        filter_state: What get_job_queryset rebuilds the queryset from
+        **fields: Other ExportJob fields, such as requested_by or telegram_chat_id
+
+    Returns:
+        tuple: (job, created), job is already done if it was reused
+    """
+    fingerprint = get_export_fingerprint(queryset, survey_id)
+    reusable = ExportJob.objects.filter(
+        fingerprint=fingerprint,
+        status=ExportJob.Status.DONE,
+        finished_at__gte=timezone.now() - timedelta(seconds=settings.EXPORT_JOB_RETENTION)
+    ).exclude(file='').first()
+    if reusable is not None:
+        return reusable, False
+    if source == ExportJob.Source.ADMIN:
+        # The admin page of a queued job shows the same result to everyone
+        queued = ExportJob.objects.filter(
+            fingerprint=fingerprint, source=source, status__in=[ExportJob.Status.PENDING, ExportJob.Status.RUNNING]
+        ).first()
+        if queued is not None:
+            return queued, False
+    job = ExportJob.objects.create(
+        source=source, survey_id=survey_id or None, filter_state=filter_state, fingerprint=fingerprint, **fields
+    )
+    return job, True
+
+
+def get_admin_filter_state(request) -> dict:
+    """Filter state of an admin export: the query string of the submissions changelist."""
+    return {'query': request.GET.urlencode()}
+
+
+def get_job_queryset(job: ExportJob):
+    """Rebuild the queryset an export job was requested for."""
+    if job.source == ExportJob.Source.ADMIN:
+        if job.requested_by is None:
+            raise ValueError("The user who requested the export no longer exists.")
+        # Rebuilt through the changelist, so search, filters and date hierarchy apply as in the admin
+        request = HttpRequest()
+        request.method = 'GET'
+        request.GET = QueryDict(job.filter_state.get('query', ''))
+        request.user = job.requested_by
+        model_admin = admin.site._registry[SurveySubmission]
+        return model_admin.get_export_queryset(request)
+
+    # Imported here as the bot package imports the admin
+    from bot.filters import SurveyFilter
+    return SurveyFilter(job.filter_state, survey_id=job.survey_id).build_queryset()
+
+
+def get_export_filename(job: ExportJob) -> str:
+    survey = job.survey.slug if job.survey else 'all'
+    return f"export-{survey}-{job.created_at:%Y%m%d-%H%M}.xlsx"
+
+
+async def send_export_file(bot, chat_id: int, thread_id: int | None, path: str, filename: str) -> None:
+    """Send a finished export to the Telegram chat it was requested in."""
+    await bot.send_document(
+        chat_id,
+        FSInputFile(path, filename=filename),
+        caption="✅ Экспорт выполнен успешно",
+        message_thread_id=thread_id
+    )
+
+
+async def send_export_error(bot, chat_id: int, thread_id: int | None) -> None:
+    await bot.send_message(chat_id, "❌ Ошибка при экспорте данных", message_thread_id=thread_id)
+
+
+class ExportWorker:
+    """
+    Runs queued export jobs one at a time.
+
+    Jobs are claimed with ``SELECT ... FOR UPDATE SKIP LOCKED``, so several
+    workers can run side by side. A running job saves its progress after
+    every chunk of rows. One that made no progress for
+    settings.EXPORT_JOB_LEASE_SECONDS is assumed to belong to a dead worker
+    and is taken over, up to settings.EXPORT_JOB_MAX_ATTEMPTS times.
+    """
+
+    def __init__(self, poll_interval: float = 5.0):
+        self.poll_interval = poll_interval
+
+    def claim(self) -> ExportJob | None:
+        """
+        Lease the oldest runnable job.
+
+        Returns:
+            ExportJob: The job, failed instead of running if it ran out of attempts, or None
+        """
+        close_old_connections()
+        now = timezone.now()
+        lease_expired_at = now - timedelta(seconds=settings.EXPORT_JOB_LEASE_SECONDS)
+        stale = Q(status=ExportJob.Status.RUNNING, updated_at__lt=lease_expired_at)
+        with transaction.atomic():
+            job = (
+                ExportJob.objects
+                .select_for_update(skip_locked=True)
+                .filter(Q(status=ExportJob.Status.PENDING) | stale)
+                .order_by('created_at', 'id')
+                .first()
+            )
+            if job is None:
+                return None
+            job.attempts += 1
+            if job.attempts > settings.EXPORT_JOB_MAX_ATTEMPTS:
+                job.status = ExportJob.Status.FAILED
+                job.last_error = job.last_error or "The export was interrupted too many times."
+                job.finished_at = now
+            else:
+                job.status = ExportJob.Status.RUNNING
+                job.started_at = now
+            job.save(update_fields=['attempts', 'status', 'last_error', 'started_at', 'finished_at', 'updated_at'])
+        if job.status == ExportJob.Status.FAILED:
+            self.notify_failure(job)
+        return job
+
+    def run_job(self, job: ExportJob) -> None:
+        """Export the submissions of a job to its file, reporting progress."""
+        queryset = get_job_queryset(job)
+        job.total_count = queryset.count()
+        job.exported_count = job.progress = 0
+        job.save(update_fields=['total_count', 'exported_count', 'progress', 'updated_at'])
+
+        def report_progress(count: int) -> None:
+            job.exported_count = count
+            job.progress = min(99, count * 100 // job.total_count) if job.total_count else 0
+            job.save(update_fields=['exported_count', 'progress', 'updated_at'])
+
+        resource = SurveySubmissionResource(survey_id=job.survey_id)
+        with tempfile.TemporaryFile() as output:
+            count = write_submissions_xlsx(resource, queryset, output, progress=report_progress)
+            output.seek(0)
+            job.file.save(get_export_filename(job), File(output), save=False)
+
+        job.status = ExportJob.Status.DONE
+        job.exported_count = count
+        job.progress = 100
+        job.finished_at = timezone.now()
+        job.save(update_fields=['file', 'status', 'exported_count', 'progress', 'finished_at', 'updated_at'])
+
+    def process(self, job: ExportJob) -> None:
+        started = time.monotonic()
+        try:
+            self.run_job(job)
+        except Exception as e:
+            logger.error(f"Export #{job.pk} failed: {e}", exc_info=True)
+            job.status = ExportJob.Status.FAILED
+            job.last_error = str(e)
+            job.finished_at = timezone.now()
+            job.save(update_fields=['status', 'last_error', 'finished_at', 'updated_at'])
+            self.notify_failure(job)
+            return
+
+        logger.info(f"Export #{job.pk} of {job.exported_count} submissions done in {time.monotonic() - started:.1f}s")
+        if job.telegram_chat_id:
+            try:
+                telegram_dispatcher.call(
+                    send_export_file,
+                    job.telegram_chat_id,
+                    job.telegram_thread_id,
+                    job.file.path,
+                    os.path.basename(job.file.name)
+                )
+            except Exception as e:
+                logger.error(f"Failed to send export #{job.pk} to Telegram: {e}", exc_info=True)
+
+    @staticmethod
+    def notify_failure(job: ExportJob) -> None:
+        if not job.telegram_chat_id:
+            return
+        try:
+            telegram_dispatcher.call(send_export_error, job.telegram_chat_id, job.telegram_thread_id)
+        except Exception as e:
+            logger.error(f"Failed to report failed export #{job.pk} to Telegram: {e}")
+
+    @staticmethod
+    def purge_expired() -> int:
+        """Delete finished jobs older than settings.EXPORT_JOB_RETENTION with their files."""
+        expired = ExportJob.objects.filter(
+            status__in=[ExportJob.Status.DONE, ExportJob.Status.FAILED],
+            finished_at__lt=timezone.now() - timedelta(seconds=settings.EXPORT_JOB_RETENTION)
+        )
+        count = 0
+        for job in expired:
+            if job.file:
+                job.file.delete(save=False)
+            job.delete()
+            count += 1
+        if count:
+            logger.info(f"Deleted {count} expired exports")
+        return count
+
+    def run(self, once: bool = False) -> None:
+        """Run jobs until interrupted, or until none is queued if once is set."""
+        while True:
+            try:
+                job = self.claim()
+            except Exception as e:
+                logger.error(f"Failed to claim an export: {e}", exc_info=True)
+                if once:
+                    raise
+                time.sleep(self.poll_interval)
+                continue
+            if job is not None:
+                if job.status == ExportJob.Status.RUNNING:
+                    self.process(job)
+                continue
+            try:
+                self.purge_expired()
+            except Exception as e:
+                logger.error(f"Failed to delete expired exports: {e}", exc_info=True)
+            if once:
+                return
+            time.sleep(self.poll_interval)
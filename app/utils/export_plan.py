@@ -0,0 +1,137 @@
+"""Submission export columns compiled from the survey registry."""
+from dataclasses import dataclass, field
+from typing import NamedTuple
+
+from app.models import Question, InputFieldType
+from app.utils.survey_registry import QuestionDescriptor, SurveySnapshot, get_survey_snapshot
+
+
+class Answer(NamedTuple):
+    """Answer of a submission to one question, as exported."""
+    text_answer: str | None
+    option_ids: list[int]
+
+
+@dataclass(frozen=True)
+class ExportColumn:
+    """One question column of the export, for a whole question or for one of its option families."""
+    key: str
+    label: str
+    question_id: int
+    root_option_id: int | None = None
+
+
+@dataclass(frozen=True)
+class ExportPlan:
+    """
+    Question columns of a submissions export and the lookups needed to fill them.
+
+    Options of a choice question that belong to an option family (a root
+    option with descendants) are exported in the column of that family, the
+    other options in the column of the question. Cells are computed from
+    Answer values with dictionary lookups only.
+    """
+    survey_id: int | None
+    columns: tuple[ExportColumn, ...]
+    questions: dict[int, QuestionDescriptor] = field(default_factory=dict)
+    # Option ID -> root option ID of the family column it is exported in
+    option_groups: dict[int, int] = field(default_factory=dict)
+    option_labels: dict[int, str] = field(default_factory=dict)
+    option_sort_keys: dict[int, tuple] = field(default_factory=dict)
+    custom_input_option_ids: frozenset[int] = frozenset()
+
+    def get_option_labels(self, option_ids) -> list[str]:
+        """Export labels of options in the order they are shown in the admin."""
+        option_ids = sorted(option_ids, key=lambda option_id: self.option_sort_keys.get(option_id, (0, option_id)))
+        return [self.option_labels.get(option_id, '') for option_id in option_ids]
+
+    def get_value(self, column: ExportColumn, answer: Answer | None):
+        """Cell value of a column for an answer, '' if the question was not answered."""
+        if answer is None:
+            return ''
+        if column.root_option_id is not None:
+            option_ids = [
+                option_id for option_id in answer.option_ids
+                if self.option_groups.get(option_id) == column.root_option_id
+            ]
+            return ', '.join(self.get_option_labels(option_ids))
+        return self.get_question_value(self.questions[column.question_id], answer)
+
+    def get_question_value(self, question: QuestionDescriptor, answer: Answer):
+        """Answer of the question column, without the options exported in family columns."""
+        if question.input_type == Question.InputType.TEXT:
+            field_type = question.field_type.field_type_choice if question.field_type else None
+            if field_type == InputFieldType.FieldTypeChoice.NUMBER:
+                try:
+                    return float(answer.text_answer) if answer.text_answer and answer.text_answer.strip() else ''
+                except (ValueError, TypeError):
+                    pass
+            return answer.text_answer or ''
+
+        option_ids = answer.option_ids
+        if question.is_choice:
+            option_ids = [option_id for option_id in option_ids if option_id not in self.option_groups]
+        if option_ids:
+            option_texts = ', '.join(self.get_option_labels(option_ids))
+            if answer.text_answer and self.custom_input_option_ids.intersection(option_ids):
+                return f"{option_texts} - {answer.text_answer}"
+            return option_texts
+        return answer.text_answer or ''
+
+
+def build_export_plan(snapshot: SurveySnapshot, survey_id=None) -> ExportPlan:
+    """
+    Compile the export plan of a survey.
+
+    Args:
+        snapshot: Survey snapshot the columns and labels are taken from
+        survey_id: Survey to export. If empty, the default survey is used,
+            or the questions of all surveys if there is no default survey.
+    """
+    survey = snapshot.get_survey(survey_id) if survey_id else snapshot.get_default_survey(active_only=False)
+    questions = survey.questions if survey else (() if survey_id else snapshot.get_questions())
+
+    columns = []
+    option_groups = {}
+    for question in questions:
+        field_key = question.field_type.field_key if question.field_type else None
+        label = field_key or question.title
+        columns.append(ExportColumn(key=f'question_{question.id}', label=label, question_id=question.id))
+        if not question.is_choice:
+            continue
+        for root_option in question.option_families:
+            columns.append(ExportColumn(
+                key=f'question_option_{question.id}_{root_option.id}',
+                label=root_option.text,
+                question_id=question.id,
+                root_option_id=root_option.id,
+            ))
+            for option in question.get_descendants(root_option, include_self=True):
+                option_groups[option.id] = root_option.id
+
+    options = [option for question in questions for option in question.options]
+    return ExportPlan(
+        survey_id=survey.id if survey else None,
+        columns=tuple(columns),
+        questions={question.id: question for question in questions},
+        option_groups=option_groups,
+        option_labels={option.id: option.export_field_name or option.text for option in options},
+        option_sort_keys={option.id: (option.order, option.id) for option in options},
+        custom_input_option_ids=frozenset(option.id for option in options if option.has_custom_input),
+    )
+
+
+_plans: dict[tuple, ExportPlan] = {}
+
+
+def get_export_plan(survey_id=None) -> ExportPlan:
+    """Return the export plan of a survey, compiled once per survey snapshot."""
+    snapshot = get_survey_snapshot()
+    key = (snapshot.language, snapshot.built_at, str(survey_id or ''))
+    plan = _plans.get(key)
+    if plan is None:
+        # Plans of older snapshots are never used again
+        for stale_key in [k for k in _plans if k[0] == key[0] and k[1] != key[1]]:
+            _plans.pop(stale_key, None)
+        plan = _plans[key] = build_export_plan(snapshot, survey_id)
+    return plan
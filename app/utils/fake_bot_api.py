@@ -0,0 +1,153 @@
+"""Local stand-in for the Telegram Bot API, for load tests and benchmarks."""
+import asyncio
+import itertools
+import logging
+import random
+import time
+from collections import Counter
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+BOT_USER = {'id': 1, 'is_bot': True, 'first_name': 'Fake bot', 'username': 'fake_bot'}
+
+
+def get_chat_id(params) -> int:
+    """Numeric chat ID of a request, usernames of public chats are all mapped to -1."""
+    chat_id = str(params.get('chat_id') or 0)
+    return int(chat_id) if chat_id.lstrip('-').isdigit() else -1
+
+
+class FakeBotAPI:
+    """
+    Answers the Bot API methods the project uses without sending anything.
+
+    Every request is delayed by ``latency`` plus up to ``jitter`` seconds.
+    With probability ``flood_rate`` a request is rejected with ``429 Too Many
+    Requests`` and ``retry_after``, like Telegram flood control. Point
+    settings.TELEGRAM_API_BASE_URL at the server to use it.
+    """
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.0, flood_rate: float = 0.0, retry_after: int = 1):
+        """
+        Args:
+            latency: Seconds every request is delayed by
+            jitter: Upper bound of the random extra delay in seconds
+            flood_rate: Probability of answering with 429
+            retry_after: ``retry_after`` of the 429 answers
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.flood_rate = flood_rate
+        self.retry_after = retry_after
+        self.counters = Counter()
+        self._message_ids = itertools.count(1)
+        self._topic_ids = itertools.count(2)
+        self.methods = {
+            'getme': self.get_me,
+            'getupdates': self.get_updates,
+            'deletewebhook': self.true,
+            'getchat': self.get_chat,
+            'getchatmember': self.get_chat_member,
+            'sendmessage': self.send_message,
+            'editmessagetext': self.edit_message,
+            'editmessagereplymarkup': self.edit_message,
+            'deletemessage': self.true,
+            'answercallbackquery': self.true,
+            'createforumtopic': self.create_forum_topic,
+            'editforumtopic': self.true,
+        }
+
+    def create_app(self) -> web.Application:
+        """Return an aiohttp application serving ``/bot<token>/<method>``."""
+        app = web.Application()
+        app.router.add_post('/bot{token}/{method}', self.handle)
+        app.router.add_get('/bot{token}/{method}', self.handle)
+        return app
+
+    async def handle(self, request: web.Request) -> web.Response:
+        """Answer a Bot API request after the simulated delay, or reject it as flood control would."""
+        method = request.match_info['method']
+        handler = self.methods.get(method.lower())
+        if handler is None:
+            self.counters['not_found'] += 1
+            return web.json_response(
+                {'ok': False, 'error_code': 404, 'description': 'Not Found: method not found'}, status=404
+            )
+
+        params = dict(await request.post())
+        await asyncio.sleep(self.latency + random.uniform(0, self.jitter))
+        if method.lower() != 'getupdates' and random.random() < self.flood_rate:
+            self.counters['flood'] += 1
+            logger.debug(f"Rejecting {method} with 429")
+            return web.json_response({
+                'ok': False,
+                'error_code': 429,
+                'description': f'Too Many Requests: retry after {self.retry_after}',
+                'parameters': {'retry_after': self.retry_after},
+            }, status=429)
+
+        self.counters[method] += 1
+        return web.json_response({'ok': True, 'result': await handler(params)})
+
+    async def true(self, params):
+        """Answer methods that only report success."""
+        return True
+
+    async def get_me(self, params):
+        """Answer getMe with the fake bot user."""
+        return BOT_USER
+
+    async def get_updates(self, params):
+        """Answer getUpdates like a long poll that never gets an update."""
+        await asyncio.sleep(min(float(params.get('timeout') or 0), 1))
+        return []
+
+    async def get_chat(self, params):
+        """Answer getChat with a forum supergroup."""
+        return {'id': get_chat_id(params), 'type': 'supergroup', 'title': 'Fake chat', 'is_forum': True}
+
+    async def get_chat_member(self, params):
+        """Answer getChatMember with an administrator allowed to manage topics."""
+        return {
+            'status': 'administrator',
+            'user': BOT_USER,
+            'can_be_edited': False,
+            'is_anonymous': False,
+            'can_manage_chat': True,
+            'can_delete_messages': True,
+            'can_manage_video_chats': True,
+            'can_restrict_members': True,
+            'can_promote_members': False,
+            'can_change_info': True,
+            'can_invite_users': True,
+            'can_manage_topics': True,
+        }
+
+    async def send_message(self, params):
+        """Answer sendMessage with a message under a new ID."""
+        return self.get_message(params, next(self._message_ids))
+
+    async def edit_message(self, params):
+        """Answer message edits with the edited message."""
+        return self.get_message(params, int(params.get('message_id') or 0))
+
+    async def create_forum_topic(self, params):
+        """Answer createForumTopic with a topic under a new thread ID."""
+        return {'message_thread_id': next(self._topic_ids), 'name': params['name'], 'icon_color': 7322096}
+
+    @staticmethod
+    def get_message(params, message_id: int) -> dict:
+        """Build the Message object a send or edit request would return."""
+        message = {
+            'message_id': message_id,
+            'date': int(time.time()),
+            'chat': {'id': get_chat_id(params), 'type': 'supergroup', 'title': 'Fake chat'},
+            'from': BOT_USER,
+            'text': params.get('text', ''),
+        }
+        if params.get('message_thread_id'):
+            message['message_thread_id'] = int(params['message_thread_id'])
+            message['is_topic_message'] = True
+        return message
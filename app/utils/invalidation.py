@@ -0,0 +1,93 @@
+"""Cross-process invalidation of in-memory reference data over Redis pub/sub."""
+import logging
+import os
+import threading
+import time
+from typing import Callable
+
+from django.db import transaction
+
+from app.utils.redis import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = 'visa_doctors:invalidate'
+
+
+class InvalidationBus:
+    """
+    Fan out invalidation events to every gunicorn worker and the bot process.
+
+    Each process keeps in-memory caches that register a callback under a
+    topic name. Publishing a topic runs the local callbacks right away and
+    broadcasts the topic on a Redis channel, a daemon thread in every other
+    process receives it and runs the same callbacks there. The listener is
+    started lazily per process ID, so forked workers get their own thread.
+    """
+
+    def __init__(self, channel: str = INVALIDATION_CHANNEL):
+        self.channel = channel
+        self._callbacks: dict[str, list[Callable[[], None]]] = {}
+        self._lock = threading.Lock()
+        self._listener_pid = None
+
+    def register(self, topic: str, callback: Callable[[], None]) -> None:
+        """Run callback whenever the topic is published by any process."""
+        self._callbacks.setdefault(topic, []).append(callback)
+
+    def _dispatch(self, topic: str) -> None:
+        for callback in self._callbacks.get(topic, []):
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Invalidation callback for '{topic}' failed: {e}", exc_info=True)
+
+    def _dispatch_all(self) -> None:
+        for topic in list(self._callbacks):
+            self._dispatch(topic)
+
+    def publish(self, topic: str) -> None:
+        """Invalidate the topic in this process and broadcast it to the others."""
+        self._dispatch(topic)
+        try:
+            get_redis_client().publish(self.channel, topic)
+        except Exception as e:
+            # Other processes fall back to their TTL
+            logger.warning(f"Failed to publish invalidation of '{topic}': {e}")
+
+    def publish_on_commit(self, topic: str) -> None:
+        """Publish the topic once the current transaction commits."""
+        transaction.on_commit(lambda: self.publish(topic))
+
+    def ensure_listening(self) -> None:
+        """Start the listener thread of the current process if it is not running yet."""
+        pid = os.getpid()
+        if self._listener_pid == pid:
+            return
+        with self._lock:
+            if self._listener_pid == pid:
+                return
+            thread = threading.Thread(target=self._listen, name='invalidation-listener', daemon=True)
+            thread.start()
+            self._listener_pid = pid
+
+    def _listen(self) -> None:
+        delay = 1
+        while True:
+            try:
+                pubsub = get_redis_client().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                # Events may have been missed while disconnected
+                self._dispatch_all()
+                delay = 1
+                while True:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message['type'] == 'message':
+                        self._dispatch(message['data'].decode())
+            except Exception as e:
+                logger.warning(f"Invalidation listener disconnected, retrying in {delay}s: {e}")
+                time.sleep(delay)
+                delay = min(delay * 2, 60)
+
+
+invalidation_bus = InvalidationBus()
@@ -0,0 +1,53 @@
+"""In-memory assembly of answer option trees."""
+from collections import defaultdict
+
+from app.models import AnswerOption
+
+
+class AnswerOptionTree:
+    """
+    Answer option forest of a set of questions loaded with a single query.
+
+    Every option of every tree rooted in the given questions is fetched in
+    ``tree_id, lft`` order, so roots and children come out in the same order
+    as ``question.options`` and ``option.get_children()`` would return them.
+    The query runs lazily on first access.
+    """
+
+    def __init__(self, questions):
+        """
+        Args:
+            questions: Question queryset or iterable of question IDs
+        """
+        self.questions = questions
+        self._roots = None
+        self._children = None
+
+    def _load(self):
+        root_trees = AnswerOption.objects.filter(
+            question__in=self.questions, level=0, parent__isnull=True
+        ).values('tree_id')
+
+        roots = defaultdict(list)
+        children = defaultdict(list)
+        for option in AnswerOption.objects.filter(tree_id__in=root_trees).order_by('tree_id', 'lft'):
+            if option.parent_id is None:
+                if option.level == 0:
+                    roots[option.question_id].append(option)
+            else:
+                children[option.parent_id].append(option)
+
+        self._roots = roots
+        self._children = children
+
+    def get_roots(self, question_id: int) -> list[AnswerOption]:
+        """Return the top level options of a question."""
+        if self._roots is None:
+            self._load()
+        return self._roots.get(question_id, [])
+
+    def get_children(self, option_id: int) -> list[AnswerOption]:
+        """Return the direct children of an option."""
+        if self._children is None:
+            self._load()
+        return self._children.get(option_id, [])
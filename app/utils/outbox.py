@@ -0,0 +1,211 @@
+"""Delivery of queued Telegram notifications."""
+import asyncio
+import logging
+from datetime import timedelta
+
+from aiogram.exceptions import TelegramRetryAfter
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction, close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from app.models import NotificationOutbox
+from app.utils.survey_registry import get_survey_snapshot
+from app.utils.telegram import (
+    format_submission_notification, format_submission_digest, deliver_telegram_message, notify_admin_about_error,
+    get_survey_topic_id_from_submission
+)
+from app.utils.telegram_dispatcher import telegram_dispatcher
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_submission_notifications(submissions) -> None:
+    """
+    Queue new submission notifications, to be called inside the transaction creating the submissions.
+
+    Notifications of surveys with a digest window are held back for that
+    long, so submissions arriving meanwhile are announced together.
+
+    Args:
+        submissions: Saved SurveySubmission instances
+    """
+    if not settings.TELEGRAM_NOTIFICATIONS_ENABLED:
+        return
+    snapshot = get_survey_snapshot()
+    now = timezone.now()
+    NotificationOutbox.objects.bulk_create([
+        NotificationOutbox(
+            kind=NotificationOutbox.Kind.NEW_SUBMISSION,
+            submission=submission,
+            next_attempt_at=now + timedelta(seconds=get_digest_window(snapshot, submission.survey_id))
+        )
+        for submission in submissions
+    ])
+
+
+def get_digest_window(snapshot, survey_id) -> int:
+    """Digest window of a survey in seconds, 0 if its submissions are announced one by one."""
+    survey = snapshot.get_survey(survey_id)
+    return survey.notification_digest_window if survey else 0
+
+
+def get_retry_delay(attempts: int) -> int:
+    """Exponential backoff in seconds after the given number of failed attempts."""
+    return min(settings.NOTIFICATION_RETRY_BASE_DELAY * 2 ** (attempts - 1), settings.NOTIFICATION_RETRY_MAX_DELAY)
+
+
+class NotificationDispatcher:
+    """
+    Drains the notification outbox through the process-wide Telegram dispatcher.
+
+    Due rows are claimed with ``SELECT ... FOR UPDATE SKIP LOCKED`` and leased
+    by moving ``next_attempt_at`` forward, so several dispatchers never send
+    the same row at once, and rows of a dispatcher that died are picked up
+    again once the lease expires. Delivery is at-least-once: a row is deleted
+    only after Telegram accepted the message.
+
+    When a notification of a survey with a digest window is due, the fresh
+    notifications of that survey waiting for their own window join it and
+    are sent as one digest of up to settings.NOTIFICATION_DIGEST_MAX_ITEMS.
+    """
+
+    def __init__(self, batch_size: int = 20, poll_interval: float = 2.0):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+
+    @sync_to_async
+    def claim_batch(self) -> list[list[NotificationOutbox]]:
+        """
+        Lease a batch of due notifications.
+
+        Returns:
+            list: Groups of notifications, each sent as one message
+        """
+        close_old_connections()
+        now = timezone.now()
+        snapshot = get_survey_snapshot()
+        with transaction.atomic():
+            pending = (
+                NotificationOutbox.objects
+                .select_for_update(skip_locked=True, of=('self',))
+                .filter(status=NotificationOutbox.Status.PENDING)
+                .annotate(survey_id=F('submission__survey_id'))
+            )
+            groups = {}
+            for row in pending.filter(next_attempt_at__lte=now).order_by('next_attempt_at', 'id')[:self.batch_size]:
+                key = row.survey_id if get_digest_window(snapshot, row.survey_id) else f'row:{row.pk}'
+                groups.setdefault(key, []).append(row)
+
+            for survey_id, rows in groups.items():
+                if isinstance(survey_id, str):
+                    continue
+                # Never attempted rows are not leased by anyone else
+                rows.extend(
+                    pending
+                    .filter(submission__survey_id=survey_id, attempts=0, next_attempt_at__gt=now)
+                    .order_by('id')[:max(settings.NOTIFICATION_DIGEST_MAX_ITEMS - len(rows), 0)]
+                )
+
+            batch = []
+            for rows in groups.values():
+                size = settings.NOTIFICATION_DIGEST_MAX_ITEMS
+                batch.extend(rows[i:i + size] for i in range(0, len(rows), size))
+
+            claimed = [row for rows in batch for row in rows]
+            lease_until = now + timedelta(seconds=settings.NOTIFICATION_LEASE_SECONDS)
+            for row in claimed:
+                row.attempts += 1
+                row.next_attempt_at = lease_until
+            NotificationOutbox.objects.bulk_update(claimed, ['attempts', 'next_attempt_at'])
+        return batch
+
+    @sync_to_async
+    def mark_delivered(self, rows: list[NotificationOutbox]) -> None:
+        NotificationOutbox.objects.filter(pk__in=[row.pk for row in rows]).delete()
+
+    @sync_to_async
+    def mark_failed(self, row: NotificationOutbox, error: Exception, retry_after: int = None) -> bool:
+        """
+        Schedule a retry, or give up after settings.NOTIFICATION_MAX_ATTEMPTS.
+
+        Attempts rejected by Telegram flood control (``retry_after``) are not
+        counted and retried exactly when Telegram allows it.
+
+        Returns:
+            bool: True if the notification was given up
+        """
+        row.last_error = str(error)
+        if retry_after is not None:
+            row.attempts -= 1
+        if row.attempts >= settings.NOTIFICATION_MAX_ATTEMPTS:
+            row.status = NotificationOutbox.Status.FAILED
+        else:
+            delay = retry_after if retry_after is not None else get_retry_delay(row.attempts)
+            row.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+        row.save(update_fields=['last_error', 'attempts', 'status', 'next_attempt_at', 'updated_at'])
+        return row.status == NotificationOutbox.Status.FAILED
+
+    async def deliver(self, rows: list[NotificationOutbox]) -> None:
+        """Send a notification, or a digest of several, raising on failure."""
+        if len(rows) == 1:
+            message = await format_submission_notification(rows[0].submission_id)
+            await telegram_dispatcher.run(deliver_telegram_message, message, rows[0].submission_id)
+            return
+
+        message, keyboard = await format_submission_digest([row.submission_id for row in rows])
+        # The survey registry may have to be rebuilt from the ORM, which is sync only
+        survey_topic_id = await get_survey_topic_id_from_submission(rows[0].submission_id)
+        await telegram_dispatcher.run(
+            deliver_telegram_message,
+            message,
+            survey_topic_id=survey_topic_id,
+            reply_markup=keyboard
+        )
+
+    async def process(self, rows: list[NotificationOutbox]) -> None:
+        submission_ids = ', '.join(f'#{row.submission_id}' for row in rows)
+        try:
+            await self.deliver(rows)
+        except TelegramRetryAfter as e:
+            logger.warning(f"Flood control on notifications for {submission_ids}, retrying in {e.retry_after}s")
+            for row in rows:
+                await self.mark_failed(row, e, retry_after=e.retry_after)
+        except Exception as e:
+            logger.error(f"Failed to deliver notifications for {submission_ids} (attempt {rows[0].attempts}): {e}")
+            for row in rows:
+                if await self.mark_failed(row, e):
+                    await telegram_dispatcher.run(
+                        notify_admin_about_error,
+                        error=e,
+                        context="Yangi ariza haqida xabar yuborib bo'lmadi",
+                        submission_id=row.submission_id
+                    )
+        else:
+            await self.mark_delivered(rows)
+            logger.info(f"Telegram notification sent for submissions {submission_ids}")
+
+    async def run(self, once: bool = False) -> None:
+        """Deliver due notifications until cancelled, or until none are due if once is set."""
+        while True:
+            try:
+                batch = await self.claim_batch()
+            except Exception as e:
+                logger.error(f"Failed to claim notifications: {e}", exc_info=True)
+                if once:
+                    raise
+                await asyncio.sleep(self.poll_interval)
+                continue
+            for rows in batch:
+                try:
+                    await self.process(rows)
+                except Exception as e:
+                    # The rows are retried once their lease expires
+                    logger.error(f"Failed to update notifications {[row.pk for row in rows]}: {e}", exc_info=True)
+            if batch:
+                logger.info(f"Telegram dispatcher metrics: {telegram_dispatcher.get_metrics()}")
+            else:
+                if once:
+                    return
+                await asyncio.sleep(self.poll_interval)
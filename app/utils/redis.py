@@ -0,0 +1,27 @@
+"""Shared Redis client."""
+from functools import lru_cache
+
+from django.conf import settings
+from redis import Redis
+
+
+@lru_cache(maxsize=1)
+def get_redis_client() -> Redis:
+    """
+    Return a process-wide Redis client for settings.REDIS_URL.
+
+    The client keeps its own connection pool, so it is safe to share
+    between threads.
+    """
+    return Redis.from_url(settings.REDIS_URL, socket_timeout=5, socket_connect_timeout=5)
+
+
+@lru_cache(maxsize=1)
+def get_stream_redis_client() -> Redis:
+    """
+    Return a process-wide Redis client for settings.SUBMISSION_STREAM_REDIS_URL.
+
+    Queued submissions are the only copy until they are ingested, so this
+    Redis must run with ``maxmemory-policy noeviction``.
+    """
+    return Redis.from_url(settings.SUBMISSION_STREAM_REDIS_URL, socket_timeout=5, socket_connect_timeout=5)
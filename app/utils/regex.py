@@ -0,0 +1,96 @@
+"""Compiled regular expressions of input field types."""
+import logging
+import re
+from functools import lru_cache
+
+from django.core.exceptions import ValidationError
+from django.utils.translation import gettext_lazy as _
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+logger = logging.getLogger(__name__)
+
+UNBOUNDED_REPEATS = {sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT}
+
+
+def _has_nested_unbounded_repeat(subpattern, inside_repeat: bool = False) -> bool:
+    """Check whether an unbounded quantifier is nested inside another unbounded quantifier."""
+    for op, av in subpattern:
+        if op in UNBOUNDED_REPEATS:
+            min_count, max_count, item = av
+            unbounded = max_count == sre_parse.MAXREPEAT
+            if unbounded and inside_repeat:
+                return True
+            if _has_nested_unbounded_repeat(item, inside_repeat or unbounded):
+                return True
+        elif op == sre_parse.SUBPATTERN:
+            if _has_nested_unbounded_repeat(av[-1], inside_repeat):
+                return True
+        elif op == sre_parse.BRANCH:
+            if any(_has_nested_unbounded_repeat(branch, inside_repeat) for branch in av[1]):
+                return True
+        elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            if _has_nested_unbounded_repeat(av[1], inside_repeat):
+                return True
+    return False
+
+
+def validate_regex_pattern(value: str) -> None:
+    """
+    Validate that a pattern compiles and is not prone to catastrophic backtracking.
+
+    Patterns with an unbounded quantifier nested inside another unbounded
+    quantifier, such as ``(a+)+`` or ``(\\w*\\s?)*``, take exponential time on
+    non-matching input and are rejected.
+
+    Args:
+        value: Regular expression pattern
+
+    Raises:
+        ValidationError: If the pattern is invalid or unsafe
+    """
+    if not value.strip():
+        return
+
+    try:
+        parsed = sre_parse.parse(value)
+    except re.error as e:
+        raise ValidationError(_('Invalid regular expression: %(error)s'), params={'error': e})
+
+    if _has_nested_unbounded_repeat(parsed):
+        raise ValidationError(
+            _('Nested unbounded quantifiers like (a+)+ can make validation extremely slow. '
+              'Use a bounded quantifier such as {1,50} instead.')
+        )
+
+
+@lru_cache(maxsize=256)
+def _compile(field_type_id: int, updated_at, pattern: str) -> re.Pattern:
+    return re.compile(pattern)
+
+
+def get_field_type_regex(field_type) -> re.Pattern | None:
+    """
+    Return the compiled pattern of an input field type.
+
+    Patterns are compiled once per process and recompiled only when the field
+    type is saved again, since ``updated_at`` is part of the cache key.
+
+    Args:
+        field_type: InputFieldType instance
+
+    Returns:
+        Compiled pattern, or None if the field type has no usable pattern
+    """
+    pattern = field_type.regex_pattern
+    if not pattern.strip():
+        return None
+
+    try:
+        return _compile(field_type.id, field_type.updated_at, pattern)
+    except re.error as e:
+        logger.error(f"Invalid regex pattern of input field type {field_type.id}: {e}")
+        return None
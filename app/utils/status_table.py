@@ -0,0 +1,96 @@
+"""Process-local cache of the SubmissionStatus table."""
+import threading
+import time
+from dataclasses import dataclass, field
+
+from django.conf import settings
+
+from app.models import SubmissionStatus
+from app.utils.invalidation import invalidation_bus
+
+STATUS_TOPIC = 'status'
+
+
+@dataclass(frozen=True)
+class StatusTable:
+    """
+    All submission statuses ordered by ``order``.
+
+    The instances are shared between threads and must be treated as read-only.
+    Translated names are resolved in the active language when accessed.
+    """
+    statuses: tuple[SubmissionStatus, ...]
+    built_at: float
+    by_code: dict[str, SubmissionStatus] = field(default_factory=dict)
+
+    def get(self, code: str) -> SubmissionStatus | None:
+        """Return a status by its code."""
+        return self.by_code.get(code)
+
+    @property
+    def default(self) -> SubmissionStatus | None:
+        """Status of new submissions: the default one, else 'new', else the first status."""
+        return (
+            next((status for status in self.statuses if status.is_default), None)
+            or self.by_code.get('new')
+            or next(iter(self.statuses), None)
+        )
+
+    @property
+    def active(self) -> list[SubmissionStatus]:
+        """Statuses available for selection, in display order."""
+        return [status for status in self.statuses if status.active]
+
+
+class StatusTableCache:
+    """Holds the status table of this process, rebuilt after any status change."""
+
+    def __init__(self):
+        self._table: StatusTable | None = None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _is_fresh(self, table: StatusTable | None) -> bool:
+        return table is not None and time.monotonic() - table.built_at < settings.SURVEY_REGISTRY_TTL
+
+    def get(self) -> StatusTable:
+        """Return the status table, loading it with a single query if missing or expired."""
+        invalidation_bus.ensure_listening()
+        table = self._table
+        if self._is_fresh(table):
+            return table
+
+        with self._lock:
+            table = self._table
+            if self._is_fresh(table):
+                return table
+            generation = self._generation
+            statuses = tuple(SubmissionStatus.objects.order_by('order', 'id'))
+            table = StatusTable(
+                statuses=statuses,
+                built_at=time.monotonic(),
+                by_code={status.code: status for status in statuses},
+            )
+            # Do not keep a table that was invalidated while it was being loaded
+            if generation == self._generation:
+                self._table = table
+        return table
+
+    def invalidate(self) -> None:
+        """Drop the status table of this process."""
+        self._generation += 1
+        self._table = None
+
+
+status_table_cache = StatusTableCache()
+invalidation_bus.register(STATUS_TOPIC, status_table_cache.invalidate)
+
+
+def get_status_table() -> StatusTable:
+    """Return the cached submission status table."""
+    return status_table_cache.get()
+
+
+def publish_status_change() -> None:
+    """Invalidate the status table in every process once the current transaction commits."""
+    invalidation_bus.publish_on_commit(STATUS_TOPIC)
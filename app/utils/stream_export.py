@@ -0,0 +1,89 @@
+"""Streaming CSV and NDJSON export of survey submissions."""
+import csv
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.conf import settings
+
+from app.utils.xlsx_export import iter_export_rows
+
+# Spreadsheets evaluate cells starting with these as formulas
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+STREAM_CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class Echo:
+    """File-like object that returns what is written instead of storing it, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def to_json_value(value):
+    """Convert an exported value to something json can encode."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+def to_excel_value(value):
+    """Quote text that a spreadsheet would run as a formula, answers are written by the public."""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def batched(lines, size: int):
+    """Join lines into strings of ``size`` lines, so a response is not sent row by row."""
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= size:
+            yield ''.join(batch)
+            batch = []
+    if batch:
+        yield ''.join(batch)
+
+
+def stream_submissions_csv(resource, queryset, excel: bool = False):
+    """
+    Yield a CSV export of the submissions, header first, with the column labels of the xlsx export.
+
+    Values are written as they are, for machine consumers. With ``excel``,
+    text starting like a formula is prefixed with a quote, so opening the
+    file in a spreadsheet does not evaluate the answers.
+    """
+    writer = csv.writer(Echo())
+    # Sent before any row is read, so the first byte does not wait for the database.
+    # The byte order mark makes Excel read the file as UTF-8.
+    yield '\ufeff' + writer.writerow([str(header) for header in resource.get_export_headers()])
+    rows = iter_export_rows(resource, queryset, settings.EXPORT_CHUNK_SIZE)
+    if excel:
+        rows = ([to_excel_value(value) for value in row] for row in rows)
+    yield from batched((writer.writerow(row) for row in rows), settings.EXPORT_STREAM_BATCH_ROWS)
+
+
+def stream_submissions_ndjson(resource, queryset):
+    """Yield one JSON object per submission, keyed by the stable field names of the export."""
+    keys = resource.get_export_order()
+    rows = iter_export_rows(resource, queryset, settings.EXPORT_CHUNK_SIZE)
+    lines = (
+        json.dumps(dict(zip(keys, map(to_json_value, row))), ensure_ascii=False) + '\n'
+        for row in rows
+    )
+    yield from batched(lines, settings.EXPORT_STREAM_BATCH_ROWS)
+
+
+STREAM_WRITERS = {
+    'csv': stream_submissions_csv,
+    'ndjson': stream_submissions_ndjson,
+}
@@ -0,0 +1,205 @@
+"""Buffered ingestion of survey submissions through a Redis stream."""
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+
+from django.conf import settings
+from django.db import close_old_connections
+from redis.exceptions import ResponseError
+
+from app.utils.redis import get_stream_redis_client
+
+logger = logging.getLogger(__name__)
+
+SUBMISSION_STREAM = 'visa_doctors:submissions'
+SUBMISSION_STREAM_GROUP = 'ingest'
+TICKET_KEY = 'visa_doctors:submission_ticket:{}'
+
+
+class TicketStatus:
+    """States of a queued submission."""
+    PENDING = 'pending'
+    DONE = 'done'
+    FAILED = 'failed'
+
+
+def is_stream_ingestion_enabled() -> bool:
+    """Check whether submissions are queued instead of being written by the API."""
+    return settings.SUBMISSION_INGESTION_MODE == 'stream'
+
+
+def _set_ticket(client, ticket: str, status: str, **fields) -> None:
+    client.set(
+        TICKET_KEY.format(ticket),
+        json.dumps({'ticket': ticket, 'status': status, **fields}),
+        ex=settings.SUBMISSION_TICKET_TTL
+    )
+
+
+def enqueue_submission(payload: dict) -> str:
+    """
+    Append a validated submission payload to the ingestion stream.
+
+    Args:
+        payload: Result of SurveySubmissionSerializer.get_ingestion_payload
+
+    Returns:
+        str: Ticket ID the client can poll the submission status with
+    """
+    ticket = uuid.uuid4().hex
+    client = get_stream_redis_client()
+    pipe = client.pipeline()
+    _set_ticket(pipe, ticket, TicketStatus.PENDING)
+    pipe.xadd(
+        SUBMISSION_STREAM,
+        {'ticket': ticket, 'payload': json.dumps(payload)},
+        maxlen=settings.SUBMISSION_STREAM_MAX_LENGTH,
+        approximate=True
+    )
+    pipe.execute()
+    return ticket
+
+
+def get_ticket(ticket: str) -> dict | None:
+    """Return the state of a ticket, or None if it is unknown or expired."""
+    stored = get_stream_redis_client().get(TICKET_KEY.format(ticket))
+    return json.loads(stored) if stored else None
+
+
+class SubmissionIngestor:
+    """
+    Consumer of the submission stream.
+
+    Entries are read in batches through a consumer group, validated again
+    with SurveySubmissionSerializer and written with its bulk path in one
+    transaction per batch. When the batch insert fails, every entry is
+    saved on its own and the ones that still fail are marked FAILED, so a
+    single bad entry cannot block the stream. Entries are acknowledged only
+    after their tickets are updated, so a worker that dies mid-batch leaves them pending
+    and they are claimed again by the next worker after
+    settings.SUBMISSION_STREAM_CLAIM_IDLE milliseconds.
+    """
+
+    def __init__(self, batch_size: int = 100, block_ms: int = 5000, consumer: str = None):
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.consumer = consumer or f'{socket.gethostname()}-{os.getpid()}'
+        self.client = get_stream_redis_client()
+
+    def ensure_group(self) -> None:
+        """Create the consumer group and the stream if they do not exist yet."""
+        try:
+            self.client.xgroup_create(SUBMISSION_STREAM, SUBMISSION_STREAM_GROUP, id='0', mkstream=True)
+        except ResponseError as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+
+    def read_batch(self) -> list[tuple[bytes, dict]]:
+        """Return stale entries of dead consumers first, then new entries."""
+        _, entries, *_ = self.client.xautoclaim(
+            SUBMISSION_STREAM, SUBMISSION_STREAM_GROUP, self.consumer,
+            min_idle_time=settings.SUBMISSION_STREAM_CLAIM_IDLE, start_id='0-0', count=self.batch_size
+        )
+        # Entries deleted from the stream while pending are returned without fields
+        deleted = [entry_id for entry_id, fields in entries if not fields]
+        if deleted:
+            self.client.xack(SUBMISSION_STREAM, SUBMISSION_STREAM_GROUP, *deleted)
+        entries = [(entry_id, fields) for entry_id, fields in entries if fields]
+        if entries:
+            return entries
+
+        response = self.client.xreadgroup(
+            SUBMISSION_STREAM_GROUP, self.consumer, {SUBMISSION_STREAM: '>'},
+            count=self.batch_size, block=self.block_ms
+        )
+        return response[0][1] if response else []
+
+    def process_batch(self, entries: list[tuple[bytes, dict]]) -> int:
+        """
+        Persist a batch of stream entries.
+
+        Returns:
+            int: Number of submissions created
+        """
+        from app.serializers.survey import SurveySubmissionSerializer
+
+        close_old_connections()
+        valid = []
+        for entry_id, fields in entries:
+            ticket = fields[b'ticket'].decode()
+            state = get_ticket(ticket)
+            if state and state['status'] != TicketStatus.PENDING:
+                # Already handled by a worker that died before acknowledging
+                continue
+            serializer = SurveySubmissionSerializer(data=json.loads(fields[b'payload']))
+            if serializer.is_valid():
+                valid.append((ticket, serializer.validated_data))
+            else:
+                logger.warning(f"Queued submission {ticket} is no longer valid: {serializer.errors}")
+                _set_ticket(self.client, ticket, TicketStatus.FAILED, errors=serializer.errors)
+
+        created = 0
+        if valid:
+            try:
+                submissions = SurveySubmissionSerializer.save_submissions([data for _, data in valid])
+            except Exception as e:
+                logger.error(f"Batch insert of {len(valid)} queued submissions failed, saving them one by one: {e}")
+                created = self.save_one_by_one(valid)
+            else:
+                pipe = self.client.pipeline()
+                for (ticket, _), submission in zip(valid, submissions):
+                    _set_ticket(pipe, ticket, TicketStatus.DONE, submission_id=submission.id)
+                pipe.execute()
+                created = len(submissions)
+
+        entry_ids = [entry_id for entry_id, _ in entries]
+        self.client.xack(SUBMISSION_STREAM, SUBMISSION_STREAM_GROUP, *entry_ids)
+        self.client.xdel(SUBMISSION_STREAM, *entry_ids)
+        return created
+
+    def save_one_by_one(self, valid: list[tuple[str, dict]]) -> int:
+        """
+        Save submissions in their own transactions, marking the ones that fail as FAILED.
+
+        Args:
+            valid: Pairs of ticket and validated data
+
+        Returns:
+            int: Number of submissions created
+        """
+        from app.serializers.survey import SurveySubmissionSerializer
+
+        created = 0
+        for ticket, validated_data in valid:
+            try:
+                submission, = SurveySubmissionSerializer.save_submissions([validated_data])
+            except Exception as e:
+                logger.error(f"Queued submission {ticket} could not be saved: {e}", exc_info=True)
+                _set_ticket(self.client, ticket, TicketStatus.FAILED, errors={'detail': str(e)})
+            else:
+                _set_ticket(self.client, ticket, TicketStatus.DONE, submission_id=submission.id)
+                created += 1
+        return created
+
+    def run(self, once: bool = False) -> None:
+        """Drain the stream until interrupted, or until it is empty if once is set."""
+        self.ensure_group()
+        logger.info(f"Submission ingestor {self.consumer} started")
+        while True:
+            try:
+                entries = self.read_batch()
+                if not entries:
+                    if once:
+                        return
+                    continue
+                created = self.process_batch(entries)
+                logger.info(f"Ingested {created} of {len(entries)} queued submissions")
+            except Exception as e:
+                # Unacknowledged entries are claimed again once they are idle long enough
+                logger.error(f"Submission ingestion failed: {e}", exc_info=True)
+                if once:
+                    raise
+                time.sleep(1)
@@ -0,0 +1,297 @@
+"""Process-local registry of immutable survey descriptors."""
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.utils import translation
+
+from app.models import Survey, Question, AnswerOption
+from app.utils.invalidation import invalidation_bus
+
+logger = logging.getLogger(__name__)
+
+SURVEY_TOPIC = 'survey'
+
+
+@dataclass(frozen=True)
+class FieldTypeDescriptor:
+    """Snapshot of an InputFieldType."""
+    id: int
+    title: str
+    field_key: str
+    field_type_choice: str
+
+
+@dataclass(frozen=True)
+class OptionDescriptor:
+    """Snapshot of an AnswerOption."""
+    id: int
+    question_id: int
+    parent_id: int | None
+    text: str
+    export_field_name: str | None
+    order: int
+    level: int
+    tree_id: int
+    lft: int
+    rght: int
+    is_selectable: bool
+    has_custom_input: bool
+
+    @property
+    def is_root(self) -> bool:
+        return self.parent_id is None
+
+    @property
+    def has_descendants(self) -> bool:
+        return self.rght - self.lft > 1
+
+
+@dataclass(frozen=True)
+class QuestionDescriptor:
+    """Snapshot of a Question with its field type and answer options in tree order."""
+    id: int
+    survey_id: int
+    title: str
+    input_type: str
+    order: int
+    is_required: bool
+    is_title: bool
+    field_type: FieldTypeDescriptor | None
+    options: tuple[OptionDescriptor, ...] = ()
+
+    @property
+    def is_choice(self) -> bool:
+        return self.input_type in (Question.InputType.SINGLE_CHOICE, Question.InputType.MULTIPLE_CHOICE)
+
+    @property
+    def root_options(self) -> list[OptionDescriptor]:
+        """Top level options sorted by order and text, as shown in the admin."""
+        return sorted((option for option in self.options if option.is_root), key=lambda o: (o.order, o.text))
+
+    @property
+    def option_families(self) -> list[OptionDescriptor]:
+        """Root options that have descendants and get a separate filter and export column."""
+        return [option for option in self.root_options if option.has_descendants]
+
+    def get_children(self, option_id: int) -> list[OptionDescriptor]:
+        """Direct children of an option in tree order."""
+        return [option for option in self.options if option.parent_id == option_id]
+
+    def get_descendants(self, option: OptionDescriptor, include_self: bool = False) -> list[OptionDescriptor]:
+        """Descendants of an option in tree order."""
+        return [
+            o for o in self.options
+            if o.tree_id == option.tree_id and (option.lft < o.lft < option.rght or (include_self and o.id == option.id))
+        ]
+
+
+@dataclass(frozen=True)
+class SurveyDescriptor:
+    """Snapshot of a Survey with its questions ordered by ``order``."""
+    id: int
+    title: str
+    slug: str
+    is_active: bool
+    is_default: bool
+    telegram_topic_id: int | None
+    notification_digest_window: int
+    questions: tuple[QuestionDescriptor, ...] = ()
+
+    @property
+    def title_question(self) -> QuestionDescriptor | None:
+        return next((question for question in self.questions if question.is_title), None)
+
+    @property
+    def required_questions(self) -> list[QuestionDescriptor]:
+        return [question for question in self.questions if question.is_required]
+
+
+@dataclass(frozen=True)
+class SurveySnapshot:
+    """All surveys of one language, with lookup maps by ID."""
+    language: str
+    built_at: float
+    surveys: dict[int, SurveyDescriptor] = field(default_factory=dict)
+    questions: dict[int, QuestionDescriptor] = field(default_factory=dict)
+    options: dict[int, OptionDescriptor] = field(default_factory=dict)
+
+    def get_survey(self, survey_id) -> SurveyDescriptor | None:
+        """Return a survey by ID, accepting raw query parameter values."""
+        try:
+            return self.surveys.get(int(survey_id))
+        except (TypeError, ValueError):
+            return None
+
+    def get_default_survey(self, active_only: bool = True) -> SurveyDescriptor | None:
+        """Return the default survey, optionally only if it is active."""
+        return next(
+            (s for s in self.surveys.values() if s.is_default and (s.is_active or not active_only)),
+            None
+        )
+
+    def get_first_active_survey(self) -> SurveyDescriptor | None:
+        """Return the active survey with the lowest ID."""
+        return next((s for s in self.surveys.values() if s.is_active), None)
+
+    def get_active_surveys(self) -> list[SurveyDescriptor]:
+        """Return active surveys sorted by title."""
+        return sorted((s for s in self.surveys.values() if s.is_active), key=lambda s: s.title)
+
+    def get_question(self, question_id) -> QuestionDescriptor | None:
+        try:
+            return self.questions.get(int(question_id))
+        except (TypeError, ValueError):
+            return None
+
+    def get_option(self, option_id) -> OptionDescriptor | None:
+        try:
+            return self.options.get(int(option_id))
+        except (TypeError, ValueError):
+            return None
+
+    def get_descendant_ids(self, option_id, include_self: bool = False) -> list[int]:
+        """Return IDs of all descendants of an option, empty if the option does not exist."""
+        option = self.get_option(option_id)
+        if option is None:
+            return []
+        return [
+            o.id for o in self.options.values()
+            if o.tree_id == option.tree_id and (option.lft < o.lft < option.rght or (include_self and o.id == option.id))
+        ]
+
+    def get_questions(self, survey_id=None) -> tuple[QuestionDescriptor, ...]:
+        """Return the questions of a survey, or of all surveys if survey_id is empty."""
+        if not survey_id:
+            return tuple(sorted(self.questions.values(), key=lambda q: (q.order, q.id)))
+        survey = self.get_survey(survey_id)
+        return survey.questions if survey else ()
+
+
+def build_survey_snapshot(language: str) -> SurveySnapshot:
+    """
+    Load every survey, question and answer option with three queries.
+
+    Args:
+        language: Language code translated fields are read in
+
+    Returns:
+        SurveySnapshot: Immutable snapshot of all surveys
+    """
+    with translation.override(language):
+        options_by_question = {}
+        options = {}
+        for option in AnswerOption.objects.all():
+            descriptor = OptionDescriptor(
+                id=option.id,
+                question_id=option.question_id,
+                parent_id=option.parent_id,
+                text=option.text,
+                export_field_name=option.export_field_name,
+                order=option.order,
+                level=option.level,
+                tree_id=option.tree_id,
+                lft=option.lft,
+                rght=option.rght,
+                is_selectable=option.is_selectable,
+                has_custom_input=option.has_custom_input,
+            )
+            options[option.id] = descriptor
+            options_by_question.setdefault(option.question_id, []).append(descriptor)
+
+        questions_by_survey = {}
+        questions = {}
+        for question in Question.objects.select_related('field_type').order_by('order', 'id'):
+            field_type = question.field_type
+            descriptor = QuestionDescriptor(
+                id=question.id,
+                survey_id=question.survey_id,
+                title=question.title,
+                input_type=question.input_type,
+                order=question.order,
+                is_required=question.is_required,
+                is_title=question.is_title,
+                field_type=FieldTypeDescriptor(
+                    id=field_type.id,
+                    title=field_type.title,
+                    field_key=field_type.field_key,
+                    field_type_choice=field_type.field_type_choice,
+                ) if field_type else None,
+                options=tuple(options_by_question.get(question.id, ())),
+            )
+            questions[question.id] = descriptor
+            questions_by_survey.setdefault(question.survey_id, []).append(descriptor)
+
+        surveys = {
+            survey.id: SurveyDescriptor(
+                id=survey.id,
+                title=survey.title,
+                slug=survey.slug,
+                is_active=survey.is_active,
+                is_default=survey.is_default,
+                telegram_topic_id=survey.telegram_topic_id,
+                notification_digest_window=survey.notification_digest_window,
+                questions=tuple(questions_by_survey.get(survey.id, ())),
+            )
+            for survey in Survey.objects.order_by('id')
+        }
+
+    return SurveySnapshot(
+        language=language, built_at=time.monotonic(), surveys=surveys, questions=questions, options=options
+    )
+
+
+class SurveyRegistry:
+    """
+    Per-process cache of survey snapshots, one per language.
+
+    Snapshots are dropped whenever a survey related model changes in any
+    process (see app.signals) and, as a safety net, after
+    settings.SURVEY_REGISTRY_TTL seconds.
+    """
+
+    def __init__(self):
+        self._snapshots: dict[str, SurveySnapshot] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, language: str = None) -> SurveySnapshot:
+        """Return the snapshot for a language, building it if missing or expired."""
+        invalidation_bus.ensure_listening()
+        language = language or translation.get_language() or settings.LANGUAGE_CODE
+
+        snapshot = self._snapshots.get(language)
+        if snapshot is not None and time.monotonic() - snapshot.built_at < settings.SURVEY_REGISTRY_TTL:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshots.get(language)
+            if snapshot is not None and time.monotonic() - snapshot.built_at < settings.SURVEY_REGISTRY_TTL:
+                return snapshot
+            generation = self._generation
+            snapshot = build_survey_snapshot(language)
+            # Do not keep a snapshot that was invalidated while it was being built
+            if generation == self._generation:
+                self._snapshots[language] = snapshot
+        return snapshot
+
+    def invalidate(self) -> None:
+        """Drop all snapshots of this process."""
+        self._generation += 1
+        self._snapshots = {}
+
+
+survey_registry = SurveyRegistry()
+invalidation_bus.register(SURVEY_TOPIC, survey_registry.invalidate)
+
+
+def get_survey_snapshot(language: str = None) -> SurveySnapshot:
+    """Return the survey snapshot of the current (or given) language."""
+    return survey_registry.get(language)
+
+
+def publish_survey_change() -> None:
+    """Invalidate survey snapshots in every process once the current transaction commits."""
+    invalidation_bus.publish_on_commit(SURVEY_TOPIC)
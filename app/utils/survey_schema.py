@@ -0,0 +1,122 @@
+"""Precompiled survey schema snapshots for the questions endpoint."""
+import logging
+from dataclasses import dataclass
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import translation
+from rest_framework.renderers import JSONRenderer
+
+from app.models import Question, Survey
+from app.utils.option_tree import AnswerOptionTree
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_CACHE_TIMEOUT = 60 * 60 * 24 * 7  # 1 week, snapshots are rebuilt on every change anyway
+
+
+@dataclass(frozen=True)
+class SurveySchema:
+    """Pre-serialized question tree of a survey in one language."""
+    survey_id: int
+    version: int
+    language: str
+    body: bytes
+
+    @property
+    def etag(self) -> str:
+        """Strong ETag derived from the schema version."""
+        return f'"survey-{self.survey_id}-v{self.version}-{self.language}"'
+
+
+def _schema_cache_key(survey_id: int, language: str) -> str:
+    return f'survey_schema:{survey_id}:{language}'
+
+
+def get_question_queryset():
+    """Return the question queryset used to serialize the survey schema.
+
+    Answer options are not prefetched here, serializers read them from an AnswerOptionTree.
+    """
+    return Question.objects.select_related('field_type')
+
+
+def build_survey_schema(survey_id: int, version: int, language: str) -> SurveySchema:
+    """
+    Serialize the questions of a survey exactly as QuestionListAPIView renders them.
+
+    Args:
+        survey_id: Survey ID
+        version: Schema version the snapshot belongs to
+        language: Language code to render translated fields in
+
+    Returns:
+        SurveySchema: Snapshot with the rendered JSON body
+    """
+    from app.serializers.survey import QuestionSerializer
+
+    with translation.override(language):
+        questions = get_question_queryset().filter(survey_id=survey_id)
+        context = {'option_tree': AnswerOptionTree(questions)}
+        body = JSONRenderer().render(QuestionSerializer(questions, many=True, context=context).data)
+    return SurveySchema(survey_id=survey_id, version=version, language=language, body=body)
+
+
+def get_survey_schema(survey_id: int, language: str) -> SurveySchema | None:
+    """
+    Return the cached schema snapshot of a survey, building it on a cache miss.
+
+    Args:
+        survey_id: Survey ID
+        language: Language code
+
+    Returns:
+        SurveySchema or None if the survey does not exist
+    """
+    key = _schema_cache_key(survey_id, language)
+    schema = cache.get(key)
+    if schema is not None:
+        return schema
+
+    version = Survey.objects.nocache().filter(pk=survey_id).values_list('schema_version', flat=True).first()
+    if version is None:
+        return None
+
+    schema = build_survey_schema(survey_id, version, language)
+    # add() never overwrites a snapshot stored by a concurrent rebuild with a newer version
+    cache.add(key, schema, SCHEMA_CACHE_TIMEOUT)
+    return schema
+
+
+def bump_schema_version(survey_ids: Iterable[int]) -> None:
+    """
+    Increment the schema version of the given surveys and rebuild their snapshots.
+
+    Args:
+        survey_ids: IDs of the surveys whose questions changed
+    """
+    survey_ids = {survey_id for survey_id in survey_ids if survey_id}
+    if not survey_ids:
+        return
+
+    # invalidated_update() drops the cacheops entries that plain update() would leave stale
+    Survey.objects.filter(pk__in=survey_ids).invalidated_update(schema_version=F('schema_version') + 1)
+    versions = Survey.objects.nocache().filter(pk__in=survey_ids).values_list('id', 'schema_version')
+    for survey_id, version in versions:
+        for language, _name in settings.LANGUAGES:
+            try:
+                schema = build_survey_schema(survey_id, version, language)
+                cache.set(_schema_cache_key(survey_id, language), schema, SCHEMA_CACHE_TIMEOUT)
+            except Exception as e:
+                # Drop the stale snapshot, the next request will build it
+                logger.error(f"Failed to rebuild schema of survey {survey_id} ({language}): {e}", exc_info=True)
+                cache.delete(_schema_cache_key(survey_id, language))
+
+
+def schedule_schema_rebuild(survey_ids: Iterable[int]) -> None:
+    """Bump schema versions once the current transaction commits."""
+    survey_ids = set(survey_ids)
+    transaction.on_commit(lambda: bump_schema_version(survey_ids))
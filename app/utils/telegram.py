@@ -1,8 +1,6 @@
 """Telegram notification functionality."""
-import asyncio
 import logging
 import html
-import threading
 from asgiref.sync import sync_to_async
 
 from aiogram import Bot
@@ -11,29 +9,21 @@ from aiogram.enums import ParseMode
 from aiogram.fsm.context import FSMContext
 from aiogram.exceptions import TelegramAPIError
 from django.conf import settings
-from django.utils import timezone
+from django.core.cache import cache
+from django.utils.translation import get_language
 
-from app.models import SurveySubmission, Response, SubmissionStatus
+from app.models import SurveySubmission, Response
 from bot.states import FilterStates
 from app.utils.db_reconnect import with_db_reconnect, with_db_reconnect_async
+from app.utils.status_table import get_status_table
+from app.utils.survey_registry import get_survey_snapshot
+from app.utils.telegram_dispatcher import telegram_dispatcher
 
 logger = logging.getLogger(__name__)
 
 
 # --- Telegram Bot and Topic Management Utilities ---
 
-async def get_bot_instance() -> Bot | None:
-    """Initializes and returns a Bot instance based on settings.
-    Returns None if token is not configured.
-    """
-    token = getattr(settings, 'TELEGRAM_BOT_TOKEN', None)
-    if not token:
-        # This case will be handled in the model's save method to raise ValidationError
-        logger.error("TELEGRAM_BOT_TOKEN is not configured.")
-        return None
-    return Bot(token=token)
-
-
 async def get_chat_info(bot: Bot, chat_id: str):
     """Gets information about a chat. Raises TelegramAPIError on failure."""
     return await bot.get_chat(chat_id=chat_id)
@@ -117,9 +107,13 @@ async def get_survey_topic_id_from_submission(submission_id: int) -> int | None:
     @sync_to_async(thread_sensitive=True)
     def _get_survey_topic_id_sync():
         try:
-            submission = SurveySubmission.objects.select_related('survey').get(id=submission_id)
-            if submission.survey and submission.survey.telegram_topic_id is not None:
-                return submission.survey.telegram_topic_id
+            survey_id = SurveySubmission.objects.filter(id=submission_id).values_list('survey_id', flat=True).first()
+            if survey_id is None:
+                raise SurveySubmission.DoesNotExist
+            # Topic IDs come from the in-memory survey registry
+            survey = get_survey_snapshot().get_survey(survey_id)
+            if survey and survey.telegram_topic_id is not None:
+                return survey.telegram_topic_id
             return None
         except SurveySubmission.DoesNotExist:
             logger.warning(f"SurveySubmission with id {submission_id} does not exist when trying to get topic_id.") # Matched user's log message format
@@ -186,53 +180,60 @@ async def send_telegram_message(message: str, submission_id: int = None, survey_
         )
         return False
 
-    bot = None
-    actual_topic_id = survey_topic_id
     try:
-        bot = await get_bot_instance()
-        if not bot:
-            # This case should ideally be prevented by checks in Survey.save(),
-            # but as a fallback, log and exit if bot isn't configured.
-            logger.error("send_telegram_message: Bot instance could not be created. TELEGRAM_BOT_TOKEN likely missing.")
-            return False
-
-        if submission_id and actual_topic_id is None:
-            # If submission_id is provided and no explicit topic_id, try to get it from survey
-            # This call is already async due to @sync_to_async
-            actual_topic_id = await get_survey_topic_id_from_submission(submission_id)
-            if actual_topic_id:
-                logger.info(f"Retrieved topic_id {actual_topic_id} for submission {submission_id} to send message.")
-            else:
-                logger.info(
-                    f"No specific topic_id found for submission {submission_id}, message will be sent to general chat if configured, or fail if chat is forum-only.")
-
-        # Create inline keyboard with buttons if submission_id is provided
-        keyboard = None
-        if submission_id:
-            keyboard = await create_submission_keyboard(submission_id)
-
-        await bot.send_message(
-            chat_id=chat_id,
-            text=message,
-            parse_mode=ParseMode.HTML,
-            reply_markup=keyboard,
-            message_thread_id=actual_topic_id if actual_topic_id != 1 else None,  # Send to specific topic if ID is available
-            disable_web_page_preview=True
-        )
+        await telegram_dispatcher.run(deliver_telegram_message, message, submission_id, survey_topic_id)
         return True
     except Exception as e:
         logger.error(f"Failed to send Telegram notification: {e}", exc_info=True)
-        if bot:
-            await notify_admin_about_error(
-                bot=bot,
-                error=e,
-                context="Guruhga xabar yuborib bo'lmadi",
-                submission_id=submission_id
-            )
+        await telegram_dispatcher.run(
+            notify_admin_about_error,
+            error=e,
+            context="Guruhga xabar yuborib bo'lmadi",
+            submission_id=submission_id
+        )
         return False
-    finally:
-        if bot:
-            await bot.session.close()
+
+
+async def deliver_telegram_message(bot: Bot, message: str, submission_id: int = None,
+                                   survey_topic_id: int | None = None,
+                                   reply_markup: InlineKeyboardMarkup = None) -> None:
+    """
+    Send a message to the configured Telegram chat with the given bot.
+
+    Unlike send_telegram_message, the bot session is left open and errors are
+    raised to the caller.
+
+    Args:
+        bot: Bot instance to send the message with
+        message: Formatted message text to send
+        submission_id: ID of the submission to create admin link (optional)
+        survey_topic_id: Forum topic to post to, looked up from the submission if omitted
+        reply_markup: Keyboard for messages that are not about a single submission
+    """
+    actual_topic_id = survey_topic_id
+    if submission_id and actual_topic_id is None:
+        # If submission_id is provided and no explicit topic_id, try to get it from survey
+        # This call is already async due to @sync_to_async
+        actual_topic_id = await get_survey_topic_id_from_submission(submission_id)
+        if actual_topic_id:
+            logger.info(f"Retrieved topic_id {actual_topic_id} for submission {submission_id} to send message.")
+        else:
+            logger.info(
+                f"No specific topic_id found for submission {submission_id}, message will be sent to general chat if configured, or fail if chat is forum-only.")
+
+    # Create inline keyboard with buttons if submission_id is provided
+    keyboard = reply_markup
+    if submission_id:
+        keyboard = await create_submission_keyboard(submission_id)
+
+    await bot.send_message(
+        chat_id=settings.TELEGRAM_CHAT_ID,
+        text=message,
+        parse_mode=ParseMode.HTML,
+        reply_markup=keyboard,
+        message_thread_id=actual_topic_id if actual_topic_id != 1 else None,  # Send to specific topic if ID is available
+        disable_web_page_preview=True
+    )
 
 
 @sync_to_async
@@ -246,7 +247,8 @@ def get_submission_data(submission_id: int):
     Returns:
         tuple: (submission, responses)
     """
-    submission = SurveySubmission.objects.get(id=submission_id)
+    # The message is formatted in an async context, so everything it reads is loaded here
+    submission = SurveySubmission.objects.select_related('status').get(id=submission_id)
     responses = (
         Response.objects
         .filter(submission_id=submission_id)
@@ -257,119 +259,127 @@ def get_submission_data(submission_id: int):
     return submission, list(responses)
 
 
-async def format_submission_notification(submission_id: int) -> str:
+async def render_submission_notification(submission_id: int) -> str:
     """
     Format a message about a new submission, using field_key instead of question.title,
     with decorative elements and improved formatting.
+
+    Raises:
+        SurveySubmission.DoesNotExist: If the submission does not exist
     """
-    try:
-        submission, responses = await get_submission_data(submission_id)
-        current_time = timezone.now().strftime("%d.%m.%Y %H:%M:%S")
+    submission, responses = await get_submission_data(submission_id)
+    # The time of the submission, so a rendered card stays valid until the submission changes
+    created_at = submission.created_at.strftime("%d.%m.%Y %H:%M:%S")
+
+    # Separator line
+    separator = "━━━━━━━━━━━━━━━━━━━━"
+
+    # Message header
+    message_lines = [
+        "<b>📋 YANGI ARIZA</b>",
+        separator,
+        f"<b>Ariza ID:</b> #{submission_id}",
+        f"<b>Vaqt:</b> {created_at}",
+        f"<b>Holati:</b> {html.escape(submission.status.code)}",
+        "",
+        "<b>Ma'lumotlar:</b>",
+        separator
+    ]
 
-        # Separator line
-        separator = "━━━━━━━━━━━━━━━━━━━━"
+    # Iterate through all responses
+    for response in responses:
+        # Use field_key (if not, use question.title as a fallback)
+        field_key = (response.question.field_type.field_key
+                     if response.question.field_type
+                     else response.question.title)
 
-        # Message header
-        message_lines = [
-            "<b>📋 YANGI ARIZA</b>",
-            separator,
-            f"<b>Ariza ID:</b> #{submission_id}",
-            f"<b>Vaqt:</b> {current_time}",
-            f"<b>Holati:</b> {html.escape(submission.status.code)}",
-            "",
-            "<b>Ma'lumotlar:</b>",
-            separator
-        ]
+        # For text responses
+        if response.question.input_type == 'text':
+            safe_key = html.escape(field_key)
+            safe_value = html.escape(response.text_answer or "Ko'rsatilmagan")
+            message_lines.append(f"""  • <b>{safe_key}:</b> {safe_value}""")
+            continue
+
+        # For multiple choice options (if it's checkboxes, selects, etc.)
+        selected_options = list(response.selected_options.all())
 
-        # Iterate through all responses
-        for response in responses:
-            # Use field_key (if not, use question.title as a fallback)
-            field_key = (response.question.field_type.field_key
-                         if response.question.field_type
-                         else response.question.title)
+        if selected_options:
+            # Sort: first with parent, then single
+            sorted_options = sorted(selected_options, key=lambda opt: opt.parent is None)
 
-            # For text responses
-            if response.question.input_type == 'text':
+            if len(sorted_options) > 1:
                 safe_key = html.escape(field_key)
-                safe_value = html.escape(response.text_answer or "Ko'rsatilmagan")
-                message_lines.append(f"""  • <b>{safe_key}:</b> {safe_value}""")
-                continue
-
-            # For multiple choice options (if it's checkboxes, selects, etc.)
-            selected_options = list(response.selected_options.all())
-
-            if selected_options:
-                # Sort: first with parent, then single
-                sorted_options = sorted(selected_options, key=lambda opt: opt.parent is None)
-
-                if len(sorted_options) > 1:
-                    safe_key = html.escape(field_key)
-                    message_lines.append(f"  • <b>{safe_key}:</b>")
-                    for option in sorted_options:
-                        # If the option has a custom input and user input
-                        if option.has_custom_input and response.text_answer:
-                            if option.parent:
-                                parent_text = html.escape(option.parent.text)
-                                answer_text = html.escape(response.text_answer)
-                                message_lines.append(f"    ◦ {parent_text} → {answer_text}")
-                            else:
-                                answer_text = html.escape(response.text_answer)
-                                message_lines.append(f"    ◦ {answer_text}")
-                        else:
-                            if option.parent:
-                                parent_text = html.escape(option.parent.text)
-                                option_text = html.escape(option.text)
-                                message_lines.append(f"    ◦ {parent_text} → {option_text}")
-                            else:
-                                option_text = html.escape(option.text)
-                                message_lines.append(f"    ◦ {option_text}")
-                else:
-                    option = sorted_options[0]
+                message_lines.append(f"  • <b>{safe_key}:</b>")
+                for option in sorted_options:
                     # If the option has a custom input and user input
                     if option.has_custom_input and response.text_answer:
                         if option.parent:
-                            safe_key = html.escape(field_key)
                             parent_text = html.escape(option.parent.text)
                             answer_text = html.escape(response.text_answer)
-                            message_lines.append(f"  • <b>{safe_key}:</b> {parent_text} → {answer_text}")
+                            message_lines.append(f"    ◦ {parent_text} → {answer_text}")
                         else:
-                            safe_key = html.escape(field_key)
                             answer_text = html.escape(response.text_answer)
-                            message_lines.append(f"  • <b>{safe_key}:</b> {answer_text}")
+                            message_lines.append(f"    ◦ {answer_text}")
                     else:
                         if option.parent:
-                            safe_key = html.escape(field_key)
                             parent_text = html.escape(option.parent.text)
                             option_text = html.escape(option.text)
-                            message_lines.append(f"  • <b>{safe_key}:</b> {parent_text} → {option_text}")
+                            message_lines.append(f"    ◦ {parent_text} → {option_text}")
                         else:
-                            safe_key = html.escape(field_key)
                             option_text = html.escape(option.text)
-                            message_lines.append(f"  • <b>{safe_key}:</b> {option_text}")
-
-            # If the user didn't select anything
+                            message_lines.append(f"    ◦ {option_text}")
             else:
-                safe_key = html.escape(field_key)
-                message_lines.append(f"  • <b>{safe_key}:</b> Ko'rsatilmagan")
-
-        # Add a comment if it exists
-        if submission.comment:
-            message_lines.extend([
-                "",
-                "<b>💬 Izoh:</b>",
-                separator,
-                html.escape(submission.comment)
-            ])
+                option = sorted_options[0]
+                # If the option has a custom input and user input
+                if option.has_custom_input and response.text_answer:
+                    if option.parent:
+                        safe_key = html.escape(field_key)
+                        parent_text = html.escape(option.parent.text)
+                        answer_text = html.escape(response.text_answer)
+                        message_lines.append(f"  • <b>{safe_key}:</b> {parent_text} → {answer_text}")
+                    else:
+                        safe_key = html.escape(field_key)
+                        answer_text = html.escape(response.text_answer)
+                        message_lines.append(f"  • <b>{safe_key}:</b> {answer_text}")
+                else:
+                    if option.parent:
+                        safe_key = html.escape(field_key)
+                        parent_text = html.escape(option.parent.text)
+                        option_text = html.escape(option.text)
+                        message_lines.append(f"  • <b>{safe_key}:</b> {parent_text} → {option_text}")
+                    else:
+                        safe_key = html.escape(field_key)
+                        option_text = html.escape(option.text)
+                        message_lines.append(f"  • <b>{safe_key}:</b> {option_text}")
+
+        # If the user didn't select anything
+        else:
+            safe_key = html.escape(field_key)
+            message_lines.append(f"  • <b>{safe_key}:</b> Ko'rsatilmagan")
+
+    # Add a comment if it exists
+    if submission.comment:
+        message_lines.extend([
+            "",
+            "<b>💬 Izoh:</b>",
+            separator,
+            html.escape(submission.comment)
+        ])
 
-        # Add a bottom separator line
-        message_lines.append(separator)
+    # Add a bottom separator line
+    message_lines.append(separator)
+
+    # Closing message
+    message_lines.append("")
+    message_lines.append("<i>Batafsil ma'lumot uchun admin panelni tekshiring.</i>")
 
-        # Closing message
-        message_lines.append("")
-        message_lines.append("<i>Batafsil ma'lumot uchun admin panelni tekshiring.</i>")
+    return "\n".join(message_lines)
 
-        return "\n".join(message_lines)
 
+async def format_submission_notification(submission_id: int) -> str:
+    """Format a message about a new submission, falling back to a short notice on errors."""
+    try:
+        return await render_submission_notification(submission_id)
     except Exception as e:
         logger.error(f"Error formatting submission notification: {e}")
         return (
@@ -379,6 +389,77 @@ async def format_submission_notification(submission_id: int) -> str:
         )
 
 
+@sync_to_async
+def get_digest_data(submission_ids: list[int]):
+    """
+    Get the submissions of a digest, their survey and the answers to its title question.
+
+    Returns:
+        tuple: (submissions, title answers by submission ID, survey snapshot or None)
+    """
+    submissions = list(SurveySubmission.objects.select_related('status').filter(id__in=submission_ids).order_by('id'))
+    titles = {}
+    survey = None
+    if submissions:
+        survey = get_survey_snapshot().get_survey(submissions[0].survey_id)
+        if survey and survey.title_question:
+            titles = dict(
+                Response.objects
+                .filter(submission_id__in=submission_ids, question_id=survey.title_question.id)
+                .values_list('submission_id', 'text_answer')
+            )
+    return submissions, titles, survey
+
+
+async def format_submission_digest(submission_ids: list[int]) -> tuple[str, InlineKeyboardMarkup]:
+    """
+    Format one message about several new submissions of a survey.
+
+    Every submission gets a button that posts its full card, with the usual
+    status and comment buttons, as a reply to the digest.
+
+    Returns:
+        tuple: (message text, keyboard)
+    """
+    submissions, titles, survey = await get_digest_data(submission_ids)
+    separator = "━━━━━━━━━━━━━━━━━━━━"
+
+    message_lines = [
+        f"<b>📋 YANGI ARIZALAR: {len(submissions)}</b>",
+        separator,
+    ]
+    if survey:
+        message_lines.append(f"<b>So'rovnoma:</b> {html.escape(survey.title)}")
+        message_lines.append(separator)
+
+    for submission in submissions:
+        created_at = submission.created_at.strftime("%H:%M")
+        line = f"  • <b>#{submission.id}</b> {created_at} · {html.escape(submission.status.code)}"
+        title = (titles.get(submission.id) or '').strip()
+        if title:
+            if len(title) > 40:
+                title = f"{title[:40]}…"
+            line += f" · {html.escape(title)}"
+        message_lines.append(line)
+
+    message_lines.append(separator)
+    message_lines.append("")
+    message_lines.append("<i>Batafsil ko'rish uchun ariza raqamini bosing.</i>")
+
+    base_url = getattr(settings, 'BASE_URL', 'http://localhost:8000')
+    ids = ','.join(str(submission.id) for submission in submissions)
+    buttons = [
+        InlineKeyboardButton(text=f"#{submission.id}", callback_data=f"show_submission:{submission.id}")
+        for submission in submissions
+    ]
+    keyboard = [buttons[i:i + 4] for i in range(0, len(buttons), 4)]
+    keyboard.append([
+        InlineKeyboardButton(text="Admin panelda ko'rish", url=f"{base_url}/admin/app/surveysubmission/?id__in={ids}")
+    ])
+
+    return "\n".join(message_lines), InlineKeyboardMarkup(inline_keyboard=keyboard)
+
+
 async def notify_new_submission(submission_id: int) -> None:
     """
     Send notification about new submission.
@@ -387,47 +468,18 @@ async def notify_new_submission(submission_id: int) -> None:
     Args:
         submission_id: ID of the submission
     """
-    bot = Bot(token=settings.TELEGRAM_BOT_TOKEN)
     try:
         message = await format_submission_notification(submission_id)
         await send_telegram_message(message, submission_id)
         logger.info(f"Telegram notification sent for submission #{submission_id}")
     except Exception as e:
         logger.error(f"Failed to send submission notification: {e}")
-        await notify_admin_about_error(
-            bot=bot,
+        await telegram_dispatcher.run(
+            notify_admin_about_error,
             error=e,
             context="Yangi ariza haqida xabar yuborib bo'lmadi",
             submission_id=submission_id
         )
-    finally:
-        await bot.session.close()
-
-
-def notify_new_submission_async(submission_id: int) -> None:
-    """
-    Asynchronously sends a notification about a new submission to Telegram.
-    Launches the process in a separate thread, not blocking the main request processing thread.
-    
-    Args:
-        submission_id: Submission ID
-    """
-
-    async def run_async():
-        await notify_new_submission(submission_id)
-
-    def run_in_thread():
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(run_async())
-        loop.close()
-
-    thread = threading.Thread(
-        target=run_in_thread,
-        daemon=True  # The thread will exit when the main process exits
-    )
-    thread.start()
-    logger.info(f"Started background notification thread for submission #{submission_id}")
 
 
 @sync_to_async
@@ -455,20 +507,20 @@ def get_submission_and_update_status(submission_id: int, new_status: str = None,
     update_fields = []
 
     if new_status:
-        try:
-            status_obj = SubmissionStatus.objects.get(code=new_status)
-            submission.status = status_obj
-            update_fields.append('status')
-        except SubmissionStatus.DoesNotExist:
+        status_obj = get_status_table().get(new_status)
+        if status_obj is None:
             logger.error(f"Status with code '{new_status}' not found")
             raise ValueError(f"Status with code '{new_status}' not found")
+        submission.status = status_obj
+        update_fields.append('status')
 
     if comment is not None:
         submission.comment = comment
         update_fields.append('comment')
 
     if update_fields:
-        submission.save(update_fields=update_fields)
+        # updated_at versions the cached card, see get_submission_card
+        submission.save(update_fields=update_fields + ['updated_at'])
 
     return submission
 
@@ -504,8 +556,7 @@ async def handle_comment_callback(callback_query: CallbackQuery, state: FSMConte
         elif action == 'comment_back':
             # Regenerate submission text and keyboard
             submission_id = int(params[0])
-            message_text = await format_submission_notification(submission_id)
-            keyboard = await create_submission_keyboard(submission_id)
+            message_text, keyboard = await get_submission_card(submission_id)
             await callback_query.message.edit_text(
                 message_text,
                 reply_markup=keyboard,
@@ -521,6 +572,23 @@ async def handle_comment_callback(callback_query: CallbackQuery, state: FSMConte
         await callback_query.answer("❌ Xatolik yuz berdi")
 
 
+async def handle_digest_callback(callback_query: CallbackQuery, state: FSMContext):
+    """Post the full card of a submission listed in a digest as a reply to it."""
+    try:
+        submission_id = int(callback_query.data.split(':')[1])
+        message_text, keyboard = await get_submission_card(submission_id)
+        await callback_query.message.reply(
+            message_text,
+            reply_markup=keyboard,
+            parse_mode=ParseMode.HTML,
+            disable_web_page_preview=True
+        )
+        await callback_query.answer()
+    except Exception as e:
+        logger.error(f"Failed to handle digest callback: {e}")
+        await callback_query.answer("❌ Xatolik yuz berdi")
+
+
 async def handle_status_callback(callback_query: CallbackQuery, state: FSMContext):
     """Handle status selection and update callbacks."""
     try:
@@ -551,8 +619,7 @@ async def handle_status_callback(callback_query: CallbackQuery, state: FSMContex
                 await get_submission_and_update_status(submission_id, new_status)
 
                 # Update message
-                message = await format_submission_notification(submission_id)
-                keyboard = await create_submission_keyboard(submission_id)
+                message, keyboard = await get_submission_card(submission_id)
 
                 await callback_query.message.edit_text(
                     text=message,
@@ -570,7 +637,7 @@ async def handle_status_callback(callback_query: CallbackQuery, state: FSMContex
         elif action == 'back_to_main':
             # Return to the main menu
             submission_id = int(params[0])
-            keyboard = await create_submission_keyboard(submission_id)
+            _, keyboard = await get_submission_card(submission_id)
             await callback_query.message.edit_reply_markup(reply_markup=keyboard)
 
             # Clear temporary storage
@@ -625,10 +692,61 @@ async def create_submission_keyboard(submission_id: int) -> InlineKeyboardMarkup
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
+@sync_to_async
+def get_submission_card_key(submission_id: int) -> str | None:
+    """Cache key of the rendered card of a submission, None if the submission does not exist."""
+    version = (
+        SurveySubmission.objects
+        .filter(id=submission_id)
+        .values_list('updated_at', 'status__updated_at', 'survey__schema_version')
+        .first()
+    )
+    if version is None:
+        return None
+    updated_at, status_updated_at, schema_version = version
+    return (
+        f'submission_card:{submission_id}:{updated_at.isoformat()}:{status_updated_at.isoformat()}'
+        f':s{schema_version}:{get_language()}'
+    )
+
+
+async def get_submission_card(submission_id: int) -> tuple[str, InlineKeyboardMarkup]:
+    """
+    Get the message text and keyboard of a submission.
+
+    Rendered cards are cached for settings.SUBMISSION_CARD_CACHE_TTL seconds
+    under the submission's ``updated_at``, which is bumped whenever its
+    status, comment or responses change (see app.signals), and the survey's
+    ``schema_version``, which changes with question titles, option texts and
+    field keys. Moderation clicks on an unchanged submission cost a single
+    lookup.
+
+    Returns:
+        tuple: (message text, keyboard)
+    """
+    key = await get_submission_card_key(submission_id)
+    card = await cache.aget(key) if key else None
+    if card is not None:
+        message_text, keyboard = card
+        return message_text, InlineKeyboardMarkup.model_validate(keyboard)
+
+    try:
+        message_text = await render_submission_notification(submission_id)
+    except Exception:
+        # Not cached, the next click tries again
+        return await format_submission_notification(submission_id), await create_submission_keyboard(submission_id)
+    keyboard = await create_submission_keyboard(submission_id)
+    if key:
+        await cache.aset(
+            key, (message_text, keyboard.model_dump(exclude_none=True)), settings.SUBMISSION_CARD_CACHE_TTL
+        )
+    return message_text, keyboard
+
+
 @sync_to_async
 def get_all_statuses():
-    """Get all statuses from the database."""
-    return list(SubmissionStatus.objects.values_list('code', 'name'))
+    """Get all statuses from the cached status table."""
+    return [(status.code, status.name) for status in get_status_table().statuses]
 
 
 async def create_status_selection_keyboard(submission_id: int, state) -> InlineKeyboardMarkup:
@@ -0,0 +1,165 @@
+"""Process-wide Telegram Bot with a single long-lived session."""
+import asyncio
+import concurrent.futures
+import logging
+import os
+import threading
+from typing import Any, Awaitable, Callable
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from django.conf import settings
+
+from app.utils.telegram_rate_limit import RateLimitMiddleware
+
+logger = logging.getLogger(__name__)
+
+BotCall = Callable[..., Awaitable[Any]]
+
+
+def create_bot() -> Bot:
+    """Create a Bot for settings.TELEGRAM_API_BASE_URL, or the official Bot API if it is empty."""
+    session = None
+    if settings.TELEGRAM_API_BASE_URL:
+        session = AiohttpSession(api=TelegramAPIServer.from_base(settings.TELEGRAM_API_BASE_URL))
+    return Bot(token=settings.TELEGRAM_BOT_TOKEN, session=session)
+
+
+class TelegramDispatcher:
+    """
+    Owns the one Bot (and aiohttp session) of a process and runs Bot API calls for everyone.
+
+    Calls are functions taking the bot as their first argument. They are put on
+    a queue and executed by worker tasks on the dispatcher's event loop, so all
+    of them share the same keep-alive connections to the Bot API. Requests of
+    the bot are paced and retried by RateLimitMiddleware.
+
+    Processes with their own event loop (the bot and the notification
+    dispatcher) ``attach`` their Bot on start-up. Anywhere else, such as
+    gunicorn workers, the first call starts a daemon thread running the loop.
+    """
+
+    def __init__(self):
+        self._bot: Bot | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue | None = None
+        self._workers: list[asyncio.Task] = []
+        self._rate_limiter: RateLimitMiddleware | None = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def bot(self) -> Bot | None:
+        return self._bot if self._pid == os.getpid() else None
+
+    def attach(self, bot: Bot = None) -> Bot:
+        """
+        Serve calls on the running event loop with the given (or a new) bot.
+
+        Returns:
+            Bot: The bot calls are made with
+        """
+        if bot is None:
+            if not settings.TELEGRAM_BOT_TOKEN:
+                raise RuntimeError("TELEGRAM_BOT_TOKEN is not configured.")
+            bot = create_bot()
+        self._rate_limiter = RateLimitMiddleware()
+        bot.session.middleware(self._rate_limiter)
+        self._bot = bot
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._workers = [
+            self._loop.create_task(self._work()) for _ in range(settings.TELEGRAM_DISPATCHER_WORKERS)
+        ]
+        self._pid = os.getpid()
+        return bot
+
+    async def close(self) -> None:
+        """Stop the workers and close the bot session."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        if self._bot is not None:
+            await self._bot.session.close()
+        self._bot = self._loop = self._queue = self._rate_limiter = self._pid = None
+        self._workers = []
+
+    def _ensure_started(self) -> None:
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            if not settings.TELEGRAM_BOT_TOKEN:
+                raise RuntimeError("TELEGRAM_BOT_TOKEN is not configured.")
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name='telegram-dispatcher', daemon=True)
+            thread.start()
+
+            async def start():
+                self.attach()
+
+            try:
+                asyncio.run_coroutine_threadsafe(start(), loop).result()
+            except BaseException:
+                # Do not leave a thread behind for every failed call
+                loop.call_soon_threadsafe(loop.stop)
+                thread.join()
+                loop.close()
+                raise
+            logger.info("Started Telegram dispatcher thread")
+
+    async def _work(self) -> None:
+        while True:
+            func, args, kwargs, future = await self._queue.get()
+            try:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    result = await func(self._bot, *args, **kwargs)
+                except Exception as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+            finally:
+                self._queue.task_done()
+
+    def submit(self, func: BotCall, *args, **kwargs) -> concurrent.futures.Future:
+        """
+        Queue ``func(bot, *args, **kwargs)`` from any thread.
+
+        Returns:
+            concurrent.futures.Future: Resolved with the result of the call
+        """
+        self._ensure_started()
+        future = concurrent.futures.Future()
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (func, args, kwargs, future))
+        return future
+
+    def call(self, func: BotCall, *args, **kwargs) -> Any:
+        """
+        Run a call from synchronous code and wait for its result.
+
+        Must not be used on the dispatcher's own event loop.
+        """
+        return self.submit(func, *args, **kwargs).result(timeout=settings.TELEGRAM_DISPATCHER_TIMEOUT)
+
+    async def run(self, func: BotCall, *args, **kwargs) -> Any:
+        """Run a call from any event loop and await its result."""
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of calls waiting for a worker."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def get_metrics(self) -> dict:
+        """Queue depth and rate limiter counters of this process."""
+        metrics = {'queued': self.queue_depth}
+        if self._rate_limiter is not None:
+            metrics.update(self._rate_limiter.get_metrics())
+        return metrics
+
+
+telegram_dispatcher = TelegramDispatcher()
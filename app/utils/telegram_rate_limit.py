@@ -0,0 +1,123 @@
+"""Rate limiting of outgoing Bot API requests."""
+import asyncio
+import logging
+import random
+from collections import Counter
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.exceptions import TelegramRetryAfter, TelegramNetworkError, TelegramServerError
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Only these methods are paced, so moderators' edits do not queue behind bulk notifications
+PACED_METHOD_PREFIXES = ('send',)
+
+
+class Pacer:
+    """
+    Spaces out requests so that at most one starts every ``interval`` seconds.
+
+    Waiters are served in arrival order. ``pause`` holds everyone back, for
+    example while Telegram flood control is in effect.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.next_at = 0.0
+        self.waiting = 0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        self.waiting += 1
+        try:
+            async with self._lock:
+                loop = asyncio.get_running_loop()
+                delay = self.next_at - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                self.next_at = max(loop.time(), self.next_at) + self.interval
+        finally:
+            self.waiting -= 1
+
+    def pause(self, seconds: float) -> None:
+        self.next_at = max(self.next_at, asyncio.get_running_loop().time() + seconds)
+
+
+class RateLimitMiddleware(BaseRequestMiddleware):
+    """
+    Bot session middleware that keeps requests under Telegram's limits.
+
+    ``send*`` requests are paced globally (settings.TELEGRAM_GLOBAL_RATE per
+    second) and, for groups, per chat (settings.TELEGRAM_GROUP_RATE per
+    minute). Other requests, such as the message edits of moderation
+    buttons, go out immediately. The limits are per process, not global:
+    every process with its own dispatcher has its own budget, so their sum
+    must stay under Telegram's limits. A ``RetryAfter`` answer pauses
+    the chat for the requested time and the request is retried, as are
+    network and server errors, with random jitter so queued requests do not
+    all fire at once. The request fails only after
+    settings.TELEGRAM_SEND_MAX_RETRIES retries.
+    """
+
+    def __init__(self):
+        self.global_pacer = Pacer(1 / settings.TELEGRAM_GLOBAL_RATE)
+        self.chat_pacers: dict[str, Pacer] = {}
+        self.counters = Counter()
+
+    def get_chat_pacer(self, chat_id) -> Pacer | None:
+        """Return the pacer of a group or channel, private chats are only paced globally."""
+        chat_id = str(chat_id)
+        if not chat_id.startswith(('-', '@')):
+            return None
+        if chat_id not in self.chat_pacers:
+            self.chat_pacers[chat_id] = Pacer(60 / settings.TELEGRAM_GROUP_RATE)
+        return self.chat_pacers[chat_id]
+
+    @staticmethod
+    def jitter() -> float:
+        return random.uniform(0, settings.TELEGRAM_RETRY_JITTER)
+
+    async def __call__(self, make_request, bot, method):
+        # Requests that do not send to a chat, like answerCallbackQuery or editMessageText, are retried but not paced
+        chat_id = getattr(method, 'chat_id', None)
+        paced = chat_id is not None and method.__api_method__.startswith(PACED_METHOD_PREFIXES)
+        chat_pacer = self.get_chat_pacer(chat_id) if paced else None
+        attempt = 0
+        while True:
+            if chat_pacer is not None:
+                await chat_pacer.wait()
+            if paced:
+                await self.global_pacer.wait()
+            try:
+                response = await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                self.counters['retry_after'] += 1
+                if attempt >= settings.TELEGRAM_SEND_MAX_RETRIES:
+                    raise
+                logger.warning(f"Flood control on {method.__api_method__} in chat {chat_id}, retrying in {e.retry_after}s")
+                delay = e.retry_after + self.jitter()
+                if not paced:
+                    await asyncio.sleep(delay)
+                else:
+                    (chat_pacer or self.global_pacer).pause(delay)
+            except (TelegramNetworkError, TelegramServerError) as e:
+                self.counters['errors'] += 1
+                if attempt >= settings.TELEGRAM_SEND_MAX_RETRIES:
+                    raise
+                delay = min(2 ** attempt, 30) + self.jitter()
+                logger.warning(f"Bot API request {method.__api_method__} failed, retrying in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+            else:
+                self.counters['sent'] += 1
+                return response
+            attempt += 1
+            self.counters['retries'] += 1
+
+    def get_metrics(self) -> dict:
+        """Requests waiting for their turn and totals since start-up."""
+        return {
+            'waiting_global': self.global_pacer.waiting,
+            'waiting_per_chat': {chat_id: p.waiting for chat_id, p in self.chat_pacers.items() if p.waiting},
+            **self.counters,
+        }
@@ -4,5 +4,7 @@ from app.views.pages import (
     ResultCategoryPreviewAPIView, ResultCategoryDetailAPIView,
     UniversityLogoListAPIView, ContactInfoAPIView
 )
-from app.views.survey import QuestionListAPIView, SurveySubmissionCreateAPIView, SurveyListAPIView
+from app.views.survey import (
+    QuestionListAPIView, SurveySubmissionCreateAPIView, SurveyListAPIView, SubmissionTicketStatusAPIView
+)
 from app.views.visa import VisaStatusCheckAPIView, VisaPDFDownloadAPIView
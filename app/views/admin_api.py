@@ -1,22 +1,33 @@
+import re
+
+from django.conf import settings
 from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
 from django.utils.decorators import method_decorator
-from drf_spectacular.utils import extend_schema, OpenApiParameter
 from django.views.decorators.cache import cache_page
 from django_filters import FilterSet
 from django_filters.rest_framework import DjangoFilterBackend
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.filters import SearchFilter, OrderingFilter
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.status import HTTP_400_BAD_REQUEST
 
 from app.filters import SurveySubmissionAPIFilter
-from app.models import SurveySubmission, Question, SubmissionStatus, Response as SurveyResponse, Survey
+from app.models import SurveySubmission, Question, SubmissionStatus, Response as SurveyResponse
+from app.resource import SurveySubmissionResource
 from app.serializers.admin_api import (
     SurveySubmissionListSerializer, SurveySubmissionDetailSerializer,
     QuestionFilterSerializer, SubmissionStatusSerializer
 )
-from shared.django import CustomPagination
+from app.utils.incremental_export import get_changed_submissions, advance_on_completion, get_watermark
+from app.utils.status_table import get_status_table
+from app.utils.stream_export import STREAM_WRITERS, STREAM_CONTENT_TYPES
+from app.utils.survey_registry import get_survey_snapshot
+from shared.django import CursorOptInPagination
 
 
 class IsStaffOrAdmin(IsAuthenticated):
@@ -42,7 +53,7 @@ class SurveySubmissionViewSet(viewsets.ModelViewSet):
     search_fields = ['responses__text_answer', 'comment']
     ordering_fields = ['created_at', 'id']
     ordering = ['-created_at']
-    pagination_class = CustomPagination
+    pagination_class = CursorOptInPagination
 
     _cached_question_filters = None  # Used by available_filters()
 
@@ -52,28 +63,19 @@ class SurveySubmissionViewSet(viewsets.ModelViewSet):
         return SurveySubmissionDetailSerializer
 
     def get_queryset(self):
-        # Determine active survey
+        # Determine active survey from the in-memory survey registry
+        snapshot = get_survey_snapshot()
         self.active_survey = None  # Initialize
         survey_id_param = self.request.query_params.get('survey')
 
         if survey_id_param:
-            try:
-                survey_id = int(survey_id_param)
-                self.active_survey = Survey.objects.filter(id=survey_id, is_active=True).first()
-            except ValueError:
-                # Invalid survey_id format, active_survey remains None
-                pass
-        
+            survey = snapshot.get_survey(survey_id_param)
+            if survey and survey.is_active:
+                self.active_survey = survey
+
         if not self.active_survey:  # If no survey_id provided or survey not found/active
-            # Try to get the default survey
-            default_survey = Survey.objects.filter(is_default=True, is_active=True).first()
-            if default_survey:
-                self.active_survey = default_survey
-            else:
-                # Fallback to the first active survey if no default is set
-                first_active_survey = Survey.objects.filter(is_active=True).order_by('id').first()
-                if first_active_survey:
-                    self.active_survey = first_active_survey
+            # Try to get the default survey, then fall back to the first active survey
+            self.active_survey = snapshot.get_default_survey() or snapshot.get_first_active_survey()
 
         # Base queryset
         queryset = SurveySubmission.objects.select_related('status', 'survey').prefetch_related(
@@ -84,7 +86,7 @@ class SurveySubmissionViewSet(viewsets.ModelViewSet):
 
         # Filter by active survey if one is determined
         if self.active_survey:
-            queryset = queryset.filter(survey=self.active_survey)
+            queryset = queryset.filter(survey_id=self.active_survey.id)
 
 
 
@@ -97,14 +99,11 @@ class SurveySubmissionViewSet(viewsets.ModelViewSet):
 
         # self.active_survey should have been set by get_queryset by the time this is called
         if hasattr(self, 'active_survey') and self.active_survey:
-            all_questions_for_active_survey = Question.objects.filter(survey=self.active_survey).order_by('order')
-            
+            all_questions_for_active_survey = Question.objects.filter(survey_id=self.active_survey.id).order_by('order')
+
             if self.action == 'list':
                 # Find the question marked as 'is_title' for the active survey
-                try:
-                    title_question = all_questions_for_active_survey.get(is_title=True)
-                except Question.DoesNotExist:
-                    title_question = None # Or log a warning if a title question is expected
+                title_question = self.active_survey.title_question
         
         context['questions'] = all_questions_for_active_survey # All questions for the active survey
         context['title_question'] = title_question # Specific question to be used as title in list view
@@ -126,22 +125,20 @@ class SurveySubmissionViewSet(viewsets.ModelViewSet):
         The active survey is determined by the 'survey' query parameter, with fallbacks.
         """
         # Determine active survey to scope the filters
+        snapshot = get_survey_snapshot()
         active_survey = None
         survey_id_param = request.query_params.get('survey')
         if survey_id_param:
-            try:
-                survey_id = int(survey_id_param)
-                active_survey = Survey.objects.filter(id=survey_id, is_active=True).first()
-            except (ValueError, TypeError):
-                pass
-        
+            survey = snapshot.get_survey(survey_id_param)
+            if survey and survey.is_active:
+                active_survey = survey
+
         if not active_survey:
             # Fallback to default or first active survey
-            active_survey = Survey.objects.filter(is_default=True, is_active=True).first() or \
-                            Survey.objects.filter(is_active=True).order_by('id').first()
+            active_survey = snapshot.get_default_survey() or snapshot.get_first_active_survey()
 
         if active_survey:
-            questions = Question.objects.filter(survey=active_survey).select_related('field_type').prefetch_related('options')
+            questions = Question.objects.filter(survey_id=active_survey.id).select_related('field_type').prefetch_related('options')
         else:
             # If no survey could be determined, return no questions.
             questions = Question.objects.none()
@@ -150,10 +147,107 @@ class SurveySubmissionViewSet(viewsets.ModelViewSet):
 
         return Response({
             'questions': serializer.data,
-            'statuses': SubmissionStatusSerializer(SubmissionStatus.objects.all(), many=True).data,
+            'statuses': SubmissionStatusSerializer(get_status_table().statuses, many=True).data,
             'sources': dict(SurveySubmission.Source.choices)
         })
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name='output',
+                description='File format: csv (default) or ndjson.',
+                required=False,
+                type=str,
+                enum=list(STREAM_WRITERS)
+            ),
+            OpenApiParameter(
+                name='consumer',
+                description='Name of an incremental export consumer. Only submissions changed since its previous '
+                            'export are sent, deleted ones included, with their updated_at and deleted columns.',
+                required=False,
+                type=str
+            ),
+            OpenApiParameter(
+                name='excel',
+                description='CSV only: quote answers starting with =, +, -, @, tab or carriage return, so a '
+                            'spreadsheet does not run them as formulas. Leave off for machine consumers.',
+                required=False,
+                type=bool
+            )
+        ],
+        responses={200: OpenApiTypes.BINARY}
+    )
+    @action(detail=False, methods=['get'], permission_classes=[IsStaffOrAdmin], pagination_class=None)
+    def export(self, request):
+        """
+        Stream the filtered submissions as CSV or NDJSON, one row per submission.
+
+        Accepts the filters, search and ordering of the list. Rows are read
+        in chunks of settings.EXPORT_CHUNK_SIZE and written as they are read,
+        so memory does not grow with the number of rows. Columns are those
+        of the admin export.
+
+        The stream has to finish within gunicorn's worker timeout, so exports
+        of more than settings.EXPORT_STREAM_MAX_ROWS rows are rejected. Narrow
+        the filters, or use the background xlsx export, for larger ones. The
+        check reads past at most that many rows, never counts all matches.
+
+        ``excel=1`` makes a CSV safe to open in a spreadsheet, see
+        app.utils.stream_export.stream_submissions_csv.
+
+        Parquet files are written by ``manage.py export_parquet`` only: they
+        cannot be streamed and building one would hold the worker.
+
+        With ``consumer``, the export is incremental: it holds the
+        submissions changed since the consumer's watermark, oldest change
+        first, and moves the watermark once the whole file is sent. The
+        consumer has one watermark per survey and filter state, and gets at
+        most settings.EXPORT_STREAM_MAX_ROWS changes per export, the rest
+        with the next ones. See app.utils.incremental_export.
+        """
+        output = request.query_params.get('output', 'csv')
+        if output not in STREAM_WRITERS:
+            return Response(
+                {'output': [f"Must be one of: {', '.join(STREAM_WRITERS)}."]},
+                status=HTTP_400_BAD_REQUEST
+            )
+        consumer = request.query_params.get('consumer')
+        if consumer is not None and not re.fullmatch(r'[\w.-]{1,100}', consumer):
+            return Response(
+                {'consumer': ["Up to 100 letters, digits, dots, dashes and underscores."]},
+                status=HTTP_400_BAD_REQUEST
+            )
+
+        queryset = self.filter_queryset(self.get_queryset())
+        watermark = position = None
+        if consumer is not None:
+            survey_id = self.active_survey.id if self.active_survey else None
+            watermark = get_watermark(consumer, survey_id, request.query_params)
+            queryset, position = get_changed_submissions(queryset, watermark, limit=settings.EXPORT_STREAM_MAX_ROWS)
+        else:
+            max_rows = settings.EXPORT_STREAM_MAX_ROWS
+            # Incremental exports are capped above, anything else must not count every match
+            if queryset[max_rows:max_rows + 1].exists():
+                return Response(
+                    {'detail': [
+                        f"The export holds more than {max_rows} submissions, which is the most that can be "
+                        f"streamed. Narrow the filters or use the background export."
+                    ]},
+                    status=HTTP_400_BAD_REQUEST
+                )
+        resource = SurveySubmissionResource(
+            survey_id=self.active_survey.id if self.active_survey else None, incremental=consumer is not None
+        )
+        writer_kwargs = {}
+        if output == 'csv':
+            writer_kwargs['excel'] = request.query_params.get('excel') in ('1', 'true', 'True')
+        chunks = STREAM_WRITERS[output](resource, queryset, **writer_kwargs)
+        if watermark is not None:
+            chunks = advance_on_completion(chunks, watermark, position)
+        response = StreamingHttpResponse(chunks, content_type=STREAM_CONTENT_TYPES[output])
+        response['Content-Disposition'] = f'attachment; filename="submissions.{output}"'
+        return response
+
 
 class SubmissionStatusFilter(FilterSet):
     """Filter for submission statuses."""
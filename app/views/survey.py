@@ -1,14 +1,33 @@
 """Views for survey app."""
-from django.db.models import Prefetch
+import logging
+
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from django.utils.translation import get_language
 from drf_spectacular.utils import extend_schema, extend_schema_view
 import django_filters 
 from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import status
+from rest_framework.exceptions import NotFound
 from rest_framework.generics import ListAPIView, CreateAPIView
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from app.models import Question, AnswerOption, Survey
-from app.serializers.survey import QuestionSerializer, SurveySubmissionSerializer, SurveySerializer
+from app.models import Question, Survey
+from app.serializers.survey import (
+    QuestionSerializer, SurveySubmissionSerializer, SurveySerializer, SubmissionTicketSerializer
+)
+from app.utils.option_tree import AnswerOptionTree
+from app.utils.submission_stream import is_stream_ingestion_enabled, enqueue_submission, get_ticket, TicketStatus
+from app.utils.survey_registry import get_survey_snapshot
+from app.utils.survey_schema import get_question_queryset, get_survey_schema
 from shared.django.filters import QuestionFilter
-from shared.django import SURVEY, RecaptchaPermission
+from shared.django import (
+    SURVEY, IdempotentCreateMixin, RecaptchaPermission, ThrottleFirstMixin, TokenBucketThrottle
+)
+
+logger = logging.getLogger(__name__)
 
 
 @extend_schema_view(
@@ -52,26 +71,71 @@ class SurveyListAPIView(ListAPIView):
 - `is_selectable`: Whether this option can be selected in response
 - `has_custom_input`: Whether this option requires additional text input
 - `children`: Nested options (if any)
+
+Responses carry an `ETag` that changes with the survey schema version,
+send it back in `If-None-Match` to get `304 Not Modified`.
 """,
         tags=[SURVEY]
     )
 )
 class QuestionListAPIView(ListAPIView):
-    """API view for Question model list."""
+    """API view for Question model list.
+
+    Responses are served from a pre-serialized schema snapshot that is rebuilt
+    whenever questions, answer options or field types of the survey change.
+    """
     serializer_class = QuestionSerializer
     filter_backends = [django_filters.rest_framework.DjangoFilterBackend]
     filterset_class = QuestionFilter
-    
+
+    @staticmethod
+    def get_default_survey_id():
+        """Return the ID of the active default survey from the survey registry."""
+        default_survey = get_survey_snapshot().get_default_survey()
+        return default_survey.id if default_survey else None
+
+    def get_survey_id(self):
+        """Return the requested survey ID, the default survey ID, or None if it cannot be resolved."""
+        survey_id = self.request.query_params.get('survey_id')
+        if not survey_id:
+            return self.get_default_survey_id()
+        try:
+            return int(survey_id)
+        except (ValueError, TypeError):
+            return None
+
+    def list(self, request, *args, **kwargs):
+        """Serve the cached schema snapshot, falling back to a regular serializer pass."""
+        survey_id = self.get_survey_id()
+        schema = None
+        if survey_id is not None and request.accepted_renderer.format == 'json':
+            schema = get_survey_schema(survey_id, get_language())
+        if schema is None:
+            return super().list(request, *args, **kwargs)
+
+        if schema.etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(schema.body, content_type='application/json')
+        response['ETag'] = schema.etag
+        patch_vary_headers(response, ['Accept'])
+        return response
+
+    def get_serializer_context(self):
+        """Add the option tree of the listed questions, loaded with a single query."""
+        context = super().get_serializer_context()
+        if getattr(self, 'swagger_fake_view', False):
+            return context
+        context['option_tree'] = AnswerOptionTree(self.filter_queryset(self.get_queryset()))
+        return context
+
     def get_queryset(self):
         # Get survey_id from query parameters
         survey_id = self.request.query_params.get('survey_id')
-        
-        # Base queryset with prefetching
-        queryset = Question.objects.prefetch_related(
-            Prefetch('options', queryset=AnswerOption.objects.filter(level=0, parent__isnull=True)),
-            'options__children'
-        )
-        
+
+        # Base queryset, options are loaded by the AnswerOptionTree
+        queryset = get_question_queryset()
+
         # Filter by survey if provided
         if survey_id:
             try:
@@ -82,12 +146,11 @@ class QuestionListAPIView(ListAPIView):
                 return Question.objects.none()
         else:
             # Try to get default survey
-            try:
-                default_survey = Survey.objects.get(is_default=True, is_active=True)
-                return queryset.filter(survey=default_survey)
-            except Survey.DoesNotExist:
-                # If no default survey exists, return all questions
-                return queryset
+            default_survey_id = self.get_default_survey_id()
+            if default_survey_id is not None:
+                return queryset.filter(survey_id=default_survey_id)
+            # If no default survey exists, return all questions
+            return queryset
 
 
 @extend_schema_view(
@@ -122,11 +185,70 @@ class QuestionListAPIView(ListAPIView):
 - Non-selectable options selected
 - Missing text answer for custom input option
 - Survey does not exist or is not active
+
+**Retries:**
+Send a unique `Idempotency-Key` header (for example a UUID generated when the
+form is submitted) and reuse it when retrying the same submission. Retries get
+the original response replayed with an `Idempotent-Replayed: true` header,
+a key reused for a different payload is rejected with `422`, and a retry that
+arrives before the original request has finished waits for it or gets `409`.
+
+**Queued ingestion:**
+When queued ingestion is enabled the submission is validated and answered with
+`202 Accepted` and a `ticket` instead of the created submission. Poll
+`submit/status/{ticket}/` until its `status` is `done` (or `failed`).
 """,
+        responses={201: SurveySubmissionSerializer, 202: SubmissionTicketSerializer},
         tags=[SURVEY]
     )
 )
-class SurveySubmissionCreateAPIView(CreateAPIView):
+class SurveySubmissionCreateAPIView(ThrottleFirstMixin, IdempotentCreateMixin, CreateAPIView):
     """API view for creating SurveySubmission."""
     serializer_class = SurveySubmissionSerializer
     permission_classes = [RecaptchaPermission]
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'survey_submit'
+
+    def get_create_response(self, request, *args, **kwargs):
+        """Queue the validated submission for the ingestion worker when stream mode is enabled."""
+        if not is_stream_ingestion_enabled():
+            return super().get_create_response(request, *args, **kwargs)
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            ticket = enqueue_submission(serializer.get_ingestion_payload())
+        except Exception as e:
+            logger.warning(f"Failed to queue submission, saving it right away: {e}")
+            self.perform_create(serializer)
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response({'ticket': ticket, 'status': TicketStatus.PENDING}, status=status.HTTP_202_ACCEPTED)
+
+
+@extend_schema_view(
+    get=extend_schema(
+        summary="Get queued submission status",
+        description="""
+**Returns the state of a submission accepted with a ticket.**
+
+**Fields description:**
+- `ticket`: Ticket returned by the submit endpoint
+- `status`: `pending` while queued, `done` once saved, `failed` if it could not be saved
+- `submission_id`: ID of the saved submission (only when `done`)
+- `errors`: Validation errors (only when `failed`)
+
+Tickets expire some time after the submission, `404` is returned for unknown tickets.
+""",
+        responses={200: SubmissionTicketSerializer},
+        tags=[SURVEY]
+    )
+)
+class SubmissionTicketStatusAPIView(APIView):
+    """API view for the status of a queued survey submission."""
+    serializer_class = SubmissionTicketSerializer
+
+    def get(self, request, ticket):
+        state = get_ticket(ticket)
+        if state is None:
+            raise NotFound()
+        return Response(state)
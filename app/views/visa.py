@@ -15,7 +15,7 @@ from app.serializers import (
     VisaStatusCheckResponseSerializer,
     VisaPDFDownloadSerializer
 )
-from shared.django import VISA, RecaptchaPermission
+from shared.django import VISA, RecaptchaPermission, ThrottleFirstMixin, TokenBucketThrottle
 from shared.parse import VisaSearchParams, KoreaVisaAPI
 
 
@@ -36,9 +36,11 @@ Check visa application status using passport number, name and birth date.
         tags=[VISA]
     )
 )
-class VisaStatusCheckAPIView(APIView):
+class VisaStatusCheckAPIView(ThrottleFirstMixin, APIView):
     """API view for checking visa status."""
     permission_classes = [RecaptchaPermission]
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'visa_check'
 
     @staticmethod
     def post(request):
@@ -75,9 +77,11 @@ class VisaStatusCheckAPIView(APIView):
         return Response(response_serializer.validated_data)
 
 
-class VisaPDFDownloadAPIView(APIView):
+class VisaPDFDownloadAPIView(ThrottleFirstMixin, APIView):
     """API view for downloading visa PDF."""
     permission_classes = [RecaptchaPermission]
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'visa_check'
 
     @extend_schema(
         request=VisaPDFDownloadSerializer,
@@ -80,10 +80,11 @@ class VisaDoctorsBot:
 
     def setup(self) -> None:
         """Initialize bot, dispatcher and register handlers."""
-        from app.utils.telegram import handle_status_callback, handle_comment_callback
+        from app.utils.telegram import handle_status_callback, handle_comment_callback, handle_digest_callback
+        from app.utils.telegram_dispatcher import create_bot
 
         # Initialize bot and dispatcher
-        self.bot = Bot(token=settings.TELEGRAM_BOT_TOKEN)
+        self.bot = create_bot()
         self.storage = RedisStorage.from_url(settings.REDIS_URL)
         self.dp = Dispatcher(storage=self.storage)
 
@@ -123,6 +124,12 @@ class VisaDoctorsBot:
             lambda c: c.data and c.data.startswith(('edit_comment:', 'comment_back:'))
         )
 
+        # Register handler for opening submissions listed in a digest
+        self.dp.callback_query.register(
+            handle_digest_callback,
+            lambda c: c.data and c.data.startswith('show_submission:')
+        )
+
         # Register handler for submission status updates
         self.dp.callback_query.register(
             handle_status_callback,
@@ -134,13 +141,17 @@ class VisaDoctorsBot:
 
     async def start(self) -> None:
         """Start polling."""
+        from app.utils.telegram_dispatcher import telegram_dispatcher
+
+        # Messages sent by app code in this process reuse the polling bot's session
+        telegram_dispatcher.attach(self.bot)
         try:
             await self.dp.start_polling(self.bot)
         except Exception as e:
             logger.error(f"Error while polling: {e}", exc_info=True)
             raise
         finally:
-            await self.bot.session.close()
+            await telegram_dispatcher.close()
             if self.storage:
                 await self.storage.close()
 
@@ -1,4 +1,6 @@
 """Filter manager for survey submissions."""
+import hashlib
+import json
 import logging
 import os
 import sys
@@ -7,9 +9,13 @@ from logging.handlers import RotatingFileHandler
 from typing import List, Dict, Any, Optional
 
 from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
 from django.db.models import Q, QuerySet
 
-from app.models import Survey, SurveySubmission, Question, SubmissionStatus, AnswerOption
+from app.models import SurveySubmission
+from app.utils.status_table import get_status_table
+from app.utils.survey_registry import get_survey_snapshot
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -79,10 +85,10 @@ class SurveyFilter:
         if self._questions is None:
             if self.survey_id:
                 logger.debug(f"Loading questions for survey_id: {self.survey_id}")
-                self._questions = Question.objects.filter(survey_id=self.survey_id).select_related('field_type').all()
+                self._questions = get_survey_snapshot().get_questions(self.survey_id)
             else:
                 logger.warning("No survey_id provided, loading all questions.")
-                self._questions = Question.objects.select_related('field_type').all()
+                self._questions = get_survey_snapshot().get_questions()
         return self._questions
         
     @property
@@ -112,17 +118,12 @@ class SurveyFilter:
         
         # Add status filters if set
         if self._status_filters:
-            # Используем безопасный способ получения статусов
-            from app.models import SubmissionStatus
+            # Названия статусов берём из кэшированной таблицы статусов
+            status_table = get_status_table()
             status_values = []
-            # Этот код уже выполняется в синхронном контексте (благодаря sync_to_async)
-            # Поэтому мы можем безопасно использовать поля
             for status_code in self._status_filters:
-                try:
-                    status = SubmissionStatus.objects.get(code=status_code)
-                    status_values.append(status.name)
-                except SubmissionStatus.DoesNotExist:
-                    status_values.append(status_code)
+                status = status_table.get(status_code)
+                status_values.append(status.name if status else status_code)
             
             active_filters.append({
                 'name': 'Статус',
@@ -156,16 +157,16 @@ class SurveyFilter:
             })
             
         # Add response filters
+        snapshot = get_survey_snapshot()
         for question_id, filters_list in self._response_filters_data.items():
-            try:
-                question = Question.objects.get(id=int(question_id))
-                values = [f['value'] for f in filters_list]
-                active_filters.append({
-                    'name': question.field_type.title,
-                    'value': ', '.join(values)
-                })
-            except Question.DoesNotExist:
+            question = snapshot.get_question(question_id)
+            if question is None:
                 continue
+            values = [f['value'] for f in filters_list]
+            active_filters.append({
+                'name': question.field_type.title,
+                'value': ', '.join(values)
+            })
                 
         return active_filters
         
@@ -211,39 +212,78 @@ class SurveyFilter:
         logger.debug(f"Adding response filter - question_id: {question_id}, value: {value}")
         logger.debug(f"Current response filters: {self._response_filters_data}")
         
-        try:
-            question = Question.objects.get(id=question_id)
-            
-            # For text questions, store the value directly
-            if question.input_type in ['text', 'number', 'phone']:
-                self._response_filters_data[str(question_id)] = [{
-                    'value': value,
-                    'question_id': question_id
-                }]
-            # For choice questions, store the option ID and value
-            else:
-                self._response_filters_data[str(question_id)] = [{
-                    'value': value,
-                    'question_id': question_id,
-                    'option_id': value  # For choice questions, value is the option ID
-                }]
-            
-            logger.debug(f"Updated response filters: {self._response_filters_data}")
-            
-        except Question.DoesNotExist:
+        question = get_survey_snapshot().get_question(question_id)
+        if question is None:
             logger.error(f"Question {question_id} not found")
-            pass
+            return
+
+        # For text questions, store the value directly
+        if question.input_type in ['text', 'number', 'phone']:
+            self._response_filters_data[str(question_id)] = [{
+                'value': value,
+                'question_id': question_id
+            }]
+        # For choice questions, store the option ID and value
+        else:
+            self._response_filters_data[str(question_id)] = [{
+                'value': value,
+                'question_id': question_id,
+                'option_id': value  # For choice questions, value is the option ID
+            }]
+
+        logger.debug(f"Updated response filters: {self._response_filters_data}")
             
     @staticmethod
     @sync_to_async
     def get_surveys() -> List[Dict[str, Any]]:
         """Get all active surveys."""
-        surveys = Survey.objects.filter(is_active=True).order_by('title')
+        surveys = get_survey_snapshot().get_active_surveys()
         return [{'id': survey.id, 'title': survey.title} for survey in surveys]
 
     @sync_to_async
     def get_filtered_submissions(self) -> QuerySet[SurveySubmission]:
         """Get submissions filtered by all active filters."""
+        return self.build_queryset()
+
+    def get_state_key(self) -> str:
+        """Short hash identifying the filter state, used for cached counts and page cursors."""
+        state = self.get_state()
+        state['selected_dates'] = sorted(state['selected_dates'])
+        state['status_filters'] = sorted(state['status_filters'])
+        return hashlib.sha256(json.dumps(state, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+    @sync_to_async
+    def count_submissions(self) -> int:
+        """Number of matching submissions, cached for settings.BOT_RESULTS_COUNT_TTL seconds."""
+        key = f'bot_results_count:{self.get_state_key()}'
+        total = cache.get(key)
+        if total is None:
+            total = self.build_queryset().count()
+            cache.set(key, total, settings.BOT_RESULTS_COUNT_TTL)
+        return total
+
+    @sync_to_async
+    def get_submissions_page(self, page: int, page_size: int, after: list = None) -> List[SurveySubmission]:
+        """
+        Load one page of matching submissions, newest first, with their status.
+
+        Args:
+            page: Page number starting at 1
+            page_size: Number of submissions per page
+            after: ``[created_at, id]`` of the last submission of the previous page.
+                If given the page is read with a keyset condition instead of OFFSET,
+                so it costs the same however deep it is.
+        """
+        queryset = self.build_queryset().select_related('status').order_by('-created_at', '-id')
+        if after:
+            created_at, pk = datetime.fromisoformat(after[0]), after[1]
+            queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+        else:
+            queryset = queryset[(page - 1) * page_size:]
+        return list(queryset[:page_size])
+
+    def build_queryset(self) -> QuerySet[SurveySubmission]:
+        """Build the queryset of submissions matching all active filters."""
         logger.debug("Getting filtered submissions")
         logger.debug(f"Date filters: {self._date_filters}")
         logger.debug(f"Response filters: {self._response_filters_data}")
@@ -311,8 +351,7 @@ class SurveyFilter:
                 'id': 'status',
                 'name': 'Статус',
                 'type': 'status',
-                'choices': {status.code: status.name for status in SubmissionStatus.objects.filter(active=True).order_by('order')}
-            # Этот код выполняется в синхронном контексте благодаря декоратору @sync_to_async
+                'choices': {status.code: status.name for status in get_status_table().active}
             }
         ]
         
@@ -320,7 +359,7 @@ class SurveyFilter:
         for question in self.questions:
             if question.input_type in ['single_choice', 'multiple_choice']:
                 # Get all options for this question
-                options = question.options.all()
+                options = question.options
                 
                 # Create choices dict with hierarchical structure
                 choices = {}
@@ -376,9 +415,12 @@ class SurveyFilter:
         """Add option filter for a question."""
         logger.debug(f"Adding option filter - question_id: {question_id}, option_id: {option_id}")
         
-        # Get question and option
-        question = await sync_to_async(Question.objects.get)(id=question_id)
-        option = await sync_to_async(AnswerOption.objects.get)(id=option_id)
+        # Get option from the survey registry
+        snapshot = await sync_to_async(get_survey_snapshot)()
+        option = snapshot.get_option(option_id)
+        if option is None:
+            logger.error(f"Option {option_id} not found")
+            return
         
         # Create filter data
         filter_data = {
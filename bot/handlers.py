@@ -2,6 +2,7 @@
 import logging
 from logging.handlers import RotatingFileHandler
 import io
+import os
 import sys
 from datetime import datetime
 
@@ -9,18 +10,21 @@ from aiogram import types
 from aiogram.enums import ParseMode
 from aiogram.exceptions import TelegramBadRequest
 from aiogram.fsm.context import FSMContext
-from aiogram.types import BufferedInputFile
+from aiogram.types import BufferedInputFile, FSInputFile
 
 from aiogram.types import InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.admin.sites import site
 from django.utils import timezone
 from import_export.formats.base_formats import XLSX
 
 from app.admin import SurveySubmissionAdmin
-from app.models import Response, SurveySubmission, Question
+from app.models import Response, SurveySubmission, Question, ExportJob
 from app.resource import SurveySubmissionResource
+from app.utils.export_jobs import request_export
+from app.utils.xlsx_export import write_submissions_xlsx
 from bot.filters import SurveyFilter
 from bot.keyboards import (
     get_filters_menu,
@@ -592,35 +596,6 @@ def get_name_responses(submission_ids):
     ).distinct())
 
 
-@sync_to_async
-def check_submissions_empty(queryset):
-    """Check if queryset is empty in synchronous context."""
-    return not queryset.exists()
-
-
-@sync_to_async
-def convert_queryset_to_list(queryset):
-    """Convert queryset to list in synchronous context and add status data."""
-    # Получаем список объектов из QuerySet
-    submissions_list = list(queryset)
-    
-    # Перебираем объекты и добавляем информацию о статусе безопасным для асинхронного доступа способом
-    for sub in submissions_list:
-        try:
-            # Если статус - это ForeignKey на SubmissionStatus
-            if hasattr(sub, 'status') and sub.status is not None:
-                # Сохраняем код статуса как атрибут объекта
-                sub.status_code = getattr(sub.status, 'code', None)
-                # Сохраняем имя статуса как атрибут объекта
-                sub.status_name = getattr(sub.status, 'name', None)
-        except Exception:
-            # В случае ошибки установим неизвестный статус
-            sub.status_code = 'unknown'
-            sub.status_name = 'Неизвестный статус'
-    
-    return submissions_list
-
-
 async def show_results(message: types.Message | types.Message, state: FSMContext, edit_message: bool = False):
     """Show filtered results with pagination."""
     try:
@@ -631,12 +606,12 @@ async def show_results(message: types.Message | types.Message, state: FSMContext
         page = data.get('current_page', 1)
         logger.debug(f"Current page: {page}")
 
-        # Get filtered submissions
-        logger.debug("Getting filtered submissions")
-        submissions = await filter_manager.get_filtered_submissions()
-        
+        # The count is cached per filter state, so page flips only load the page itself
+        logger.debug("Counting filtered submissions")
+        total = await filter_manager.count_submissions()
+
         # Check if submissions are empty
-        if await check_submissions_empty(submissions):
+        if not total:
             message_text = (
                 "🔍 Ничего не найдено\n\n"
                 "📊 Выберите фильтр из списка:"
@@ -664,9 +639,6 @@ async def show_results(message: types.Message | types.Message, state: FSMContext
                 raise
             return
 
-        # Convert queryset to list for pagination
-        submissions_list = await convert_queryset_to_list(submissions)
-        total = len(submissions_list)
         total_pages = max(1, (total + RESULTS_PER_PAGE - 1) // RESULTS_PER_PAGE)
         logger.debug(f"Total submissions: {total}, Total pages: {total_pages}")
 
@@ -676,10 +648,18 @@ async def show_results(message: types.Message | types.Message, state: FSMContext
             await state.update_data(current_page=page)
             logger.debug(f"Invalid page requested. Reset to page {page}")
 
-        # Get paginated results
-        start = (page - 1) * RESULTS_PER_PAGE
-        end = start + RESULTS_PER_PAGE
-        paginated_submissions = submissions_list[start:end]
+        # Continue after the last submission of the previous page if it was shown with the same filters
+        state_key = filter_manager.get_state_key()
+        cursors = data.get('result_cursors') or {}
+        if cursors.get('key') != state_key:
+            cursors = {'key': state_key, 'pages': {}}
+        paginated_submissions = await filter_manager.get_submissions_page(
+            page, RESULTS_PER_PAGE, after=cursors['pages'].get(str(page - 1))
+        )
+        if paginated_submissions:
+            last = paginated_submissions[-1]
+            cursors['pages'][str(page)] = [last.created_at.isoformat(), last.id]
+            await state.update_data(result_cursors=cursors)
 
         # Get name responses for paginated submissions
         name_responses = await get_name_responses([sub.id for sub in paginated_submissions])
@@ -698,17 +678,8 @@ async def show_results(message: types.Message | types.Message, state: FSMContext
             # Make naive datetime timezone-aware
             created_at = timezone.make_aware(sub.created_at) if timezone.is_naive(sub.created_at) else sub.created_at
             
-            # Получаем имя статуса безопасным способом
-            # Вместо прямого доступа к sub.status, используем значение статуса из записи
-            status_name = getattr(sub, 'status_name', None)
-            if status_name is None and hasattr(sub, 'status_id'):
-                # Если нет status_name, но есть status_id, используем просто id статуса
-                status_name = f"Status: {sub.status_id}"
-            elif status_name is None and hasattr(sub, 'status_code'):
-                # Если есть код статуса, используем его
-                status_name = getattr(sub, 'status_code', "Unknown")
-            else:
-                status_name = "Unknown"
+            # The status is loaded with the page
+            status_name = sub.status.name
             
             results.append(
                 f"📝 Заявка #{sub.id}\n"
@@ -775,19 +746,38 @@ async def show_results(message: types.Message | types.Message, state: FSMContext
 @sync_to_async
 def perform_export(queryset, survey_id):
     """
-    Performs the actual data export using django-import-export.
+    Performs the actual data export, streaming the rows into a write-only workbook.
     """
     # This needs to run in a sync context
-    resource = SurveySubmissionResource(survey_id=survey_id)
-    dataset = resource.export(queryset)
-    export_bytes = dataset.xlsx
-    if isinstance(export_bytes, str):
-        export_bytes = export_bytes.encode('utf-8')
-    return export_bytes
+    output = io.BytesIO()
+    write_submissions_xlsx(SurveySubmissionResource(survey_id=survey_id), queryset, output)
+    return output.getvalue()
+
+
+async def queue_export(callback_query: types.CallbackQuery, filter_manager: SurveyFilter, queryset):
+    """Queue an export job that sends the file to this chat, or send a finished export of the same data."""
+    message = callback_query.message
+    job, created = await sync_to_async(request_export)(
+        queryset,
+        filter_manager.survey_id,
+        ExportJob.Source.BOT,
+        filter_manager.get_state(),
+        telegram_chat_id=message.chat.id,
+        telegram_thread_id=message.message_thread_id if message.is_topic_message else None
+    )
+    if job.status == ExportJob.Status.DONE:
+        await callback_query.answer()
+        await message.answer_document(
+            FSInputFile(job.file.path, filename=os.path.basename(job.file.name)),
+            caption="✅ Экспорт выполнен успешно"
+        )
+        return
+    logger.debug(f"Queued export #{job.pk}")
+    await callback_query.answer("⏳ Файл готовится и будет отправлен в этот чат, когда будет готов", show_alert=True)
 
 
 async def export_results(callback_query: types.CallbackQuery, state: FSMContext):
-    """Export filtered results to Excel."""
+    """Export filtered results to Excel, in the background if export jobs are enabled."""
     try:
         logger.debug("Starting export process")
         data = await state.get_data()
@@ -803,7 +793,11 @@ async def export_results(callback_query: types.CallbackQuery, state: FSMContext)
         filter_manager = SurveyFilter(filter_state, survey_id=survey_id)
         queryset = await filter_manager.get_filtered_submissions()
 
-        if queryset:
+        if await filter_manager.count_submissions():
+            if settings.EXPORT_JOBS_ENABLED:
+                await queue_export(callback_query, filter_manager, queryset)
+                return
+
             # Show processing message
             await callback_query.answer("⏳ Подготовка файла...")
             logger.debug("Starting file preparation")
@@ -1154,8 +1148,7 @@ async def process_calendar_callback(callback_query: types.CallbackQuery, state:
 
 
 async def process_value_input(message: types.Message, state: FSMContext):
-    from app.utils.telegram import get_submission_and_update_status, create_submission_keyboard, \
-        format_submission_notification
+    from app.utils.telegram import get_submission_and_update_status, get_submission_card
     """Process text input for text filters and comments."""
     try:
         current_state = await state.get_state()
@@ -1174,8 +1167,7 @@ async def process_value_input(message: types.Message, state: FSMContext):
                 )
                 
                 # Get updated submission text and keyboard
-                message_text = await format_submission_notification(submission_id)
-                keyboard = await create_submission_keyboard(submission_id)
+                message_text, keyboard = await get_submission_card(submission_id)
                 
                 # Delete user's message
                 await message.delete()
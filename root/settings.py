@@ -3,6 +3,7 @@ from os.path import join
 from pathlib import Path
 
 import sentry_sdk
+from django.core.exceptions import ImproperlyConfigured
 from django.utils.translation import gettext_lazy as _
 from environ import Env
 
@@ -287,8 +288,10 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
-    'x-recaptcha-token'
+    'x-recaptcha-token',
+    'idempotency-key',
 ]
+CORS_EXPOSE_HEADERS = ['idempotent-replayed']
 
 # CKEditor Configuration
 customColorPalette = [
@@ -447,6 +450,17 @@ X_FRAME_OPTIONS = 'DENY'
 RECAPTCHA_ENABLED = env.bool('RECAPTCHA_ENABLED', True)
 RECAPTCHA_SECRET_KEY = env.str('RECAPTCHA_SECRET_KEY')
 RECAPTCHA_REQUIRED_SCORE = env.float('RECAPTCHA_REQUIRED_SCORE')
+# Dotted path of the verifier class, 'shared.django.recaptcha.LocalRecaptchaVerifier' for tests and benchmarks
+RECAPTCHA_VERIFIER = env.str('RECAPTCHA_VERIFIER', default='shared.django.recaptcha.GoogleRecaptchaVerifier')
+RECAPTCHA_VERIFY_URL = env.str('RECAPTCHA_VERIFY_URL', default='https://www.google.com/recaptcha/api/siteverify')
+RECAPTCHA_CONNECT_TIMEOUT = env.float('RECAPTCHA_CONNECT_TIMEOUT', default=2)
+RECAPTCHA_READ_TIMEOUT = env.float('RECAPTCHA_READ_TIMEOUT', default=3)
+RECAPTCHA_POOL_SIZE = env.int('RECAPTCHA_POOL_SIZE', default=10)
+# Failed tokens are remembered and successful ones rejected as reused for this long (seconds),
+# tokens themselves expire after two minutes
+RECAPTCHA_TOKEN_CACHE_TTL = env.int('RECAPTCHA_TOKEN_CACHE_TTL', default=120)
+RECAPTCHA_LOCAL_SCORE = env.float('RECAPTCHA_LOCAL_SCORE', default=0.9)
+RECAPTCHA_LOCAL_DELAY = env.float('RECAPTCHA_LOCAL_DELAY', default=0)
 
 # Only use these in production
 if not DEBUG:
@@ -522,16 +536,54 @@ CACHEOPS_DEFAULTS = {
 }
 
 CACHEOPS = {
-    'app.*': {'ops': ('get', 'fetch'), 'timeout': 60 * 60 * 24 * 7, 'cache_on_save': True}
+    'app.*': {'ops': ('get', 'fetch'), 'timeout': 60 * 60 * 24 * 7, 'cache_on_save': True},
+    'app.notificationoutbox': None,
+    'app.exportjob': None,
+    'app.exportwatermark': None,
 }
 
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # Token buckets of TokenBucketThrottle: '<scope>' per client IP, '<scope>_endpoint' for all clients together
+    'DEFAULT_THROTTLE_RATES': {
+        'survey_submit': env.str('THROTTLE_SURVEY_SUBMIT', default='10/min'),
+        'survey_submit_endpoint': env.str('THROTTLE_SURVEY_SUBMIT_ENDPOINT', default='600/min'),
+        'visa_check': env.str('THROTTLE_VISA_CHECK', default='5/min'),
+        'visa_check_endpoint': env.str('THROTTLE_VISA_CHECK_ENDPOINT', default='60/min'),
+    },
+    # Number of reverse proxies in front of the app, used to find the client IP in X-Forwarded-For.
+    # Never leave it unset behind a proxy: DRF would then key throttles on the whole client-supplied header
+    'NUM_PROXIES': env.int('NUM_PROXIES', default=1),
     # 'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     # 'PAGE_SIZE': 10,
 }
 
+# Streaming xlsx export: submissions read per query, rows sampled to size the columns
+EXPORT_CHUNK_SIZE = env.int('EXPORT_CHUNK_SIZE', default=2000)
+EXPORT_WIDTH_SAMPLE_ROWS = env.int('EXPORT_WIDTH_SAMPLE_ROWS', default=500)
+# Rows sent per chunk of streamed CSV/NDJSON exports
+EXPORT_STREAM_BATCH_ROWS = env.int('EXPORT_STREAM_BATCH_ROWS', default=500)
+# Most rows a streamed export may hold. Streams are served by sync gunicorn workers, which are
+# killed after `timeout` (120s) and leave the client with a truncated file, so keep this well
+# below what a worker can send in that time
+EXPORT_STREAM_MAX_ROWS = env.int('EXPORT_STREAM_MAX_ROWS', default=100000)
+# Exports run as jobs of `manage.py run_export_jobs` instead of inside the request
+EXPORT_JOBS_ENABLED = env.bool('EXPORT_JOBS_ENABLED', default=True)
+# How long finished export files are kept and reused, and after how long without
+# progress a running job is taken over by another worker (seconds)
+EXPORT_JOB_RETENTION = env.int('EXPORT_JOB_RETENTION', default=60 * 60 * 24)
+EXPORT_JOB_LEASE_SECONDS = env.int('EXPORT_JOB_LEASE_SECONDS', default=600)
+EXPORT_JOB_MAX_ATTEMPTS = env.int('EXPORT_JOB_MAX_ATTEMPTS', default=3)
+# Incremental exports leave out changes younger than this (seconds). updated_at is set when save()
+# runs, not at commit, so a change that commits later than this lands behind a watermark that already
+# moved past it and is never exported. Keep it well above the longest transaction writing submissions,
+# such as an ingest_submissions batch or a bulk admin action
+EXPORT_INCREMENTAL_LAG_SECONDS = env.int('EXPORT_INCREMENTAL_LAG_SECONDS', default=60 * 10)
+
+# How long totals of cursor pages (?with_total=1) are reused (seconds)
+PAGINATION_COUNT_CACHE_TTL = env.int('PAGINATION_COUNT_CACHE_TTL', default=60)
+
 # JWT Settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
@@ -682,6 +734,59 @@ TELEGRAM_ADMIN_ID = env.str('TELEGRAM_ADMIN_ID', default='')
 TELEGRAM_NOTIFICATIONS_ENABLED = env.bool('TELEGRAM_NOTIFICATIONS_ENABLED', default=False)
 REDIS_URL = f"redis://:{env.str('REDIS_PASSWORD')}@{env.str('REDIS_HOST', 'redis')}:{env.int('REDIS_PORT', 6379)}/{env.int('TELEGRAM_REDIS_DB', 2)}"
 
+# Bot API server, empty for the official one. Point it at `manage.py fake_bot_api` for load tests
+TELEGRAM_API_BASE_URL = env.str('TELEGRAM_API_BASE_URL', default='')
+# Bot API calls of a process share one session, run by this many concurrent workers
+TELEGRAM_DISPATCHER_WORKERS = env.int('TELEGRAM_DISPATCHER_WORKERS', default=4)
+# How long synchronous code waits for a Bot API call (seconds)
+TELEGRAM_DISPATCHER_TIMEOUT = env.int('TELEGRAM_DISPATCHER_TIMEOUT', default=30)
+# Bot API limits: messages per second overall and per minute in a group
+TELEGRAM_GLOBAL_RATE = env.float('TELEGRAM_GLOBAL_RATE', default=30)
+TELEGRAM_GROUP_RATE = env.float('TELEGRAM_GROUP_RATE', default=20)
+TELEGRAM_SEND_MAX_RETRIES = env.int('TELEGRAM_SEND_MAX_RETRIES', default=5)
+# Random delay added to retries (seconds)
+TELEGRAM_RETRY_JITTER = env.float('TELEGRAM_RETRY_JITTER', default=1.0)
+
+# Notification outbox delivery (seconds)
+NOTIFICATION_MAX_ATTEMPTS = env.int('NOTIFICATION_MAX_ATTEMPTS', default=10)
+NOTIFICATION_RETRY_BASE_DELAY = env.int('NOTIFICATION_RETRY_BASE_DELAY', default=5)
+NOTIFICATION_RETRY_MAX_DELAY = env.int('NOTIFICATION_RETRY_MAX_DELAY', default=60 * 30)
+# How long the bot caches the number of submissions matching a filter (seconds)
+BOT_RESULTS_COUNT_TTL = env.int('BOT_RESULTS_COUNT_TTL', default=60)
+# How long rendered submission cards of moderation messages are cached (seconds)
+SUBMISSION_CARD_CACHE_TTL = env.int('SUBMISSION_CARD_CACHE_TTL', default=60 * 60 * 24)
+# Largest number of submissions announced in one digest message
+NOTIFICATION_DIGEST_MAX_ITEMS = env.int('NOTIFICATION_DIGEST_MAX_ITEMS', default=30)
+# Must cover sending a whole batch at TELEGRAM_GROUP_RATE
+NOTIFICATION_LEASE_SECONDS = env.int('NOTIFICATION_LEASE_SECONDS', default=300)
+
+# Survey metadata and submission statuses cached in each process, invalidated over Redis pub/sub (seconds)
+SURVEY_REGISTRY_TTL = env.int('SURVEY_REGISTRY_TTL', default=300)
+
+# Idempotency-Key handling of survey submissions (seconds)
+IDEMPOTENCY_KEY_TTL = env.int('IDEMPOTENCY_KEY_TTL', default=60 * 60 * 24)
+IDEMPOTENCY_LOCK_TIMEOUT = env.int('IDEMPOTENCY_LOCK_TIMEOUT', default=30)
+IDEMPOTENCY_WAIT_TIMEOUT = env.int('IDEMPOTENCY_WAIT_TIMEOUT', default=10)
+
+# Survey submission ingestion: 'sync' writes submissions in the request,
+# 'stream' queues them in Redis for `manage.py ingest_submissions`
+SUBMISSION_INGESTION_MODE = env.str('SUBMISSION_INGESTION_MODE', default='sync')
+# Queued submissions are not persisted anywhere else: in 'stream' mode point this at a Redis running
+# with `maxmemory-policy noeviction`, never at the allkeys-lru cache. docker-compose.yml sets it to its
+# `redis-stream` service
+SUBMISSION_STREAM_REDIS_URL = env.str('SUBMISSION_STREAM_REDIS_URL', default=REDIS_URL)
+if SUBMISSION_INGESTION_MODE == 'stream' and SUBMISSION_STREAM_REDIS_URL == REDIS_URL:
+    raise ImproperlyConfigured(
+        "SUBMISSION_INGESTION_MODE='stream' needs SUBMISSION_STREAM_REDIS_URL pointing at a noeviction Redis, "
+        "not the cache Redis of REDIS_URL."
+    )
+SUBMISSION_STREAM_MAX_LENGTH = env.int('SUBMISSION_STREAM_MAX_LENGTH', default=100000)
+SUBMISSION_STREAM_CLAIM_IDLE = env.int('SUBMISSION_STREAM_CLAIM_IDLE', default=60 * 1000)  # milliseconds
+SUBMISSION_TICKET_TTL = env.int('SUBMISSION_TICKET_TTL', default=60 * 60 * 24)
+
+# Survey answers validation
+SURVEY_REGEX_INPUT_MAX_LENGTH = env.int('SURVEY_REGEX_INPUT_MAX_LENGTH', default=1000)
+
 # Base URL for admin links
 BASE_URL = env.str('BASE_URL', default='http://localhost:8000')
 
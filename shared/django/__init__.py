@@ -1,5 +1,8 @@
 from shared.django.fields import SVGFileField
+from shared.django.idempotency import IdempotentCreateMixin
 from shared.django.models import BaseModel
 from shared.django.recaptcha import RecaptchaPermission
+from shared.django.serializers import PreloadedPrimaryKeyRelatedField
+from shared.django.throttling import TokenBucketThrottle, ThrottleFirstMixin
 from shared.django.tags import ABOUT, VISA, RESULTS, UNIVERSITIES, SURVEY
-from shared.django.utils import CustomPagination
+from shared.django.utils import CustomPagination, CursorOptInPagination, KeysetCursorPagination
@@ -4,6 +4,7 @@ from django.db.models import Q
 
 def create_question_filters(question):
     """
+    Принимает QuestionDescriptor из app.utils.survey_registry.
     Возвращает список фильтров для данного вопроса:
     1) Главный фильтр со всеми вариантами (DynamicQuestionFilter).
     2) Дополнительные фильтры (OptionFamilyFilter) — по одному на каждый root-вариант,
@@ -16,11 +17,9 @@ def create_question_filters(question):
 
     # 2) Если вопрос - single/multiple choice, добавляем отдельные фильтры для root-опций с детьми
     if question.input_type in ["single_choice", "multiple_choice"]:
-        root_options = question.options.filter(parent__isnull=True).order_by("order", "text")
-        for root_option in root_options:
-            if root_option.get_descendants().exists():
-                # Создаём отдельный фильтр только если есть дочерние варианты
-                filters.append(create_option_family_filter(question, root_option))
+        for root_option in question.option_families:
+            # Создаём отдельный фильтр только если есть дочерние варианты
+            filters.append(create_option_family_filter(question, root_option))
 
     return filters
 
@@ -33,14 +32,14 @@ def create_dynamic_question_filter(question):
 
     class DynamicQuestionFilter(SimpleListFilter):
         title = filter_title
-        parameter_name = f"question_{question.pk}"
+        parameter_name = f"question_{question.id}"
 
         def lookups(self, request, model_admin):
             lookups_list = []
 
             if question.input_type == 'text':
                 distinct_answers = model_admin.get_queryset(request).filter(
-                    responses__question=question
+                    responses__question_id=question.id
                 ).values_list('responses__text_answer', flat=True).distinct().order_by('responses__text_answer')
 
                 for ans in distinct_answers:
@@ -48,10 +47,9 @@ def create_dynamic_question_filter(question):
                         lookups_list.append((f"text:{ans}", ans[:50]))
 
             elif question.input_type in ['single_choice', 'multiple_choice']:
-                root_options = question.options.filter(parent__isnull=True).order_by('order', 'text')
-                for root_op in root_options:
+                for root_op in question.root_options:
                     # Если у корневого варианта есть дети – не включаем его в главный фильтр
-                    if root_op.get_descendants().exists():
+                    if root_op.has_descendants:
                         continue
                     else:
                         lookups_list.append((f"option:{root_op.id}", root_op.text))
@@ -73,20 +71,16 @@ def create_dynamic_question_filter(question):
                 elif val.startswith("option:"):
                     try:
                         option_id = int(val[7:])
-                        option_q = Q(responses__question=question, responses__selected_options__id=option_id)
+                        option_q = Q(responses__question_id=question.id, responses__selected_options__id=option_id)
 
                         # Учитываем и потомков
-                        from app.models import AnswerOption
-                        try:
-                            op = AnswerOption.objects.get(pk=option_id)
-                            if op.get_descendant_count() > 0:
-                                desc_ids = op.get_descendants().values_list('id', flat=True)
-                                option_q |= Q(
-                                    responses__question=question,
-                                    responses__selected_options__id__in=list(desc_ids)
-                                )
-                        except AnswerOption.DoesNotExist:
-                            pass
+                        from app.utils.survey_registry import get_survey_snapshot
+                        desc_ids = get_survey_snapshot().get_descendant_ids(option_id)
+                        if desc_ids:
+                            option_q |= Q(
+                                responses__question_id=question.id,
+                                responses__selected_options__id__in=desc_ids
+                            )
 
                         q_filter |= option_q
                     except ValueError:
@@ -105,13 +99,13 @@ def create_option_family_filter(question, root_option):
 
     class OptionFamilyFilter(SimpleListFilter):
         title = filter_title
-        parameter_name = f"question_option_{question.pk}_{root_option.pk}"
+        parameter_name = f"question_option_{question.id}_{root_option.id}"
 
         def lookups(self, request, model_admin):
             lookups_list = [(f"option:{root_option.id}", root_option.text)]
 
             # Дети с отступами
-            children = root_option.get_descendants().order_by("order", "text")
+            children = sorted(question.get_descendants(root_option), key=lambda o: (o.order, o.text))
             for child in children:
                 indent = "— " * (child.level - root_option.level)
                 lookups_list.append((f"option:{child.id}", f"{indent}{child.text}"))
@@ -129,20 +123,16 @@ def create_option_family_filter(question, root_option):
                 if val.startswith("option:"):
                     try:
                         option_id = int(val[7:])
-                        option_q = Q(responses__question=question, responses__selected_options__id=option_id)
+                        option_q = Q(responses__question_id=question.id, responses__selected_options__id=option_id)
 
                         # Учитываем и потомков
-                        from app.models import AnswerOption
-                        try:
-                            op = AnswerOption.objects.get(pk=option_id)
-                            if op.get_descendant_count() > 0:
-                                desc_ids = op.get_descendants().values_list('id', flat=True)
-                                option_q |= Q(
-                                    responses__question=question,
-                                    responses__selected_options__id__in=list(desc_ids)
-                                )
-                        except AnswerOption.DoesNotExist:
-                            pass
+                        from app.utils.survey_registry import get_survey_snapshot
+                        desc_ids = get_survey_snapshot().get_descendant_ids(option_id)
+                        if desc_ids:
+                            option_q |= Q(
+                                responses__question_id=question.id,
+                                responses__selected_options__id__in=desc_ids
+                            )
 
                         q_filter |= option_q
                     except ValueError:
@@ -1,7 +1,8 @@
 from django.contrib.admin import SimpleListFilter
 from django.utils.translation import gettext_lazy as _
 
-from app.models import Survey
+from app.utils.status_table import get_status_table
+from app.utils.survey_registry import get_survey_snapshot
 
 
 class AlwaysShowSurveyFilter(SimpleListFilter):
@@ -9,7 +10,7 @@ class AlwaysShowSurveyFilter(SimpleListFilter):
     parameter_name = 'survey'
 
     def lookups(self, request, model_admin):
-        return [(str(s.pk), s.title) for s in Survey.objects.all()]
+        return [(str(s.id), s.title) for s in get_survey_snapshot().surveys.values()]
 
     def queryset(self, request, queryset):
         if self.value():
@@ -29,8 +30,7 @@ class StatusFilter(SimpleListFilter):
     parameter_name = 'status'
 
     def lookups(self, request, model_admin):
-        from app.models.status import SubmissionStatus
-        return [(str(s.code), s.name) for s in SubmissionStatus.objects.filter(active=True).order_by('order')]
+        return [(str(s.code), s.name) for s in get_status_table().active]
 
     def queryset(self, request, queryset):
         # Get all selected status codes from the request
@@ -0,0 +1,156 @@
+"""Idempotent create endpoints backed by Redis."""
+import hashlib
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from app.utils.redis import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+IDEMPOTENCY_POLL_INTERVAL = 0.1
+
+
+class IdempotentCreateMixin:
+    """
+    Make ``create`` idempotent for requests that carry an ``Idempotency-Key`` header.
+
+    The first request holding a key takes a short lived lock in Redis, does
+    the work and stores its successful response for
+    settings.IDEMPOTENCY_KEY_TTL seconds. Retries with the same key get the
+    stored response replayed without validation, inserts or notifications.
+    Retries that arrive while the first request is still running wait for
+    its result instead of redoing the work. Failed responses are not stored,
+    so the client can retry with the same key.
+
+    A replay skips permission checks, because they already passed for the
+    original request and one-time tokens like reCAPTCHA cannot be verified
+    twice. Such requests never do any work themselves.
+
+    Requests without the header, or made while Redis is unavailable, are
+    processed as usual.
+    """
+
+    def get_idempotency_key(self, request) -> str | None:
+        """Return the idempotency key of the request, or None if it was not sent."""
+        key = request.headers.get(IDEMPOTENCY_HEADER, '').strip()
+        if not key:
+            return None
+        if len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            raise ValidationError({'idempotency_key': [
+                _('Idempotency-Key must be at most {} characters long.').format(IDEMPOTENCY_KEY_MAX_LENGTH)
+            ]})
+        return key
+
+    def get_idempotency_cache_key(self, key: str) -> str:
+        return f'idempotency:{self.__class__.__name__}:{key}'
+
+    @staticmethod
+    def get_request_fingerprint(request) -> str:
+        """Hash of the request payload, used to detect a key reused for a different request."""
+        payload = json.dumps(request.data, sort_keys=True, cls=DjangoJSONEncoder)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _get_stored_result(self, cache_key: str) -> dict | None:
+        stored = get_redis_client().get(f'{cache_key}:result')
+        return json.loads(stored) if stored else None
+
+    def _is_replay(self, request) -> bool:
+        """Check whether a request with the same key was already processed or is in progress."""
+        key = self.get_idempotency_key(request)
+        if key is None:
+            return False
+        cache_key = self.get_idempotency_cache_key(key)
+        try:
+            client = get_redis_client()
+            return bool(client.exists(f'{cache_key}:result', f'{cache_key}:lock'))
+        except Exception as e:
+            logger.warning(f"Idempotency lookup failed, processing request as usual: {e}")
+            return False
+
+    def check_permissions(self, request):
+        """Skip permission checks for replays of an already authorized request."""
+        self.idempotent_replay = self._is_replay(request)
+        if self.idempotent_replay:
+            return
+        super().check_permissions(request)
+
+    def _replay(self, request, cache_key: str) -> Response:
+        """Wait for the result of the original request and return it."""
+        fingerprint = self.get_request_fingerprint(request)
+        client = get_redis_client()
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+
+        while True:
+            result = self._get_stored_result(cache_key)
+            if result is not None:
+                if result['fingerprint'] != fingerprint:
+                    return Response(
+                        {'detail': _('Idempotency-Key was already used for a different request.')},
+                        status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                    )
+                response = Response(result['data'], status=result['status'], headers=result['headers'])
+                response['Idempotent-Replayed'] = 'true'
+                return response
+            # The original request failed or timed out without storing a result
+            if not client.exists(f'{cache_key}:lock') or time.monotonic() >= deadline:
+                return Response(
+                    {'detail': _('A request with this Idempotency-Key has not completed, please retry.')},
+                    status=status.HTTP_409_CONFLICT
+                )
+            time.sleep(IDEMPOTENCY_POLL_INTERVAL)
+
+    def get_create_response(self, request, *args, **kwargs) -> Response:
+        """Do the actual work of a new request, by default the regular ``create``."""
+        return super().create(request, *args, **kwargs)
+
+    def create(self, request, *args, **kwargs):
+        key = self.get_idempotency_key(request)
+        if key is None:
+            return self.get_create_response(request, *args, **kwargs)
+
+        cache_key = self.get_idempotency_cache_key(key)
+        try:
+            client = get_redis_client()
+            if getattr(self, 'idempotent_replay', False):
+                return self._replay(request, cache_key)
+            locked = client.set(f'{cache_key}:lock', 1, nx=True, ex=settings.IDEMPOTENCY_LOCK_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Idempotency lock failed, processing request as usual: {e}")
+            return self.get_create_response(request, *args, **kwargs)
+
+        if not locked:
+            # A concurrent duplicate took the lock after our permission check
+            return self._replay(request, cache_key)
+
+        try:
+            response = self.get_create_response(request, *args, **kwargs)
+            if status.is_success(response.status_code):
+                result = {
+                    'fingerprint': self.get_request_fingerprint(request),
+                    'status': response.status_code,
+                    'headers': {name: value for name, value in response.items() if name == 'Location'},
+                    'data': response.data,
+                }
+                try:
+                    client.set(
+                        f'{cache_key}:result', json.dumps(result, cls=DjangoJSONEncoder),
+                        ex=settings.IDEMPOTENCY_KEY_TTL
+                    )
+                except Exception as e:
+                    logger.warning(f"Failed to store idempotent response for key '{key}': {e}")
+            return response
+        finally:
+            try:
+                client.delete(f'{cache_key}:lock')
+            except Exception as e:
+                logger.warning(f"Failed to release idempotency lock for key '{key}': {e}")
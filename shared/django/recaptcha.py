@@ -1,45 +1,132 @@
 """Utilities for reCAPTCHA validation."""
-import json
-from urllib.parse import urlencode
-from urllib.request import urlopen
+import hashlib
+import logging
+import time
+from functools import lru_cache
 
+import requests
 from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
 from django.utils.translation import gettext_lazy as _
-from rest_framework.exceptions import ValidationError
+from requests.adapters import HTTPAdapter
+from rest_framework.exceptions import ValidationError, APIException
 from rest_framework.permissions import BasePermission
 
+logger = logging.getLogger(__name__)
+
+RECAPTCHA_ERRORS = {
+    'invalid': _('Invalid ReCaptcha'),
+    'score': _('ReCaptcha score too low'),
+    'used': _('ReCaptcha token has already been used'),
+}
+
+
+class RecaptchaUnavailable(APIException):
+    """The verification service did not answer in time."""
+    status_code = 503
+    default_detail = _('ReCaptcha verification is temporarily unavailable, please try again.')
+    default_code = 'recaptcha_unavailable'
+
+
+class GoogleRecaptchaVerifier:
+    """
+    Verifies tokens against the Google siteverify API.
+
+    Connections are kept alive in a per-process pool and every call is
+    bounded by settings.RECAPTCHA_CONNECT_TIMEOUT and
+    settings.RECAPTCHA_READ_TIMEOUT, so a slow verifier cannot hold a
+    worker for longer than that.
+    """
+
+    def __init__(self):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=settings.RECAPTCHA_POOL_SIZE, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def verify(self, token: str) -> dict:
+        """
+        Return the siteverify result of a token.
+
+        Raises:
+            RecaptchaUnavailable: If the API cannot be reached in time
+        """
+        try:
+            response = self.session.post(
+                settings.RECAPTCHA_VERIFY_URL,
+                data={'secret': settings.RECAPTCHA_SECRET_KEY, 'response': token},
+                timeout=(settings.RECAPTCHA_CONNECT_TIMEOUT, settings.RECAPTCHA_READ_TIMEOUT)
+            )
+            response.raise_for_status()
+            return response.json()
+        except (requests.RequestException, ValueError) as e:
+            logger.warning(f"reCAPTCHA verification failed: {e}")
+            raise RecaptchaUnavailable()
+
+
+class LocalRecaptchaVerifier:
+    """
+    Stand-in verifier for tests and benchmarks that never leaves the process.
+
+    Every token passes with settings.RECAPTCHA_LOCAL_SCORE after sleeping
+    settings.RECAPTCHA_LOCAL_DELAY seconds to simulate a slow verifier.
+    Tokens starting with ``invalid`` are rejected.
+    """
+
+    def verify(self, token: str) -> dict:
+        if settings.RECAPTCHA_LOCAL_DELAY:
+            time.sleep(settings.RECAPTCHA_LOCAL_DELAY)
+        if token.startswith('invalid'):
+            return {'success': False, 'error-codes': ['invalid-input-response']}
+        return {'success': True, 'score': settings.RECAPTCHA_LOCAL_SCORE}
+
+
+@lru_cache(maxsize=1)
+def get_recaptcha_verifier():
+    """Return the process-wide verifier configured in settings.RECAPTCHA_VERIFIER."""
+    return import_string(settings.RECAPTCHA_VERIFIER)()
+
 
 def verify_recaptcha(token):
     """
     Verify reCAPTCHA token.
 
+    Failures are cached for settings.RECAPTCHA_TOKEN_CACHE_TTL seconds, so a
+    rejected token is not sent to Google again. A successful token is marked
+    as used for the same time and every later request with it is rejected,
+    keeping tokens single-use like Google does.
+
     Args:
         token: The reCAPTCHA token to verify
 
     Raises:
-        ValidationError: If token is invalid or the score is too low
+        ValidationError: If token is invalid, already used or the score is too low
+        RecaptchaUnavailable: If the verifier did not answer in time
     """
     # Skip verification in DEBUG mode
     if settings.DEBUG and not settings.RECAPTCHA_ENABLED:
         return True
 
-    # Build request data
-    data = {
-        'secret': settings.RECAPTCHA_SECRET_KEY,
-        'response': token
-    }
-
-    # Make verification request
-    response = urlopen('https://www.google.com/recaptcha/api/siteverify', urlencode(data).encode('utf-8'))
-    result = json.loads(response.read().decode('utf-8'))
-
-    # Check if verification succeeded
-    if not result.get('success'):
-        raise ValidationError(_('Invalid ReCaptcha'))
-
-    # Check if score is high enough
-    if result.get('score', 0) < settings.RECAPTCHA_REQUIRED_SCORE:
-        raise ValidationError(_('ReCaptcha score too low'))
+    cache_key = f'recaptcha:{hashlib.sha256(token.encode()).hexdigest()}'
+    error = cache.get(cache_key)
+    if error is None:
+        result = get_recaptcha_verifier().verify(token)
+
+        # Check if verification succeeded and the score is high enough
+        if not result.get('success'):
+            error = 'invalid'
+        elif result.get('score', 0) < settings.RECAPTCHA_REQUIRED_SCORE:
+            error = 'score'
+
+        if error:
+            cache.set(cache_key, error, settings.RECAPTCHA_TOKEN_CACHE_TTL)
+        elif not cache.add(cache_key, 'used', settings.RECAPTCHA_TOKEN_CACHE_TTL):
+            # A concurrent request with the same token got there first
+            error = 'used'
+
+    if error:
+        raise ValidationError(RECAPTCHA_ERRORS[error])
 
     return True
 
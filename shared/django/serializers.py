@@ -0,0 +1,61 @@
+"""Custom serializer fields."""
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework.relations import PrimaryKeyRelatedField
+
+PRELOADED_INSTANCES = 'preloaded_instances'
+
+
+class PreloadedPrimaryKeyRelatedField(PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField that resolves primary keys from instances preloaded in bulk.
+
+    The root serializer collects every primary key of the payload and calls
+    ``preload`` once per field, which fetches them with a single query against
+    the field's own queryset. Without a preloaded map the field behaves like a
+    regular PrimaryKeyRelatedField.
+    """
+
+    @property
+    def preload_key(self) -> str:
+        return self.get_queryset().model._meta.label_lower
+
+    def preload(self, pks) -> None:
+        """
+        Fetch instances for the given primary keys and store them in the serializer context.
+
+        Args:
+            pks: Raw primary key values taken from the payload
+        """
+        queryset = self.get_queryset()
+        pk_field = queryset.model._meta.pk
+
+        valid_pks = set()
+        for pk in pks:
+            if isinstance(pk, bool):
+                continue
+            try:
+                valid_pks.add(pk_field.to_python(pk))
+            except (DjangoValidationError, TypeError, ValueError):
+                continue
+
+        instances = {obj.pk: obj for obj in queryset.filter(pk__in=valid_pks)} if valid_pks else {}
+        self.context.setdefault(PRELOADED_INSTANCES, {})[self.preload_key] = instances
+
+    def to_internal_value(self, data):
+        preloaded = self.context.get(PRELOADED_INSTANCES, {}).get(self.preload_key)
+        if preloaded is None:
+            return super().to_internal_value(data)
+
+        if self.pk_field is not None:
+            data = self.pk_field.to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = self.get_queryset().model._meta.pk.to_python(data)
+        except (DjangoValidationError, TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+        try:
+            return preloaded[pk]
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
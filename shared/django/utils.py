@@ -1,9 +1,28 @@
+import hashlib
 from collections import OrderedDict
 
-from rest_framework.pagination import LimitOffsetPagination
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.pagination import LimitOffsetPagination, CursorPagination
 from rest_framework.response import Response
 
 
+def get_cached_count(queryset) -> int:
+    """
+    Count a queryset, reusing the result for settings.PAGINATION_COUNT_CACHE_TTL seconds.
+
+    The count is keyed by the SQL of the query, so it is shared by every
+    request with the same filters and may be slightly out of date.
+    """
+    sql, params = queryset.query.sql_with_params()
+    key = f'pagination_count:{hashlib.sha256(f"{sql}{params}".encode()).hexdigest()}'
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, settings.PAGINATION_COUNT_CACHE_TTL)
+    return count
+
+
 class CustomPagination(LimitOffsetPagination):
     default_limit = 25
 
@@ -50,3 +69,99 @@ class CustomPagination(LimitOffsetPagination):
                 'results': schema,
             },
         }
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Cursor pagination on (-created_at, -id).
+
+    Every page is read with a keyset condition on ``created_at`` from the
+    opaque ``cursor`` of the previous one, so page 500 costs the same as
+    page 1 and no COUNT is run. ``?with_total=1`` adds a cached, possibly
+    slightly stale total (see get_cached_count). The ``ordering`` query
+    parameter is ignored.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 25
+    page_size_query_param = 'limit'
+    max_page_size = 100
+    total_query_param = 'with_total'
+
+    def get_ordering(self, request, queryset, view):
+        return self.ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.total = None
+        if request.query_params.get(self.total_query_param) in ('1', 'true'):
+            self.total = get_cached_count(queryset)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('total', self.total),
+            ('results', data)
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['total'] = {
+            'type': 'integer',
+            'nullable': True,
+            'example': 123,
+            'description': 'Approximate number of results, only with ?with_total=1',
+        }
+        return response_schema
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters.append({
+            'name': self.total_query_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Set to 1 to include the approximate total.',
+            'schema': {'type': 'boolean'},
+        })
+        return parameters
+
+
+class CursorOptInPagination(CustomPagination):
+    """
+    CustomPagination that switches to KeysetCursorPagination with ``?pagination=cursor``.
+
+    Existing clients keep limit/offset pages, infinite scroll opts in to
+    cursors, which cost the same however deep the client scrolls.
+    """
+    mode_query_param = 'pagination'
+    cursor_paginator_class = KeysetCursorPagination
+
+    def get_cursor_paginator(self, request):
+        if request.query_params.get(self.mode_query_param) == 'cursor':
+            return self.cursor_paginator_class()
+        return None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = self.get_cursor_paginator(request)
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters.append({
+            'name': self.mode_query_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Set to "cursor" for cursor pages, see the cursor and with_total parameters.',
+            'schema': {'type': 'string', 'enum': ['cursor']},
+        })
+        cursor_parameters = self.cursor_paginator_class().get_schema_operation_parameters(view)
+        names = {parameter['name'] for parameter in parameters}
+        parameters.extend(parameter for parameter in cursor_parameters if parameter['name'] not in names)
+        return parameters
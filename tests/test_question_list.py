@@ -0,0 +1,68 @@
+"""Tests for the survey questions endpoint."""
+
+import pytest
+from django.urls import reverse
+
+from app.models import AnswerOption, Question, Survey
+from app.serializers.survey import QuestionSerializer
+from app.utils.option_tree import AnswerOptionTree
+
+
+@pytest.fixture(autouse=True)
+def local_caches(settings):
+    """Keep snapshots and query results out of Redis."""
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    settings.CACHEOPS_ENABLED = False
+
+
+@pytest.fixture
+def survey(db):
+    """Return a survey with one question holding a two level option tree per root."""
+    # Survey.save() talks to Telegram, bulk_create stores the row directly
+    survey, = Survey.objects.bulk_create([
+        Survey(title='Visa', slug='visa', is_default=True, telegram_topic_id=1),
+    ])
+    question = Question.objects.create(
+        survey=survey, title='Country', input_type=Question.InputType.SINGLE_CHOICE
+    )
+    for root_order in range(3):
+        root = AnswerOption.objects.create(question=question, text=f'Region {root_order}', order=root_order)
+        for child_order in range(2):
+            child = AnswerOption.objects.create(
+                question=question, parent=root, text=f'Country {root_order}.{child_order}', order=child_order
+            )
+            AnswerOption.objects.create(question=question, parent=child, text='City', order=0)
+    return survey
+
+
+def test_option_tree_serializes_nested_options_in_two_queries(survey, django_assert_num_queries):
+    """Questions and the whole option forest are loaded with one query each."""
+    questions = Question.objects.select_related('field_type').filter(survey=survey)
+
+    with django_assert_num_queries(2):
+        data = QuestionSerializer(
+            questions, many=True, context={'option_tree': AnswerOptionTree(questions)}
+        ).data
+
+    options = data[0]['options']
+    assert [option['text'] for option in options] == ['Region 0', 'Region 1', 'Region 2']
+    assert [child['text'] for child in options[1]['children']] == ['Country 1.0', 'Country 1.1']
+    assert options[1]['children'][0]['children'][0]['text'] == 'City'
+
+
+def test_question_list_query_count_does_not_grow_with_options(survey, api_client, django_assert_num_queries):
+    """A cold schema snapshot costs the version lookup, the questions and the option forest."""
+    url = reverse('question-list')
+
+    with django_assert_num_queries(3):
+        response = api_client.get(url, {'survey_id': survey.id}, HTTP_ACCEPT='application/json')
+
+    assert response.status_code == 200
+    options = response.json()[0]['options']
+    assert len(options) == 3
+    assert all(len(option['children']) == 2 for option in options)
+
+    # The snapshot is served from the cache afterwards
+    with django_assert_num_queries(0):
+        response = api_client.get(url, {'survey_id': survey.id}, HTTP_ACCEPT='application/json')
+    assert response.status_code == 200